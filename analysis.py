@@ -0,0 +1,211 @@
+import contextvars
+import json
+import os
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import BinaryIO, Iterator, List, Optional
+
+import numpy as np
+
+from audio_cache import derive_variant, load_audio
+from audio_io import content_digest, encode_wav
+from batch import ZipStream
+from data_formats import encode_array_payload, output_filename
+from jobs import OPERATION_FAILURES
+from metrics import observe_audio, stage_timer
+from result_cache import ResultCache, result_cache, result_params
+from spectrogram import SpectrogramGenerator
+from transcribe import AudioTranscriber
+from waveform import WaveformGenerator
+
+
+ANALYZE_OUTPUTS = ('convert', 'waveform', 'spectrogram', 'transcribe')
+ANALYZE_WORKERS = int(os.environ.get('ANALYZE_WORKERS', len(ANALYZE_OUTPUTS)))
+
+
+def parse_outputs(values: List[str]) -> List[str]:
+    outputs = []
+    for value in values:
+        for output in value.split(','):
+            output = output.strip().lower()
+            if not output:
+                continue
+            if output not in ANALYZE_OUTPUTS:
+                raise ValueError(f"Unsupported analysis output: {output} (choose from {', '.join(ANALYZE_OUTPUTS)})")
+            if output not in outputs:
+                outputs.append(output)
+    return outputs or list(ANALYZE_OUTPUTS)
+
+
+class AudioAnalyzer:
+    """Decodes one upload once and runs the requested outputs over the shared buffer in parallel."""
+    
+    def __init__(self, max_workers: int = ANALYZE_WORKERS):
+        self.max_workers = max_workers
+        self._executor = None
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='analyze')
+        return self._executor
+    
+    @staticmethod
+    def result_key(digest: str, output: str, filename: str, output_format: str) -> Optional[str]:
+        """Key under which the single-file endpoint caches the same bytes; None if not cached."""
+        if output == 'convert' or (output == 'spectrogram' and output_format == 'png'):
+            return ResultCache.make_key(digest, output, result_params(output, filename))
+        if output == 'spectrogram':
+            params = dict(result_params('spectrogram', filename), output=output_format)
+            return ResultCache.make_key(digest, 'spectrogram', params)
+        if output == 'waveform' and output_format == 'png':
+            return ResultCache.make_key(digest, 'waveform', result_params('waveform', filename))
+        if output == 'waveform':
+            params = dict(result_params('waveform', filename), start=0.0, end=None,
+                          width=WaveformGenerator.ENVELOPE_COLUMNS, output=output_format)
+            return ResultCache.make_key(digest, 'waveform', params)
+        return None
+    
+    @staticmethod
+    def member_name(output: str, filename: str, output_format: str) -> str:
+        base_name = filename.rsplit(".", 1)[0]
+        if output == 'convert':
+            return base_name + ".wav"
+        if output == 'transcribe':
+            return base_name + "_transcription.json"
+        return output_filename(base_name, output, output_format)
+    
+    @staticmethod
+    def convert(y: np.ndarray, sr: int, **_) -> bytes:
+        with stage_timer('convert', 'encode'):
+            return encode_wav(y, sr)
+    
+    @staticmethod
+    def waveform(y: np.ndarray, sr: int, filename: str, digest: str, output_format: str, **_) -> bytes:
+        # The peak pyramid is stored as well, so the manifest's peaks_id works
+        # for follow-up /waveform/ window requests
+        with stage_timer('waveform', 'dsp'):
+            pyramid = WaveformGenerator.build_peak_pyramid(y, sr)
+        result_cache.put(ResultCache.make_key(digest, 'peaks', result_params('peaks', '')), pyramid.to_bytes())
+        
+        if output_format == 'png':
+            return WaveformGenerator.render_waveform(y, sr, f'Audio Waveform - {filename}')
+        
+        peaks, meta = WaveformGenerator.window_data(
+            pyramid, 0.0, pyramid.duration, WaveformGenerator.ENVELOPE_COLUMNS
+        )
+        return encode_array_payload(dict(meta, peaks_id=digest), peaks, output_format)
+    
+    @staticmethod
+    def spectrogram(y: np.ndarray, sr: int, filename: str, output_format: str, **_) -> bytes:
+        n_fft, hop_length = SpectrogramGenerator.N_FFT, SpectrogramGenerator.HOP_LENGTH
+        with stage_timer('spectrogram', 'dsp'):
+            S, frames_per_column = SpectrogramGenerator.magnitude_from_array(
+                y, SpectrogramGenerator.TIME_COLUMNS, n_fft, hop_length
+            )
+        
+        if output_format == 'png':
+            return SpectrogramGenerator.render_magnitude(S, sr, frames_per_column, filename)
+        matrix, meta = SpectrogramGenerator.magnitude_data(S, sr, frames_per_column)
+        return encode_array_payload(meta, matrix, output_format)
+    
+    @staticmethod
+    def transcribe(y: np.ndarray, sr: int, filename: str, language: str, **_) -> bytes:
+        with stage_timer('transcribe', 'dsp'):
+            samples, sample_rate = derive_variant(y, sr, AudioTranscriber.SAMPLE_RATE, 'int16')
+        
+        segments = AudioTranscriber.transcribe_samples(samples, sample_rate, language)
+        return json.dumps({
+            'transcription': AudioTranscriber.join_segments(segments),
+            'language': language,
+            'filename': filename,
+            'segments': segments
+        }, indent=2).encode('utf-8')
+    
+    def analyze(self, audio_file: BinaryIO, outputs: List[str], output_format: str = 'png',
+                language: str = 'en-US') -> Iterator[bytes]:
+        """Serve cached outputs, decode once if anything is left, and return the zip stream.
+        
+        Decoding happens before the first chunk so an unreadable file can still
+        be answered with a 400 instead of an archive of failures.
+        """
+        filename = audio_file.name
+        digest = content_digest(audio_file)
+        
+        cached, pending, skipped = {}, [], {}
+        for output in outputs:
+            if output == 'convert' and filename.split('.')[-1].lower() == 'wav':
+                skipped[output] = 'The file is already in .wav format'
+                continue
+            key = AudioAnalyzer.result_key(digest, output, filename, output_format)
+            data = result_cache.get(key) if key is not None else None
+            if data is not None:
+                cached[output] = data
+            else:
+                pending.append((output, key))
+        
+        audio = None
+        if pending:
+            try:
+                audio_file.seek(0)
+                with stage_timer('analyze', 'decode'):
+                    audio = load_audio(audio_file, filename)
+            except Exception as e:
+                raise ValueError(f"Failed to decode {filename}: {str(e)}")
+            observe_audio('analyze', len(audio[0]), audio[1])
+        
+        return self._stream(filename, digest, outputs, output_format, language, audio, cached, pending, skipped)
+    
+    def _stream(self, filename, digest, outputs, output_format, language, audio, cached, pending,
+                skipped) -> Iterator[bytes]:
+        sink = ZipStream()
+        archive = zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_STORED)
+        results = {output: {'operation': output, 'status': 'skipped', 'message': message}
+                   for output, message in skipped.items()}
+        
+        def write(output, data, **details):
+            name = AudioAnalyzer.member_name(output, filename, output_format)
+            archive.writestr(name, data)
+            results[output] = dict({'operation': output, 'status': 'done', 'output': name}, **details)
+        
+        for output, data in cached.items():
+            write(output, data, cached=True)
+            yield sink.drain()
+        
+        # Every stage reads the same read-only decoded buffer; each gets its own
+        # copy of the request context so render and profiling settings carry over
+        executor = self._get_executor()
+        options = {'filename': filename, 'digest': digest, 'output_format': output_format, 'language': language}
+        futures = {
+            executor.submit(contextvars.copy_context().run, getattr(AudioAnalyzer, output), *audio, **options):
+                (output, key)
+            for output, key in pending
+        }
+        
+        for future in as_completed(futures):
+            output, key = futures[future]
+            try:
+                data = future.result()
+            except Exception as e:
+                status_code = getattr(e, 'status_code', 400 if isinstance(e, ValueError) else 500)
+                message = str(e) if status_code < 500 else OPERATION_FAILURES[output]
+                results[output] = {'operation': output, 'status': 'failed', 'error': message,
+                                   'status_code': status_code}
+                continue
+            
+            if key is not None:
+                result_cache.put(key, data)
+            write(output, data, cached=False)
+            yield sink.drain()
+        
+        manifest = {'filename': filename, 'results': [results[output] for output in outputs]}
+        if audio is not None:
+            manifest['duration'] = round(len(audio[0]) / audio[1], 3)
+            manifest['sample_rate'] = audio[1]
+        if 'waveform' in outputs:
+            manifest['peaks_id'] = digest
+        archive.writestr('manifest.json', json.dumps(manifest, indent=2))
+        archive.close()
+        yield sink.drain()
+
+
+audio_analyzer = AudioAnalyzer()
\ No newline at end of file
@@ -1,12 +1,347 @@
-from django.http import HttpResponse, JsonResponse
+import io
+import math
+import os
+import tempfile
+import zipfile
+from django.core.files.move import file_move_safe
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified, JsonResponse, StreamingHttpResponse
 from rest_framework.decorators import api_view
-from format_conversion import AudioConverter
-from waveform import WaveformGenerator
+from format_conversion import AudioConverter, probe
+from waveform import PeakPyramid, WaveformGenerator
 from spectrogram import SpectrogramGenerator
 from transcribe import AudioTranscriber
+from audio_cache import decoded_audio_cache
+from audio_io import content_digest, upload_source
+from data_formats import CONTENT_TYPES, encode_array_payload, output_filename, parse_output_format
+from batch import batch_processor, expand_uploads, parse_operations
+from analysis import audio_analyzer, parse_outputs
+from asset_store import asset_store
+from resumable import ResumableUploadError, resumable_uploads
+from ingest import UploadRejected, rejection_response
+from jobs import QueueFullError, job_queue
+from metrics import REGISTRY, endpoint_label, stage_timer
+from render import render_pool
+from result_cache import ResultCache, result_cache, result_params
 from swagger_config import *
 
 
+IF_NONE_MATCH_PARAMETER = openapi.Parameter(
+    'If-None-Match',
+    openapi.IN_HEADER,
+    description="ETag from a previous response for the same file; a match returns 304 without decoding",
+    type=openapi.TYPE_STRING
+)
+
+NOT_MODIFIED_RESPONSE = openapi.Response(
+    description="Not Modified - The result for this file matches the supplied If-None-Match ETag"
+)
+
+OUTPUT_PARAMETER = openapi.Parameter(
+    'output',
+    openapi.IN_QUERY,
+    description="png (default) renders an image; json or binary return the precomputed data for client-side "
+                "drawing (JSON header with base64 `data`, or uint32 header length + JSON header + raw array)",
+    type=openapi.TYPE_STRING,
+    enum=['png', 'json', 'binary'],
+    default='png'
+)
+
+ASYNC_PARAMETER = openapi.Parameter(
+    'async',
+    openapi.IN_QUERY,
+    description="Set to 1 to queue the work and return a job id immediately (poll `/jobs/<id>/` for the result)",
+    type=openapi.TYPE_INTEGER,
+    enum=[0, 1],
+    default=0
+)
+
+JOB_ACCEPTED_RESPONSE = openapi.Response(
+    description="Accepted - Job queued (only with ?async=1)",
+    examples={
+        "application/json": {
+            "job_id": "3f2b9c1e8d7a4f60a1b2c3d4e5f60718",
+            "status": "queued",
+            "status_url": "/jobs/3f2b9c1e8d7a4f60a1b2c3d4e5f60718/"
+        }
+    }
+)
+
+QUEUE_FULL_RESPONSE = openapi.Response(
+    description="Too Many Requests - Job queue is saturated, retry later (only with ?async=1)",
+    schema=openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        properties={
+            'error': openapi.Schema(
+                type=openapi.TYPE_STRING,
+                example="Job queue is full (16 jobs pending)"
+            )
+        }
+    )
+)
+
+ASSET_ID_PROPERTY = openapi.Schema(
+    type=openapi.TYPE_STRING,
+    description="asset_id returned by /assets/; replaces audio_file so the file is not uploaded again"
+)
+
+ASSET_NOT_FOUND_RESPONSE = openapi.Response(
+    description="Not Found - Unknown or expired asset_id",
+    schema=openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        properties={
+            'error': openapi.Schema(
+                type=openapi.TYPE_STRING,
+                example="Unknown or expired asset_id; upload the file to /assets/ again"
+            )
+        }
+    )
+)
+
+START_PROPERTY = openapi.Schema(
+    type=openapi.TYPE_NUMBER,
+    description="Process only the audio from this time in seconds (default 0)"
+)
+
+DURATION_PROPERTY = openapi.Schema(
+    type=openapi.TYPE_NUMBER,
+    description="Process only this many seconds from start (default: to the end of the file)"
+)
+
+UPLOAD_TOO_LARGE_RESPONSE = openapi.Response(
+    description="Payload Too Large - The upload exceeds MAX_UPLOAD_BYTES, or its header declares more than "
+                "MAX_AUDIO_SECONDS of audio; rejected before decoding",
+    schema=openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        properties={
+            'error': openapi.Schema(
+                type=openapi.TYPE_STRING,
+                example="Audio is 18000s long; the maximum is 14400s"
+            )
+        }
+    )
+)
+
+
+def _audio_input(request, required=True):
+    """Return (audio_file, error response) from the upload, or from a stored asset given by asset_id."""
+    audio_file = request.FILES.get('audio_file')
+    asset_id = request.data.get('asset_id', request.GET.get('asset_id'))
+    
+    if audio_file is None and asset_id:
+        audio_file = asset_store.open(asset_id)
+        if audio_file is None:
+            return None, JsonResponse({'error': 'Unknown or expired asset_id; upload the file to /assets/ again'},
+                                      status=404)
+    
+    if audio_file is None:
+        return None, JsonResponse({'error': 'No audio file provided'}, status=400) if required else None
+    
+    if not audio_file.name:
+        return None, JsonResponse({'error': 'Invalid file'}, status=400)
+    return audio_file, None
+
+
+def _result_key(operation, audio_file, time_range=(0.0, None)):
+    params = result_params(operation, audio_file.name)
+    if time_range != (0.0, None):
+        params = dict(params, start=time_range[0], duration=time_range[1])
+    return ResultCache.make_key(content_digest(audio_file), operation, params)
+
+
+def _parse_range(request):
+    """Return (start, duration) in seconds; (0.0, None) is the whole file."""
+    values = {}
+    for name in ('start', 'duration'):
+        value = request.data.get(name, request.GET.get(name))
+        if value in (None, ''):
+            continue
+        try:
+            values[name] = float(value)
+        except ValueError:
+            raise ValueError(f"Invalid {name}: {value}")
+        if not math.isfinite(values[name]):
+            raise ValueError(f"Invalid {name}: {value}")
+    
+    start, duration = values.get('start', 0.0), values.get('duration')
+    if start < 0:
+        raise ValueError("start must not be negative")
+    if duration is not None and duration <= 0:
+        raise ValueError("duration must be greater than 0")
+    return start, duration
+
+
+def _not_modified(request, key):
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if not if_none_match:
+        return None
+    
+    etag = f'"{key}"'
+    candidates = [tag.strip() for tag in if_none_match.split(',')]
+    candidates = [tag[2:] if tag.startswith('W/') else tag for tag in candidates]
+    if '*' not in candidates and etag not in candidates:
+        return None
+    
+    response = HttpResponseNotModified()
+    response['ETag'] = etag
+    return response
+
+
+def _peaks_key(peaks_id):
+    return ResultCache.make_key(peaks_id, 'peaks', result_params('peaks', ''))
+
+
+def _build_peaks(audio_file, peaks_id):
+    pyramid = WaveformGenerator.peak_pyramid_from_file(audio_file, audio_file.name)
+    result_cache.put(_peaks_key(peaks_id), pyramid.to_bytes())
+    return pyramid
+
+
+def _parse_window(request):
+    values = {}
+    for name in ('start', 'end', 'duration', 'width'):
+        value = request.data.get(name, request.GET.get(name))
+        if value in (None, ''):
+            continue
+        try:
+            values[name] = int(value) if name == 'width' else float(value)
+        except ValueError:
+            raise ValueError(f"Invalid {name}: {value}")
+        if not math.isfinite(values[name]):
+            raise ValueError(f"Invalid {name}: {value}")
+    
+    if values.get('start', 0) < 0:
+        raise ValueError("start must not be negative")
+    if 'duration' in values:
+        if 'end' in values:
+            raise ValueError("Pass either end or duration, not both")
+        if values['duration'] <= 0:
+            raise ValueError("duration must be greater than 0")
+        values['end'] = values.get('start', 0) + values.pop('duration')
+    if 'end' in values and values['end'] <= values.get('start', 0):
+        raise ValueError("end must be greater than start")
+    width = values.get('width', WaveformGenerator.ENVELOPE_COLUMNS)
+    if not WaveformGenerator.MIN_WIDTH <= width <= WaveformGenerator.MAX_WIDTH:
+        raise ValueError(
+            f"width must be between {WaveformGenerator.MIN_WIDTH} and {WaveformGenerator.MAX_WIDTH}"
+        )
+    return values
+
+
+def _output_format(request):
+    return parse_output_format(request.data.get('output', request.GET.get('output')))
+
+
+def _waveform_window(request, audio_file, peaks_id, window, output_format='png'):
+    # Render a time window from the file's peak pyramid; with a peaks_id the
+    # audio itself is never needed
+    if audio_file is not None:
+        peaks_id = content_digest(audio_file)
+    filename = audio_file.name if audio_file is not None else ''
+    
+    start = window.get('start', 0.0)
+    end = window.get('end')
+    width = window.get('width', WaveformGenerator.ENVELOPE_COLUMNS)
+    
+    params = dict(result_params('waveform', filename), start=start, end=end, width=width)
+    if output_format != 'png':
+        params['output'] = output_format
+    key = ResultCache.make_key(peaks_id, 'waveform', params)
+    not_modified = _not_modified(request, key)
+    if not_modified is not None:
+        return not_modified
+    
+    waveform_data = result_cache.get(key)
+    if waveform_data is None:
+        # offset/duration describe a pyramid of just the window; a stored
+        # pyramid always covers the whole file
+        offset, duration = 0.0, None
+        pyramid_data = result_cache.get(_peaks_key(peaks_id))
+        if pyramid_data is not None:
+            pyramid = PeakPyramid.from_bytes(pyramid_data)
+        elif audio_file is not None and ('start' in window or 'end' in window):
+            # Decode only the requested window; the whole-file pyramid is built
+            # by requests that need the whole file anyway
+            pyramid, duration = WaveformGenerator.range_pyramid_from_file(
+                audio_file, filename, start, None if end is None else end - start
+            )
+            offset = start
+        elif audio_file is not None:
+            pyramid = _build_peaks(audio_file, peaks_id)
+        else:
+            return JsonResponse({'error': 'Unknown peaks_id; upload the audio file again'}, status=404)
+        
+        available = offset + pyramid.duration
+        end = min(end, available) if end is not None else available
+        if start >= end:
+            return JsonResponse({'error': f'start must be less than the duration ({pyramid.duration:.3f}s)'},
+                                status=400)
+        
+        if output_format == 'png':
+            title = f'Audio Waveform - {filename}' if filename else 'Audio Waveform'
+            waveform_data = WaveformGenerator.render_window(
+                pyramid, start, end, width, f'{title} ({start:.2f}s - {end:.2f}s)', offset
+            )
+        else:
+            peaks, meta = WaveformGenerator.window_data(pyramid, start, end, width, offset, duration)
+            waveform_data = encode_array_payload(dict(meta, peaks_id=peaks_id), peaks, output_format)
+        result_cache.put(key, waveform_data)
+    
+    base_name = filename.rsplit(".", 1)[0] if filename else 'audio'
+    response = HttpResponse(waveform_data, content_type=CONTENT_TYPES[output_format])
+    response['Content-Disposition'] = f'attachment; filename="{output_filename(base_name, "waveform", output_format)}"'
+    response['Content-Length'] = len(waveform_data)
+    response['Cache-Control'] = 'no-cache'
+    response['ETag'] = f'"{key}"'
+    response['X-Peaks-Id'] = peaks_id
+    return response
+
+
+def _wants_async(request):
+    return request.GET.get('async', '').lower() in ('1', 'true', 'yes')
+
+
+def _job_source(audio_file):
+    """Return (path, temporary) for a job worker to open the file from.
+    
+    Stored assets are read in place. Spooled uploads are moved out of the
+    request's reach, since Django deletes them when the request ends; the job
+    then owns the moved file.
+    """
+    if isinstance(audio_file, TemporaryUploadedFile):
+        spooled = audio_file.temporary_file_path()
+        fd, path = tempfile.mkstemp(dir=os.path.dirname(spooled), suffix='.job')
+        os.close(fd)
+        file_move_safe(spooled, path, allow_overwrite=True)
+        return path, True
+    
+    if hasattr(audio_file, 'temporary_file_path'):
+        return audio_file.temporary_file_path(), False
+    
+    fd, path = tempfile.mkstemp(suffix='.job')
+    with os.fdopen(fd, 'wb') as job_file:
+        audio_file.seek(0)
+        for chunk in audio_file.chunks():
+            job_file.write(chunk)
+    return path, True
+
+
+def _enqueue_job(operation, audio_file, options=None):
+    try:
+        path, temporary = _job_source(audio_file)
+        job = job_queue.submit(operation, path, audio_file.name, options, temporary=temporary)
+    except QueueFullError as e:
+        response = JsonResponse({'error': str(e)}, status=429)
+        response['Retry-After'] = '5'
+        return response
+    
+    return JsonResponse({
+        'job_id': job.id,
+        'status': job.status,
+        'status_url': f'/jobs/{job.id}/'
+    }, status=202)
+
+
 @swagger_auto_schema(
     method='post',
     operation_summary="Convert Audio to WAV",
@@ -23,6 +358,13 @@ from swagger_config import *
     **Output:**
     - WAV file with same name as input (extension changed to .wav)
     - Proper Content-Disposition headers for automatic download
+    - Streamed as it is decoded: the WAV header is sent immediately and memory use is
+      bounded by the chunk size, not the length of the recording
+    
+    **Time Range:**
+    - Pass `start` and/or `duration` (seconds) to convert only that part of the file,
+      including WAV input; WAV, FLAC, OGG and AIFF seek straight to `start`
+    - `?async=1` is ignored for time-ranged requests
     """,
     request_body=openapi.Schema(
         type=openapi.TYPE_OBJECT,
@@ -30,10 +372,13 @@ from swagger_config import *
             'audio_file': openapi.Schema(
                 type=openapi.TYPE_FILE,
                 description="Audio file to convert. Supports: mp3, mp4, wav, flac, aac, ogg, wma, m4a, aiff"
-            )
-        },
-        required=['audio_file']
+            ),
+            'asset_id': ASSET_ID_PROPERTY,
+            'start': START_PROPERTY,
+            'duration': DURATION_PROPERTY
+        }
     ),
+    manual_parameters=[ASYNC_PARAMETER, IF_NONE_MATCH_PARAMETER],
     responses={
         200: openapi.Response(
             description="Success - WAV file download or message if already WAV",
@@ -43,6 +388,8 @@ from swagger_config import *
                 }
             }
         ),
+        202: JOB_ACCEPTED_RESPONSE,
+        304: NOT_MODIFIED_RESPONSE,
         400: openapi.Response(
             description="Bad Request - Missing or invalid file",
             schema=openapi.Schema(
@@ -66,7 +413,10 @@ from swagger_config import *
                     )
                 }
             )
-        )
+        ),
+        429: QUEUE_FULL_RESPONSE,
+        404: ASSET_NOT_FOUND_RESPONSE,
+        413: UPLOAD_TOO_LARGE_RESPONSE
     },
     consumes=['multipart/form-data'],
     tags=['Audio Conversion']
@@ -74,26 +424,42 @@ from swagger_config import *
 @api_view(['POST'])
 def convert_audio(request):
     try:
-        if 'audio_file' not in request.FILES:
-            return JsonResponse({'error': 'No audio file provided'}, status=400)
-        
-        audio_file = request.FILES['audio_file']
-        
-        if not audio_file.name:
-            return JsonResponse({'error': 'Invalid file'}, status=400)
+        audio_file, error = _audio_input(request)
+        if error is not None:
+            return error
         
         file_extension = audio_file.name.split('.')[-1].lower()
         
-        if file_extension == 'wav':
+        time_range = _parse_range(request)
+        ranged = time_range != (0.0, None)
+        
+        if file_extension == 'wav' and not ranged:
             return JsonResponse({'message': 'The file is already in .wav format'})
         
-        wav_data = AudioConverter.convert_to_wav(audio_file, audio_file.name)
+        key = _result_key('convert', audio_file, time_range)
+        not_modified = _not_modified(request, key)
+        if not_modified is not None:
+            return not_modified
+        
+        if _wants_async(request) and not ranged:
+            return _enqueue_job('convert', audio_file)
+        
+        cached_file = result_cache.open(key)
+        if cached_file is not None:
+            response = FileResponse(cached_file, content_type='audio/wav')
+        else:
+            # Stream header + PCM chunks as they are decoded, saving a copy to the result cache
+            start, duration = time_range
+            wav_length, wav_chunks = AudioConverter.stream_wav(
+                audio_file, audio_file.name, start=start, duration=duration
+            )
+            response = StreamingHttpResponse(result_cache.tee(key, wav_chunks), content_type='audio/wav')
+            response['Content-Length'] = wav_length
         
         filename = audio_file.name.rsplit(".", 1)[0] + ".wav"
-        response = HttpResponse(wav_data, content_type='audio/wav')
         response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        response['Content-Length'] = len(wav_data)
         response['Cache-Control'] = 'no-cache'
+        response['ETag'] = f'"{key}"'
         return response
         
     except ValueError as e:
@@ -155,7 +521,16 @@ def supported_formats(request):
     - Application startup verification
     - API availability testing
     
-    **Returns:** Simple status confirmation
+    **Returns:** Status confirmation plus decoded-audio cache statistics
+    
+    **Status:**
+    - `healthy`, or `degraded` when a job worker has died and `jobs.broken` is true;
+      the job pool is rebuilt on the next `?async=1` request
+    
+    **Audio Cache:**
+    - Decoded audio is shared between conversion, visualization and transcription
+    - `hits`, `misses` and `evictions` count cache activity since process start
+    - `bytes` / `max_bytes` show buffer usage against the configured budget
     """,
     responses={
         200: openapi.Response(
@@ -166,12 +541,31 @@ def supported_formats(request):
                     'status': openapi.Schema(
                         type=openapi.TYPE_STRING,
                         example="healthy"
+                    ),
+                    'audio_cache': openapi.Schema(
+                        type=openapi.TYPE_OBJECT,
+                        properties={
+                            'entries': openapi.Schema(type=openapi.TYPE_INTEGER, example=2),
+                            'bytes': openapi.Schema(type=openapi.TYPE_INTEGER, example=52920000),
+                            'max_bytes': openapi.Schema(type=openapi.TYPE_INTEGER, example=536870912),
+                            'hits': openapi.Schema(type=openapi.TYPE_INTEGER, example=6),
+                            'misses': openapi.Schema(type=openapi.TYPE_INTEGER, example=2),
+                            'evictions': openapi.Schema(type=openapi.TYPE_INTEGER, example=0)
+                        }
                     )
                 }
             ),
             examples={
                 "application/json": {
-                    "status": "healthy"
+                    "status": "healthy",
+                    "audio_cache": {
+                        "entries": 2,
+                        "bytes": 52920000,
+                        "max_bytes": 536870912,
+                        "hits": 6,
+                        "misses": 2,
+                        "evictions": 0
+                    }
                 }
             }
         )
@@ -180,7 +574,49 @@ def supported_formats(request):
 )
 @api_view(['GET'])
 def health_check(request):
-    return JsonResponse({'status': 'healthy'})
+    jobs = job_queue.stats()
+    return JsonResponse({
+        # Synchronous endpoints still work; ?async=1 jobs fail until the pool is rebuilt
+        'status': 'degraded' if jobs['broken'] else 'healthy',
+        'audio_cache': decoded_audio_cache.stats(),
+        'jobs': jobs,
+        'render_pool': render_pool.stats()
+    })
+
+
+@swagger_auto_schema(
+    method='get',
+    operation_summary="Prometheus Metrics",
+    operation_description="""
+    Request and processing metrics in the Prometheus text exposition format, for scraping.
+    
+    **Metrics:**
+    - `spectrolingua_http_requests_total`: Requests by endpoint, method and status
+    - `spectrolingua_http_request_duration_seconds`: Time to produce each response
+    - `spectrolingua_http_request_bytes` / `spectrolingua_http_response_bytes`: Body sizes
+    - `spectrolingua_stage_duration_seconds`: Time per processing stage, labelled by
+      operation (convert, waveform, spectrogram, transcribe) and stage
+      (upload, decode, dsp, render, encode, recognize)
+    - `spectrolingua_audio_duration_seconds`: Length of the audio processed per operation
+    
+    **Scope:** Metrics are kept per process; work done by async job and batch worker
+    processes is not included.
+    """,
+    responses={
+        200: openapi.Response(
+            description="Metrics in Prometheus text format (version 0.0.4)",
+            examples={
+                "text/plain": "# HELP spectrolingua_stage_duration_seconds Time spent per processing stage ...\n"
+                              "# TYPE spectrolingua_stage_duration_seconds histogram\n"
+                              "spectrolingua_stage_duration_seconds_bucket{operation=\"spectrogram\",stage=\"render\",le=\"0.5\"} 12\n"
+            }
+        )
+    },
+    tags=['Information']
+)
+@api_view(['GET'])
+def export_metrics(request):
+    return HttpResponse(REGISTRY.expose(), content_type='text/plain; version=0.0.4; charset=utf-8')
 
 
 @swagger_auto_schema(
@@ -202,6 +638,21 @@ def health_check(request):
     - PNG image file ready for download
     - Dimensions: 12x6 inches at 150 DPI
     - Includes title, axis labels, and grid for professional appearance
+    - `X-Peaks-Id` header identifying the file's zoom pyramid
+    
+    **Zooming:**
+    - Every rendered file gets a multi-resolution min/max peak pyramid, stored server-side
+    - Pass `start`/`end` (seconds) and `width` (pixels) to render just that window;
+      `duration` may be given instead of `end`
+    - A window of an uploaded file without a stored pyramid decodes only that window
+    - Send `peaks_id` (from `X-Peaks-Id`) instead of `audio_file` to zoom without re-uploading;
+      windows are drawn from the pyramid and never touch the audio
+    - Returns 404 if the pyramid for a `peaks_id` has been evicted; upload the file again
+    
+    **Data Output (`?output=json|binary`):**
+    - Returns the window's downsampled peaks instead of a PNG so clients can draw it
+    - int16 array of shape (3, columns): rows are min, max and RMS per column
+    - Header carries sample_rate, duration, start, end and peaks_id
     
     **Use Cases:**
     - Audio analysis and visualization
@@ -215,18 +666,45 @@ def health_check(request):
             'audio_file': openapi.Schema(
                 type=openapi.TYPE_FILE,
                 description="Audio file to visualize. Accepts all supported formats: mp3, mp4, wav, flac, aac, ogg, wma, m4a, aiff"
+            ),
+            'asset_id': ASSET_ID_PROPERTY,
+            'peaks_id': openapi.Schema(
+                type=openapi.TYPE_STRING,
+                description="X-Peaks-Id of a previously rendered file; replaces audio_file for window renders"
+            ),
+            'start': openapi.Schema(
+                type=openapi.TYPE_NUMBER,
+                description="Window start in seconds (default 0)"
+            ),
+            'end': openapi.Schema(
+                type=openapi.TYPE_NUMBER,
+                description="Window end in seconds (default: end of file)"
+            ),
+            'duration': openapi.Schema(
+                type=openapi.TYPE_NUMBER,
+                description="Window length in seconds; alternative to end"
+            ),
+            'width': openapi.Schema(
+                type=openapi.TYPE_INTEGER,
+                description="Window image width in pixels (320-8192, default 1800)"
             )
-        },
-        required=['audio_file']
+        }
     ),
+    manual_parameters=[OUTPUT_PARAMETER, ASYNC_PARAMETER, IF_NONE_MATCH_PARAMETER],
     responses={
         200: openapi.Response(
             description="Success - PNG waveform image ready for download",
             headers={
                 'Content-Type': openapi.Schema(type=openapi.TYPE_STRING, example='image/png'),
-                'Content-Disposition': openapi.Schema(type=openapi.TYPE_STRING, example='attachment; filename="audio_waveform.png"')
+                'Content-Disposition': openapi.Schema(type=openapi.TYPE_STRING, example='attachment; filename="audio_waveform.png"'),
+                'X-Peaks-Id': openapi.Schema(type=openapi.TYPE_STRING, example='9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08')
             }
         ),
+        202: JOB_ACCEPTED_RESPONSE,
+        304: NOT_MODIFIED_RESPONSE,
+        404: openapi.Response(
+            description="Not Found - No peak pyramid stored for the given peaks_id, or unknown or expired asset_id"
+        ),
         400: openapi.Response(
             description="Bad Request - Missing or invalid audio file",
             schema=openapi.Schema(
@@ -250,7 +728,9 @@ def health_check(request):
                     )
                 }
             )
-        )
+        ),
+        429: QUEUE_FULL_RESPONSE,
+        413: UPLOAD_TOO_LARGE_RESPONSE
     },
     consumes=['multipart/form-data'],
     tags=['Audio Visualization']
@@ -258,23 +738,50 @@ def health_check(request):
 @api_view(['POST'])
 def generate_waveform(request):
     try:
-        if 'audio_file' not in request.FILES:
-            return JsonResponse({'error': 'No audio file provided'}, status=400)
+        peaks_id = request.data.get('peaks_id', request.GET.get('peaks_id'))
+        audio_file, error = _audio_input(request, required=not peaks_id)
+        if error is not None:
+            return error
+        
+        try:
+            window = _parse_window(request)
+            output_format = _output_format(request)
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+        
+        # Data output is always served from the peak pyramid
+        if peaks_id or window or output_format != 'png':
+            return _waveform_window(request, audio_file, peaks_id, window, output_format)
+        
+        key = _result_key('waveform', audio_file)
+        not_modified = _not_modified(request, key)
+        if not_modified is not None:
+            return not_modified
         
-        audio_file = request.FILES['audio_file']
+        if _wants_async(request):
+            return _enqueue_job('waveform', audio_file)
         
-        if not audio_file.name:
-            return JsonResponse({'error': 'Invalid file'}, status=400)
+        peaks_id = content_digest(audio_file)
         
-        waveform_data = WaveformGenerator.generate_waveform_from_file(audio_file, audio_file.name)
+        def render():
+            # Build the zoom pyramid alongside the full render so follow-up
+            # window requests can use X-Peaks-Id without re-uploading
+            _build_peaks(audio_file, peaks_id)
+            return WaveformGenerator.generate_waveform_from_file(audio_file, audio_file.name)
+        
+        waveform_data = result_cache.get_or_compute(key, render)
         
         filename = audio_file.name.rsplit(".", 1)[0] + "_waveform.png"
         response = HttpResponse(waveform_data, content_type='image/png')
         response['Content-Disposition'] = f'attachment; filename="{filename}"'
         response['Content-Length'] = len(waveform_data)
         response['Cache-Control'] = 'no-cache'
+        response['ETag'] = f'"{key}"'
+        response['X-Peaks-Id'] = peaks_id
         return response
         
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
     except Exception as e:
         return JsonResponse({'error': 'Waveform generation failed'}, status=500)
 
@@ -297,6 +804,8 @@ def generate_waveform(request):
     - Hop Length: 512 samples
     - Frequency Range: 20 Hz to Nyquist frequency
     - Color Scale: Viridis colormap with dB magnitude
+    - Streaming analysis: audio is read and transformed block by block, with frames
+      max-pooled in time to the image width, so memory use does not grow with duration
     
     **Supported Input Formats:**
     - All formats: MP3, MP4, WAV, FLAC, AAC, OGG, WMA, M4A, AIFF
@@ -306,6 +815,19 @@ def generate_waveform(request):
     - Dimensions: 14x8 inches at 150 DPI
     - Includes title, axis labels, colorbar, and grid for professional appearance
     
+    **Data Output (`?output=json|binary`):**
+    - Returns the dB spectrogram as a uint8 matrix instead of a PNG so clients can draw it
+    - Shape (1 + n_fft/2, columns): rows are linear FFT bins from 0 Hz to Nyquist
+    - 0..255 maps linearly to db_min..db_max (-80..0 dB relative to the peak)
+    - `?async=1` only applies to PNG output
+    
+    **Time Range:**
+    - Pass `start` and/or `duration` (seconds) to analyze only that part of the file;
+      WAV, FLAC, OGG and AIFF seek straight to `start`, so the work done is proportional
+      to the window, not the file
+    - The time axis (and `start`/`end` in data output) is in seconds from the start of the file
+    - `?async=1` is ignored for time-ranged requests
+    
     **Use Cases:**
     - Audio frequency analysis
     - Music production and mastering
@@ -319,10 +841,13 @@ def generate_waveform(request):
             'audio_file': openapi.Schema(
                 type=openapi.TYPE_FILE,
                 description="Audio file to analyze. Accepts all supported formats: mp3, mp4, wav, flac, aac, ogg, wma, m4a, aiff"
-            )
-        },
-        required=['audio_file']
+            ),
+            'asset_id': ASSET_ID_PROPERTY,
+            'start': START_PROPERTY,
+            'duration': DURATION_PROPERTY
+        }
     ),
+    manual_parameters=[OUTPUT_PARAMETER, ASYNC_PARAMETER, IF_NONE_MATCH_PARAMETER],
     responses={
         200: openapi.Response(
             description="Success - PNG spectrogram image ready for download",
@@ -331,6 +856,8 @@ def generate_waveform(request):
                 'Content-Disposition': openapi.Schema(type=openapi.TYPE_STRING, example='attachment; filename="audio_spectrogram.png"')
             }
         ),
+        202: JOB_ACCEPTED_RESPONSE,
+        304: NOT_MODIFIED_RESPONSE,
         400: openapi.Response(
             description="Bad Request - Missing or invalid audio file",
             schema=openapi.Schema(
@@ -354,7 +881,10 @@ def generate_waveform(request):
                     )
                 }
             )
-        )
+        ),
+        429: QUEUE_FULL_RESPONSE,
+        404: ASSET_NOT_FOUND_RESPONSE,
+        413: UPLOAD_TOO_LARGE_RESPONSE
     },
     consumes=['multipart/form-data'],
     tags=['Audio Visualization']
@@ -362,23 +892,57 @@ def generate_waveform(request):
 @api_view(['POST'])
 def generate_spectrogram(request):
     try:
-        if 'audio_file' not in request.FILES:
-            return JsonResponse({'error': 'No audio file provided'}, status=400)
+        audio_file, error = _audio_input(request)
+        if error is not None:
+            return error
+        
+        try:
+            output_format = _output_format(request)
+            start, duration = time_range = _parse_range(request)
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+        ranged = time_range != (0.0, None)
         
-        audio_file = request.FILES['audio_file']
+        if output_format == 'png':
+            key = _result_key('spectrogram', audio_file, time_range)
+        else:
+            params = dict(result_params('spectrogram', audio_file.name), output=output_format)
+            if ranged:
+                params.update(start=start, duration=duration)
+            key = ResultCache.make_key(content_digest(audio_file), 'spectrogram', params)
+        not_modified = _not_modified(request, key)
+        if not_modified is not None:
+            return not_modified
         
-        if not audio_file.name:
-            return JsonResponse({'error': 'Invalid file'}, status=400)
+        if output_format == 'png' and _wants_async(request) and not ranged:
+            return _enqueue_job('spectrogram', audio_file)
         
-        spectrogram_data = SpectrogramGenerator.generate_spectrogram_from_file(audio_file, audio_file.name)
+        def compute():
+            if ranged:
+                S, sr, frames_per_column, clipped = SpectrogramGenerator.magnitude_range_from_file(
+                    audio_file, audio_file.name, start, duration
+                )
+                if output_format == 'png':
+                    return SpectrogramGenerator.render_magnitude(S, sr, frames_per_column, audio_file.name, clipped)
+                matrix, meta = SpectrogramGenerator.magnitude_data(S, sr, frames_per_column, clipped)
+                return encode_array_payload(meta, matrix, output_format)
+            if output_format == 'png':
+                return SpectrogramGenerator.generate_spectrogram_from_file(audio_file, audio_file.name)
+            matrix, meta = SpectrogramGenerator.spectrogram_data_from_file(audio_file, audio_file.name)
+            return encode_array_payload(meta, matrix, output_format)
         
-        filename = audio_file.name.rsplit(".", 1)[0] + "_spectrogram.png"
-        response = HttpResponse(spectrogram_data, content_type='image/png')
+        spectrogram_data = result_cache.get_or_compute(key, compute)
+        
+        filename = output_filename(audio_file.name.rsplit(".", 1)[0], 'spectrogram', output_format)
+        response = HttpResponse(spectrogram_data, content_type=CONTENT_TYPES[output_format])
         response['Content-Disposition'] = f'attachment; filename="{filename}"'
         response['Content-Length'] = len(spectrogram_data)
         response['Cache-Control'] = 'no-cache'
+        response['ETag'] = f'"{key}"'
         return response
         
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
     except Exception as e:
         return JsonResponse({'error': 'Spectrogram generation failed'}, status=500)
 
@@ -411,7 +975,12 @@ def generate_spectrogram(request):
     - Automatic format conversion to WAV using librosa (no ffmpeg required)
     - Seamless processing of all supported audio formats
     - Handles various audio qualities and lengths
+    - Long recordings are split on silence into chunks of at most 30 seconds,
+      recognized in parallel and stitched back together with per-segment timestamps
     - Error handling for unclear speech or API issues
+    - Pass `start` and/or `duration` (seconds) to transcribe only that part of the file;
+      segment timestamps stay relative to the start of the file
+      (`?async=1` is ignored for time-ranged requests)
     
     **Use Cases:**
     - Voice note transcription
@@ -428,14 +997,17 @@ def generate_spectrogram(request):
                 type=openapi.TYPE_FILE,
                 description="Audio file containing speech to transcribe. Supports all audio formats: mp3, mp4, wav, flac, aac, ogg, wma, m4a, aiff. Non-WAV files are automatically converted."
             ),
+            'asset_id': ASSET_ID_PROPERTY,
+            'start': START_PROPERTY,
+            'duration': DURATION_PROPERTY,
             'language': openapi.Schema(
                 type=openapi.TYPE_STRING,
                 description="Language code for speech recognition (e.g., 'en-US', 'es-ES', 'fr-FR'). Defaults to 'en-US'",
                 default='en-US'
             )
-        },
-        required=['audio_file']
+        }
     ),
+    manual_parameters=[ASYNC_PARAMETER],
     responses={
         200: openapi.Response(
             description="Success - Transcribed text returned",
@@ -453,6 +1025,17 @@ def generate_spectrogram(request):
                     'filename': openapi.Schema(
                         type=openapi.TYPE_STRING,
                         example="audio_sample.mp3"
+                    ),
+                    'segments': openapi.Schema(
+                        type=openapi.TYPE_ARRAY,
+                        items=openapi.Schema(
+                            type=openapi.TYPE_OBJECT,
+                            properties={
+                                'start': openapi.Schema(type=openapi.TYPE_NUMBER, example=0.0),
+                                'end': openapi.Schema(type=openapi.TYPE_NUMBER, example=3.42),
+                                'text': openapi.Schema(type=openapi.TYPE_STRING, example="Hello, this is a sample transcription")
+                            }
+                        )
                     )
                 }
             ),
@@ -460,10 +1043,15 @@ def generate_spectrogram(request):
                 "application/json": {
                     "transcription": "Hello, this is a sample transcription of the audio file.",
                     "language": "en-US",
-                    "filename": "audio_sample.mp3"
+                    "filename": "audio_sample.mp3",
+                    "segments": [
+                        {"start": 0.0, "end": 3.42, "text": "Hello, this is a sample transcription"},
+                        {"start": 4.1, "end": 5.26, "text": "of the audio file."}
+                    ]
                 }
             }
         ),
+        202: JOB_ACCEPTED_RESPONSE,
         400: openapi.Response(
             description="Bad Request - Missing file or transcription error",
             schema=openapi.Schema(
@@ -487,7 +1075,10 @@ def generate_spectrogram(request):
                     )
                 }
             )
-        )
+        ),
+        429: QUEUE_FULL_RESPONSE,
+        404: ASSET_NOT_FOUND_RESPONSE,
+        413: UPLOAD_TOO_LARGE_RESPONSE
     },
     consumes=['multipart/form-data'],
     tags=['Audio Processing']
@@ -495,22 +1086,25 @@ def generate_spectrogram(request):
 @api_view(['POST'])
 def transcribe_audio(request):
     try:
-        if 'audio_file' not in request.FILES:
-            return JsonResponse({'error': 'No audio file provided'}, status=400)
-        
-        audio_file = request.FILES['audio_file']
-        
-        if not audio_file.name:
-            return JsonResponse({'error': 'Invalid file'}, status=400)
+        audio_file, error = _audio_input(request)
+        if error is not None:
+            return error
         
         language = request.POST.get('language', 'en-US')
+        start, duration = time_range = _parse_range(request)
+        
+        if _wants_async(request) and time_range == (0.0, None):
+            return _enqueue_job('transcribe', audio_file, {'language': language})
         
-        transcription = AudioTranscriber.transcribe_audio_from_file(audio_file, audio_file.name, language)
+        segments = AudioTranscriber.transcribe_segments(
+            audio_file, audio_file.name, language, start=start, duration=duration
+        )
         
         return JsonResponse({
-            'transcription': transcription,
+            'transcription': AudioTranscriber.join_segments(segments),
             'language': language,
-            'filename': audio_file.name
+            'filename': audio_file.name,
+            'segments': segments
         })
         
     except ValueError as e:
@@ -522,6 +1116,84 @@ def transcribe_audio(request):
         return JsonResponse({'error': f'Transcription failed: {str(e)}'}, status=500)
 
 
+@swagger_auto_schema(
+    method='post',
+    operation_summary="Get Audio File Information",
+    operation_description="""
+    Read a file's format, codec, duration, sample rate, channel count and bit depth from its
+    container headers, without decoding any audio.
+    
+    **Technical Details:**
+    - WAV, FLAC, OGG, MP3 and AIFF headers are read with libsndfile; MP4/M4A boxes are walked
+      without reading the media data, so even multi-GB files answer in milliseconds
+      (use `asset_id` to skip the upload as well)
+    - WAV, AIFF and MP4 report the length their header declares
+    - `bit_depth` is null for lossy codecs
+    - Returns 400 for containers whose headers cannot be parsed (e.g. WMA, raw AAC)
+    
+    **Use Cases:**
+    - Estimating processing cost before committing to a conversion or analysis
+    - Choosing `start`/`duration` ranges for the processing endpoints
+    """,
+    request_body=openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        properties={
+            'audio_file': openapi.Schema(
+                type=openapi.TYPE_FILE,
+                description="Audio file to inspect. Supports: mp3, mp4, wav, flac, ogg, m4a, aiff"
+            ),
+            'asset_id': ASSET_ID_PROPERTY
+        }
+    ),
+    responses={
+        200: openapi.Response(
+            description="Success - Header information",
+            examples={
+                "application/json": {
+                    "filename": "field_recording.flac",
+                    "size": 2147483648,
+                    "format": "flac",
+                    "codec": "PCM_24",
+                    "duration": 10823.4,
+                    "sample_rate": 48000,
+                    "channels": 2,
+                    "bit_depth": 24,
+                    "frames": 519523200
+                }
+            }
+        ),
+        400: openapi.Response(
+            description="Bad Request - Missing file or unreadable header",
+            schema=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'error': openapi.Schema(
+                        type=openapi.TYPE_STRING,
+                        example="Could not read the audio header of recording.wma"
+                    )
+                }
+            )
+        ),
+        404: ASSET_NOT_FOUND_RESPONSE,
+        413: UPLOAD_TOO_LARGE_RESPONSE
+    },
+    consumes=['multipart/form-data'],
+    tags=['Audio Processing']
+)
+@api_view(['POST'])
+def audio_info(request):
+    audio_file, error = _audio_input(request)
+    if error is not None:
+        return error
+    
+    with stage_timer('info', 'probe'):
+        info = probe(upload_source(audio_file))
+    if info is None:
+        return JsonResponse({'error': f'Could not read the audio header of {audio_file.name}'}, status=400)
+    
+    return JsonResponse(dict({'filename': audio_file.name, 'size': audio_file.size}, **info))
+
+
 @swagger_auto_schema(
     method='get',
     operation_summary="Get Supported Languages for Transcription",
@@ -585,4 +1257,582 @@ def transcribe_audio(request):
 @api_view(['GET'])
 def supported_languages(request):
     languages = AudioTranscriber.get_supported_languages()
-    return JsonResponse({'supported_languages': languages})
\ No newline at end of file
+    return JsonResponse({'supported_languages': languages})
+
+@swagger_auto_schema(
+    method='post',
+    operation_summary="Batch Process Many Audio Files",
+    operation_description="""
+    Run conversion and/or visualization on many audio files in a single request.
+    
+    **Input:**
+    - Any number of `audio_file` parts, and/or `.zip` archives of audio files
+    - `operations`: comma-separated list of `convert`, `waveform`, `spectrogram`
+    
+    **Behavior:**
+    - Work is spread across a local process pool (`BATCH_WORKERS`)
+    - Results are streamed back as a zip archive as soon as each one finishes
+    - Files already in WAV format are skipped for `convert`
+    - Zip archives are held to the upload limits: at most `BATCH_MAX_FILES` members, and their
+      declared sizes, each and in total, within `MAX_UPLOAD_BYTES` (413 otherwise); a member over
+      `MAX_AUDIO_SECONDS` is reported as failed with status code 413
+    - A failing file does not abort the batch, nor does a worker process dying (e.g. out of memory):
+      the files it was running are reported as failed and the pool is restarted for the rest
+    
+    **Output:**
+    - ZIP archive with one member per produced file (same names as the single-file endpoints)
+    - `manifest.json` listing every file/operation with `status` (`done`, `failed`, `skipped`),
+      the zip member name or the error message
+    """,
+    request_body=openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        properties={
+            'audio_file': openapi.Schema(
+                type=openapi.TYPE_ARRAY,
+                items=openapi.Schema(type=openapi.TYPE_FILE),
+                description="Audio files (repeat the field) or zip archives of audio files"
+            ),
+            'operations': openapi.Schema(
+                type=openapi.TYPE_STRING,
+                description="Comma-separated operations: convert, waveform, spectrogram",
+                example="convert,waveform"
+            )
+        },
+        required=['audio_file', 'operations']
+    ),
+    responses={
+        200: openapi.Response(
+            description="Success - Streamed ZIP archive of results plus manifest.json",
+            headers={
+                'Content-Type': openapi.Schema(type=openapi.TYPE_STRING, example='application/zip'),
+                'Content-Disposition': openapi.Schema(type=openapi.TYPE_STRING, example='attachment; filename="batch_results.zip"')
+            }
+        ),
+        400: openapi.Response(
+            description="Bad Request - No files or invalid operations",
+            schema=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'error': openapi.Schema(
+                        type=openapi.TYPE_STRING,
+                        example="Unsupported batch operation: transcribe"
+                    )
+                }
+            )
+        ),
+        413: UPLOAD_TOO_LARGE_RESPONSE
+    },
+    consumes=['multipart/form-data'],
+    tags=['Batch Processing']
+)
+@api_view(['POST'])
+def batch_process(request):
+    uploads = request.FILES.getlist('audio_file')
+    if not uploads:
+        return JsonResponse({'error': 'No audio file provided'}, status=400)
+    
+    try:
+        operations = parse_operations(request.POST.getlist('operations'))
+        inputs = expand_uploads(uploads)
+    except UploadRejected as e:
+        return rejection_response(e)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    except zipfile.BadZipFile:
+        return JsonResponse({'error': 'Invalid zip archive'}, status=400)
+    
+    if not inputs:
+        return JsonResponse({'error': 'No audio file provided'}, status=400)
+    
+    response = StreamingHttpResponse(batch_processor.stream(inputs, operations), content_type='application/zip')
+    response['Content-Disposition'] = 'attachment; filename="batch_results.zip"'
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
+@swagger_auto_schema(
+    method='post',
+    operation_summary="Analyze One Audio File (All Outputs)",
+    operation_description="""
+    Produce any combination of WAV conversion, waveform, spectrogram and transcription from a
+    single upload in a single request.
+    
+    **Behavior:**
+    - The file is decoded once; every requested output is computed from that one buffer
+    - Outputs run in parallel (`ANALYZE_WORKERS`) and are streamed into the zip as each one finishes
+    - Results already cached by the single-file endpoints are returned without recomputing,
+      and new results are cached for them; if everything is cached the file is not decoded at all
+    - A failing output (e.g. no recognizable speech) does not abort the others
+    - `convert` is skipped for files already in WAV format
+    
+    **Input:**
+    - `audio_file`: the audio file
+    - `outputs`: comma-separated list of `convert`, `waveform`, `spectrogram`, `transcribe` (default: all)
+    - `output`: `png` (default), `json` or `binary` for the waveform and spectrogram, same as their endpoints
+    - `language`: transcription language code (default `en-US`)
+    
+    **Output:**
+    - ZIP archive with one member per produced output, named as the single-file endpoints name them
+      (`<name>.wav`, `<name>_waveform.png`, `<name>_spectrogram.bin`, `<name>_transcription.json`, ...)
+    - `manifest.json`: `filename`, `duration`, `sample_rate`, `peaks_id` (for `/waveform/` window requests)
+      and `results`, one entry per output with `status` (`done`, `failed`, `skipped`), the zip member
+      name or the error message and its status code
+    """,
+    request_body=openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        properties={
+            'audio_file': openapi.Schema(
+                type=openapi.TYPE_FILE,
+                description="Audio file to analyze"
+            ),
+            'asset_id': ASSET_ID_PROPERTY,
+            'outputs': openapi.Schema(
+                type=openapi.TYPE_STRING,
+                description="Comma-separated outputs: convert, waveform, spectrogram, transcribe",
+                example="waveform,spectrogram,transcribe"
+            ),
+            'language': openapi.Schema(
+                type=openapi.TYPE_STRING,
+                description="Language code for transcription",
+                example="en-US",
+                default="en-US"
+            )
+        }
+    ),
+    manual_parameters=[OUTPUT_PARAMETER],
+    responses={
+        200: openapi.Response(
+            description="Success - Streamed ZIP archive of the outputs plus manifest.json",
+            headers={
+                'Content-Type': openapi.Schema(type=openapi.TYPE_STRING, example='application/zip'),
+                'Content-Disposition': openapi.Schema(type=openapi.TYPE_STRING, example='attachment; filename="audio_sample_analysis.zip"')
+            }
+        ),
+        400: openapi.Response(
+            description="Bad Request - Missing file, invalid outputs or output format, or undecodable audio",
+            schema=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'error': openapi.Schema(
+                        type=openapi.TYPE_STRING,
+                        example="Unsupported analysis output: peaks (choose from convert, waveform, spectrogram, transcribe)"
+                    )
+                }
+            )
+        ),
+        404: ASSET_NOT_FOUND_RESPONSE,
+        413: UPLOAD_TOO_LARGE_RESPONSE
+    },
+    consumes=['multipart/form-data'],
+    tags=['Audio Processing']
+)
+@api_view(['POST'])
+def analyze_audio(request):
+    audio_file, error = _audio_input(request)
+    if error is not None:
+        return error
+    
+    file_extension = audio_file.name.split('.')[-1].lower()
+    if file_extension not in AudioConverter.SUPPORTED_FORMATS:
+        return JsonResponse({'error': f'Unsupported audio format: {file_extension}'}, status=400)
+    
+    try:
+        outputs = parse_outputs(request.POST.getlist('outputs'))
+        output_format = _output_format(request)
+        language = request.POST.get('language', 'en-US')
+        analysis = audio_analyzer.analyze(audio_file, outputs, output_format, language)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    
+    filename = audio_file.name.rsplit(".", 1)[0] + "_analysis.zip"
+    response = StreamingHttpResponse(analysis, content_type='application/zip')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
+@swagger_auto_schema(
+    method='get',
+    operation_summary="Get Async Job Status or Result",
+    operation_description="""
+    Poll a job created by POSTing to `/convert/`, `/waveform/`, `/spectrogram/` or `/transcribe/` with `?async=1`.
+    
+    **Behavior:**
+    - While the job is `queued` or `running`: Returns JSON status
+    - When the job is `done`: Returns the same payload the synchronous endpoint would
+      (WAV/PNG download, or transcription JSON)
+    - When the job has `failed`: Returns JSON with the error and the status code the
+      synchronous endpoint would have used
+    
+    **Retention:**
+    - Finished jobs are kept for a limited time (`JOB_RESULT_TTL`, default 600 seconds)
+    """,
+    responses={
+        200: openapi.Response(
+            description="Job status, or the finished result",
+            examples={
+                "application/json": {
+                    "job_id": "3f2b9c1e8d7a4f60a1b2c3d4e5f60718",
+                    "operation": "spectrogram",
+                    "filename": "podcast.mp3",
+                    "status": "running"
+                }
+            }
+        ),
+        404: openapi.Response(
+            description="Not Found - Unknown or expired job id",
+            schema=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'error': openapi.Schema(
+                        type=openapi.TYPE_STRING,
+                        example="Job not found"
+                    )
+                }
+            )
+        )
+    },
+    tags=['Jobs']
+)
+@api_view(['GET'])
+def job_status(request, job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return JsonResponse({'error': 'Job not found'}, status=404)
+    
+    status = job.status
+    if status in ('queued', 'running'):
+        return JsonResponse(job.to_dict())
+    
+    if status == 'failed':
+        error = job.future.exception()
+        return JsonResponse(job.to_dict(), status=getattr(error, 'status_code', 500))
+    
+    result = job.future.result()
+    if 'json' in result:
+        return JsonResponse(result['json'])
+    
+    response = HttpResponse(result['content'], content_type=result['content_type'])
+    response['Content-Disposition'] = f'attachment; filename="{result["filename"]}"'
+    response['Content-Length'] = len(result['content'])
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
+ASSET_SCHEMA = openapi.Schema(
+    type=openapi.TYPE_OBJECT,
+    properties={
+        'asset_id': openapi.Schema(type=openapi.TYPE_STRING, example='9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08'),
+        'filename': openapi.Schema(type=openapi.TYPE_STRING, example='field_recording.flac'),
+        'size': openapi.Schema(type=openapi.TYPE_INTEGER, example=524288000),
+        'created_at': openapi.Schema(type=openapi.TYPE_NUMBER, example=1760000000.0),
+        'expires_at': openapi.Schema(type=openapi.TYPE_NUMBER, example=1760086400.0, x_nullable=True)
+    }
+)
+
+
+@swagger_auto_schema(
+    method='post',
+    operation_summary="Upload an Audio Asset",
+    operation_description="""
+    Store an audio file on the server once and get an `asset_id` back.
+    
+    Pass `asset_id` instead of `audio_file` to `/convert/`, `/waveform/`, `/spectrogram/`,
+    `/transcribe/` or `/analyze/` so follow-up operations do not upload the file again.
+    
+    **Behavior:**
+    - The id is the SHA-256 of the content: uploading the same bytes again returns the same
+      asset (200) instead of storing a second copy (201)
+    - Assets expire `ASSET_TTL` seconds (default 24 hours) after they were last uploaded or used
+    - The usual upload limits apply
+    """,
+    request_body=openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        properties={
+            'audio_file': openapi.Schema(
+                type=openapi.TYPE_FILE,
+                description="Audio file to store. Supports: mp3, mp4, wav, flac, aac, ogg, wma, m4a, aiff"
+            )
+        },
+        required=['audio_file']
+    ),
+    responses={
+        200: openapi.Response(description="Already stored - The existing asset, with its lifetime extended", schema=ASSET_SCHEMA),
+        201: openapi.Response(description="Created - The file was stored", schema=ASSET_SCHEMA),
+        400: openapi.Response(
+            description="Bad Request - Missing file or unsupported format",
+            schema=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'error': openapi.Schema(
+                        type=openapi.TYPE_STRING,
+                        example="No audio file provided"
+                    )
+                }
+            )
+        ),
+        413: UPLOAD_TOO_LARGE_RESPONSE
+    },
+    consumes=['multipart/form-data'],
+    tags=['Assets']
+)
+@api_view(['POST'])
+def upload_asset(request):
+    audio_file = request.FILES.get('audio_file')
+    if audio_file is None:
+        return JsonResponse({'error': 'No audio file provided'}, status=400)
+    
+    if not audio_file.name:
+        return JsonResponse({'error': 'Invalid file'}, status=400)
+    
+    file_extension = audio_file.name.split('.')[-1].lower()
+    if file_extension not in AudioConverter.SUPPORTED_FORMATS:
+        return JsonResponse({'error': f'Unsupported audio format: {file_extension}'}, status=400)
+    
+    asset, created = asset_store.put(audio_file)
+    return JsonResponse(asset, status=201 if created else 200)
+
+
+@swagger_auto_schema(
+    method='get',
+    operation_summary="Get an Audio Asset",
+    operation_description="Return the stored metadata of an asset and extend its lifetime.",
+    responses={
+        200: openapi.Response(description="The asset", schema=ASSET_SCHEMA),
+        404: ASSET_NOT_FOUND_RESPONSE
+    },
+    tags=['Assets']
+)
+@swagger_auto_schema(
+    method='delete',
+    operation_summary="Delete an Audio Asset",
+    operation_description="Remove a stored asset before it expires.",
+    responses={
+        204: openapi.Response(description="Deleted"),
+        404: ASSET_NOT_FOUND_RESPONSE
+    },
+    tags=['Assets']
+)
+@api_view(['GET', 'DELETE'])
+def asset_detail(request, asset_id):
+    if request.method == 'DELETE':
+        if not asset_store.delete(asset_id):
+            return JsonResponse({'error': 'Unknown or expired asset_id'}, status=404)
+        return HttpResponse(status=204)
+    
+    asset = asset_store.get(asset_id)
+    if asset is None:
+        return JsonResponse({'error': 'Unknown or expired asset_id'}, status=404)
+    return JsonResponse(asset)
+
+UPLOAD_SESSION_SCHEMA = openapi.Schema(
+    type=openapi.TYPE_OBJECT,
+    properties={
+        'upload_id': openapi.Schema(type=openapi.TYPE_STRING, example='6f1c2d3e4b5a69788796a5b4c3d2e1f0'),
+        'upload_url': openapi.Schema(type=openapi.TYPE_STRING, example='/uploads/6f1c2d3e4b5a69788796a5b4c3d2e1f0/'),
+        'filename': openapi.Schema(type=openapi.TYPE_STRING, example='field_recording.flac'),
+        'size': openapi.Schema(type=openapi.TYPE_INTEGER, example=2147483648),
+        'offset': openapi.Schema(type=openapi.TYPE_INTEGER, description="Bytes stored so far; the next chunk starts here", example=1073741824),
+        'duration': openapi.Schema(type=openapi.TYPE_NUMBER, description="From the file header, once it has arrived", example=10800.0, x_nullable=True),
+        'sha256': openapi.Schema(type=openapi.TYPE_STRING, x_nullable=True)
+    }
+)
+
+UPLOAD_NOT_FOUND_RESPONSE = openapi.Response(
+    description="Not Found - Unknown, expired or already finalized upload",
+    schema=openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        properties={
+            'error': openapi.Schema(
+                type=openapi.TYPE_STRING,
+                example="Unknown upload"
+            )
+        }
+    )
+)
+
+UPLOAD_CONFLICT_RESPONSE = openapi.Response(
+    description="Conflict - The chunk does not start at the current offset, or the upload is incomplete; "
+                "resume from `offset`",
+    examples={
+        "application/json": {
+            "error": "Expected the chunk starting at byte 1048576",
+            "offset": 1048576
+        }
+    }
+)
+
+
+def _upload_state(state):
+    info = {name: state[name] for name in ('upload_id', 'filename', 'size', 'offset', 'duration', 'sha256')}
+    info['upload_url'] = f"/uploads/{state['upload_id']}/"
+    return info
+
+
+def _upload_error(error):
+    body = {'error': str(error)}
+    if getattr(error, 'offset', None) is not None:
+        body['offset'] = error.offset
+    return JsonResponse(body, status=error.status_code)
+
+
+@swagger_auto_schema(
+    method='post',
+    operation_summary="Start a Resumable Upload",
+    operation_description="""
+    Start uploading a large file in chunks, so a dropped connection only costs the chunk in flight.
+    
+    **Protocol:**
+    1. `POST /uploads/` with `filename`, `size` (total bytes) and optionally `sha256` of the whole file
+    2. `PUT /uploads/<upload_id>/` each chunk in order as the raw request body, with
+       `Content-Range: bytes <first>-<last>/<size>` and optionally `X-Chunk-SHA256`
+    3. After an interruption, `GET /uploads/<upload_id>/` and continue from `offset`
+    4. `POST /uploads/<upload_id>/complete/` to verify the file and turn it into an asset;
+       use the returned `asset_id` with any processing endpoint
+    
+    **Limits:**
+    - `size` is checked against `MAX_UPLOAD_BYTES` here, and the duration against `MAX_AUDIO_SECONDS`
+      as soon as the header has arrived (413, and the upload is discarded)
+    - Unfinished uploads are deleted `UPLOAD_SESSION_TTL` seconds after their last chunk
+    """,
+    request_body=openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        properties={
+            'filename': openapi.Schema(type=openapi.TYPE_STRING, example='field_recording.flac'),
+            'size': openapi.Schema(type=openapi.TYPE_INTEGER, description="Total file size in bytes", example=2147483648),
+            'sha256': openapi.Schema(type=openapi.TYPE_STRING, description="Optional SHA-256 (hex) of the whole file, verified on completion")
+        },
+        required=['filename', 'size']
+    ),
+    responses={
+        201: openapi.Response(description="Created - Upload session", schema=UPLOAD_SESSION_SCHEMA),
+        400: openapi.Response(
+            description="Bad Request - Missing filename or size, or unsupported format",
+            schema=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'error': openapi.Schema(
+                        type=openapi.TYPE_STRING,
+                        example="size (total bytes) is required"
+                    )
+                }
+            )
+        ),
+        413: UPLOAD_TOO_LARGE_RESPONSE
+    },
+    tags=['Assets']
+)
+@api_view(['POST'])
+def create_upload(request):
+    filename = request.data.get('filename', '')
+    file_extension = filename.split('.')[-1].lower()
+    if filename and file_extension not in AudioConverter.SUPPORTED_FORMATS:
+        return JsonResponse({'error': f'Unsupported audio format: {file_extension}'}, status=400)
+    
+    try:
+        size = request.data.get('size')
+        size = int(size) if size not in (None, '') else None
+    except (TypeError, ValueError):
+        return JsonResponse({'error': f'Invalid size: {size}'}, status=400)
+    
+    try:
+        state = resumable_uploads.create(filename, size, request.data.get('sha256'))
+    except (ResumableUploadError, UploadRejected) as e:
+        return _upload_error(e)
+    return JsonResponse(_upload_state(state), status=201)
+
+
+@swagger_auto_schema(
+    method='get',
+    operation_summary="Get Resumable Upload Progress",
+    operation_description="Return how many bytes have been stored (`offset`); resume by sending the chunk that starts there.",
+    responses={
+        200: openapi.Response(description="Upload session", schema=UPLOAD_SESSION_SCHEMA),
+        404: UPLOAD_NOT_FOUND_RESPONSE
+    },
+    tags=['Assets']
+)
+@swagger_auto_schema(
+    method='put',
+    operation_summary="Upload a Chunk",
+    operation_description="""
+    Append one chunk, sent as the raw request body (`Content-Type: application/octet-stream`).
+    
+    - `Content-Range: bytes <first>-<last>/<size>` is required and must start at the current `offset`
+    - Re-sending a chunk that was already stored is accepted and changes nothing
+    - With `X-Chunk-SHA256`, a chunk whose checksum does not match is discarded (400)
+    """,
+    manual_parameters=[
+        openapi.Parameter('Content-Range', openapi.IN_HEADER, type=openapi.TYPE_STRING, required=True,
+                          description="bytes <first>-<last>/<size>, e.g. bytes 0-8388607/2147483648"),
+        openapi.Parameter('X-Chunk-SHA256', openapi.IN_HEADER, type=openapi.TYPE_STRING,
+                          description="Optional SHA-256 (hex) of this chunk")
+    ],
+    responses={
+        200: openapi.Response(description="Chunk stored", schema=UPLOAD_SESSION_SCHEMA),
+        400: openapi.Response(description="Bad Request - Missing or invalid Content-Range, short body or checksum mismatch"),
+        404: UPLOAD_NOT_FOUND_RESPONSE,
+        409: UPLOAD_CONFLICT_RESPONSE,
+        413: UPLOAD_TOO_LARGE_RESPONSE
+    },
+    tags=['Assets']
+)
+@swagger_auto_schema(
+    method='delete',
+    operation_summary="Cancel a Resumable Upload",
+    operation_description="Discard an unfinished upload and the bytes stored so far.",
+    responses={
+        204: openapi.Response(description="Deleted"),
+        404: UPLOAD_NOT_FOUND_RESPONSE
+    },
+    tags=['Assets']
+)
+@api_view(['GET', 'PUT', 'DELETE'])
+def upload_session(request, upload_id):
+    if request.method == 'DELETE':
+        if not resumable_uploads.delete(upload_id):
+            return JsonResponse({'error': 'Unknown upload'}, status=404)
+        return HttpResponse(status=204)
+    
+    try:
+        if request.method == 'GET':
+            state = resumable_uploads.status(upload_id)
+        else:
+            # The body is streamed to the part file, never read into memory
+            body = request.stream or io.BytesIO()
+            with stage_timer(endpoint_label(request), 'upload'):
+                state = resumable_uploads.write(
+                    upload_id, request.headers.get('Content-Range'), body, request.headers.get('X-Chunk-SHA256')
+                )
+    except (ResumableUploadError, UploadRejected) as e:
+        return _upload_error(e)
+    return JsonResponse(_upload_state(state))
+
+
+@swagger_auto_schema(
+    method='post',
+    operation_summary="Complete a Resumable Upload",
+    operation_description="""
+    Verify a fully uploaded file (against `sha256`, if one was given) and store it as an asset.
+    The upload session is removed; use the returned `asset_id` with the processing endpoints.
+    """,
+    responses={
+        201: openapi.Response(description="Created - The file is now an asset", schema=ASSET_SCHEMA),
+        200: openapi.Response(description="The same content was already stored as an asset", schema=ASSET_SCHEMA),
+        400: openapi.Response(description="Bad Request - The assembled file does not match sha256 (the upload is discarded)"),
+        404: UPLOAD_NOT_FOUND_RESPONSE,
+        409: UPLOAD_CONFLICT_RESPONSE
+    },
+    tags=['Assets']
+)
+@api_view(['POST'])
+def complete_upload(request, upload_id):
+    try:
+        part, state = resumable_uploads.finalize(upload_id)
+    except ResumableUploadError as e:
+        return _upload_error(e)
+    
+    with part:
+        asset, created = asset_store.put(part)
+    resumable_uploads.delete(upload_id)
+    return JsonResponse(asset, status=201 if created else 200)
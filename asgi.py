@@ -0,0 +1,36 @@
+"""ASGI entry point for production servers:
+    
+    uvicorn asgi:application --workers 4
+
+Uploads are received on the event loop; decode/DSP/render views run on the
+view executor (VIEW_WORKERS threads) and the lightweight informational
+endpoints answer straight from the loop, so they stay responsive while
+heavy requests are in flight.
+"""
+import os
+
+# Read by main.py when it configures Django
+os.environ.setdefault('ROOT_URLCONF', 'asgi')
+os.environ.setdefault('DEBUG', 'False')
+
+from django.core.asgi import get_asgi_application  # noqa: E402
+from django.urls import URLPattern  # noqa: E402
+
+import main  # noqa: E402
+from async_views import in_event_loop, offload  # noqa: E402
+
+
+LIGHT_VIEWS = {'supported_formats', 'health_check', 'export_metrics', 'supported_languages', 'job_status'}
+
+
+def _async_pattern(pattern: URLPattern) -> URLPattern:
+    # Only the API views are converted; the schema and docs views stay sync
+    if pattern.name.startswith('schema-'):
+        return pattern
+    wrap = in_event_loop if pattern.name in LIGHT_VIEWS else offload
+    return URLPattern(pattern.pattern, wrap(pattern.callback), pattern.default_args, pattern.name)
+
+
+urlpatterns = [_async_pattern(pattern) for pattern in main.urlpatterns]
+
+application = get_asgi_application()
\ No newline at end of file
@@ -0,0 +1,170 @@
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from typing import BinaryIO, Optional, Tuple
+
+from django.core.files import File
+from django.core.files.move import file_move_safe
+
+from audio_io import CHUNK_SIZE, content_digest
+
+
+ASSET_DIR = os.environ.get('ASSET_DIR', os.path.join(tempfile.gettempdir(), 'spectrolingua-assets'))
+# Seconds an asset is kept after it was last uploaded or used; 0 keeps assets forever
+ASSET_TTL = int(os.environ.get('ASSET_TTL', 24 * 3600))
+
+ASSET_ID_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+
+
+class AssetFile(File):
+    """A stored asset opened for the processing endpoints, in place of an uploaded file."""
+    
+    def __init__(self, path: str, name: str, asset_id: str):
+        super().__init__(open(path, 'rb'), name=name)
+        self.path = path
+        # Read by content_digest so the file is not hashed again
+        self.sha256 = asset_id
+    
+    def temporary_file_path(self) -> str:
+        return self.path
+
+
+class AssetStore:
+    """Content-addressed on-disk store of uploaded audio, so a file is uploaded once
+    and referenced by its asset id (the SHA-256 of its content) afterwards."""
+    
+    def __init__(self, directory: str = ASSET_DIR, ttl: int = ASSET_TTL):
+        self.directory = directory
+        self.ttl = ttl
+        self._lock = threading.Lock()
+    
+    def _path(self, asset_id: str) -> str:
+        return os.path.join(self.directory, asset_id[:2], asset_id)
+    
+    def _expired(self, mtime: float) -> bool:
+        return bool(self.ttl) and mtime < time.time() - self.ttl
+    
+    def _describe(self, asset_id: str, meta: dict, mtime: float) -> dict:
+        info = dict(meta, asset_id=asset_id)
+        info['expires_at'] = round(mtime + self.ttl, 3) if self.ttl else None
+        return info
+    
+    def put(self, upload: BinaryIO) -> Tuple[dict, bool]:
+        """Store an upload; returns its description and whether it was new.
+        
+        Uploads spooled to disk are moved into the store rather than copied.
+        """
+        asset_id = content_digest(upload)
+        path = self._path(asset_id)
+        
+        existing = self.get(asset_id)
+        if existing is not None:
+            return existing, False
+        
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            if hasattr(upload, 'temporary_file_path'):
+                os.close(fd)
+                file_move_safe(upload.temporary_file_path(), temp_path, allow_overwrite=True)
+            else:
+                with os.fdopen(fd, 'wb') as temp_file:
+                    upload.seek(0)
+                    for chunk in iter(lambda: upload.read(CHUNK_SIZE), b''):
+                        temp_file.write(chunk)
+            
+            meta = {'filename': upload.name, 'size': os.path.getsize(temp_path), 'created_at': round(time.time(), 3)}
+            # The asset only becomes visible once its metadata is written
+            os.replace(temp_path, path)
+            with open(path + '.json', 'w') as meta_file:
+                json.dump(meta, meta_file)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+        
+        self.cleanup()
+        return self._describe(asset_id, meta, os.path.getmtime(path)), True
+    
+    def get(self, asset_id: str, touch: bool = True) -> Optional[dict]:
+        if not ASSET_ID_PATTERN.match(asset_id or ''):
+            return None
+        
+        path = self._path(asset_id)
+        try:
+            mtime = os.path.getmtime(path)
+            with open(path + '.json') as meta_file:
+                meta = json.load(meta_file)
+        except (FileNotFoundError, ValueError):
+            return None
+        if self._expired(mtime):
+            return None
+        
+        # Using an asset extends its lifetime
+        if touch:
+            try:
+                os.utime(path)
+                mtime = os.path.getmtime(path)
+            except FileNotFoundError:
+                return None
+        return self._describe(asset_id, meta, mtime)
+    
+    def open(self, asset_id: str) -> Optional[AssetFile]:
+        info = self.get(asset_id)
+        if info is None:
+            return None
+        try:
+            return AssetFile(self._path(asset_id), info['filename'], asset_id)
+        except FileNotFoundError:
+            return None
+    
+    def delete(self, asset_id: str) -> bool:
+        if self.get(asset_id, touch=False) is None:
+            return False
+        
+        path = self._path(asset_id)
+        for name in (path, path + '.json'):
+            try:
+                os.unlink(name)
+            except FileNotFoundError:
+                pass
+        return True
+    
+    def cleanup(self) -> int:
+        """Delete expired assets and any metadata left without its data; returns the number removed."""
+        if not self.ttl:
+            return 0
+        
+        removed = 0
+        with self._lock:
+            for root, _, files in os.walk(self.directory):
+                for name in files:
+                    if name.endswith('.tmp') or name.endswith('.json'):
+                        continue
+                    path = os.path.join(root, name)
+                    try:
+                        if not self._expired(os.path.getmtime(path)):
+                            continue
+                        os.unlink(path)
+                    except FileNotFoundError:
+                        continue
+                    removed += 1
+                    try:
+                        os.unlink(path + '.json')
+                    except FileNotFoundError:
+                        pass
+                
+                for name in files:
+                    path = os.path.join(root, name)
+                    if name.endswith('.json') and not os.path.exists(path[:-len('.json')]):
+                        try:
+                            os.unlink(path)
+                        except FileNotFoundError:
+                            pass
+        return removed
+
+
+asset_store = AssetStore()
\ No newline at end of file
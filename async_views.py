@@ -0,0 +1,67 @@
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Iterable
+
+from asgiref.sync import sync_to_async
+
+from ingest import UploadRejected, receive_upload, rejection_response
+from render import run_inline
+
+
+# Threads that run the decode/DSP/render views under ASGI; bounds how many
+# heavy requests are processed at once while the event loop keeps accepting
+VIEW_WORKERS = int(os.environ.get('VIEW_WORKERS', 2 * (os.cpu_count() or 2)))
+
+view_executor = ThreadPoolExecutor(max_workers=VIEW_WORKERS, thread_name_prefix='view')
+
+_DONE = object()
+
+
+def _offloaded(function: Callable) -> Callable:
+    return sync_to_async(function, thread_sensitive=False, executor=view_executor)
+
+
+async def _iterate_offloaded(iterator: Iterable[bytes]) -> AsyncIterator[bytes]:
+    # Each chunk of a streamed WAV or zip may decode audio, so produce it on the
+    # executor rather than letting Django buffer the whole body in memory
+    iterator = iter(iterator)
+    while True:
+        chunk = await _offloaded(next)(iterator, _DONE)
+        if chunk is _DONE:
+            break
+        yield chunk
+
+
+def offload(view: Callable) -> Callable:
+    """Async version of a DRF view that runs the view itself on the view executor."""
+    
+    def run(request, *args, **kwargs):
+        try:
+            receive_upload(request)
+        except UploadRejected as e:
+            return rejection_response(e)
+        return view(request, *args, **kwargs)
+    
+    @functools.wraps(view)
+    async def async_view(request, *args, **kwargs):
+        if run_inline.get():
+            return run(request, *args, **kwargs)
+        
+        response = await _offloaded(run)(request, *args, **kwargs)
+        if response.streaming and not response.is_async:
+            response.streaming_content = _iterate_offloaded(response.streaming_content)
+        return response
+    
+    return async_view
+
+
+def in_event_loop(view: Callable) -> Callable:
+    """Async version of a cheap DRF view that runs directly on the event loop, so it
+    answers even while every view executor thread is busy."""
+    
+    @functools.wraps(view)
+    async def async_view(request, *args, **kwargs):
+        return view(request, *args, **kwargs)
+    
+    return async_view
\ No newline at end of file
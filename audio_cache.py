@@ -0,0 +1,159 @@
+import io
+import os
+import threading
+from collections import OrderedDict
+from typing import BinaryIO, Optional, Tuple
+
+import numpy as np
+
+from audio_io import content_digest, decode_audio, decode_audio_range, float_to_int16, frame_range, resample
+
+
+AUDIO_CACHE_MAX_BYTES = int(os.environ.get('AUDIO_CACHE_MAX_BYTES', 512 * 1024 * 1024))
+
+
+class AudioBufferCache:
+    """Process-wide LRU cache of decoded audio, bounded by total buffer size."""
+    
+    def __init__(self, max_bytes: int = AUDIO_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._current_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key) -> Optional[Tuple[np.ndarray, int]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+    
+    def put(self, key, audio_data: np.ndarray, sample_rate: int) -> None:
+        size = audio_data.nbytes
+        # Buffers larger than the whole budget are never cached
+        if size > self.max_bytes:
+            return
+        
+        audio_data.flags.writeable = False
+        
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._current_bytes -= previous[0].nbytes
+            
+            while self._entries and self._current_bytes + size > self.max_bytes:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self._current_bytes -= evicted.nbytes
+                self.evictions += 1
+            
+            self._entries[key] = (audio_data, sample_rate)
+            self._current_bytes += size
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._current_bytes = 0
+    
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+
+decoded_audio_cache = AudioBufferCache()
+
+
+SUPPORTED_DTYPES = ('float32', 'int16')
+
+
+def audio_key(digest: str, sample_rate: int = None, mono: bool = True, dtype: str = 'float32') -> tuple:
+    """Cache key of one decoded variant; sample_rate=None means the file's native rate."""
+    return (digest, sample_rate, mono, dtype)
+
+
+def load_audio(audio_file: BinaryIO, original_filename: str, sample_rate: int = None,
+               mono: bool = True, dtype: str = 'float32') -> Tuple[np.ndarray, int]:
+    """Decode an upload through the shared cache; returned arrays are read-only.
+    
+    The file is decoded once at its native rate; resampled and int16
+    variants are derived from that buffer and cached alongside it.
+    """
+    if dtype not in SUPPORTED_DTYPES:
+        raise ValueError(f"Unsupported sample dtype: {dtype}")
+    
+    digest = content_digest(audio_file)
+    key = audio_key(digest, sample_rate, mono, dtype)
+    
+    cached = decoded_audio_cache.get(key)
+    if cached is not None:
+        return cached
+    
+    native_key = audio_key(digest, None, mono)
+    native = decoded_audio_cache.get(native_key) if native_key != key else None
+    if native is None:
+        native = decode_to_cache(audio_file, original_filename, native_key, mono=mono)
+    if native_key == key:
+        return native
+    
+    y, sr = derive_variant(*native, sample_rate, dtype)
+    decoded_audio_cache.put(key, y, sr)
+    return y, sr
+
+
+def load_audio_range(audio_file: BinaryIO, original_filename: str, start: float = 0.0, duration: float = None,
+                     sample_rate: int = None, mono: bool = True,
+                     dtype: str = 'float32') -> Tuple[np.ndarray, int, Optional[float]]:
+    """Decode only [start, start + duration) seconds; returns (samples, rate, file duration or None).
+    
+    A file already in the buffer cache is sliced from it; otherwise just the
+    window is decoded, and it is not cached since other requests need other windows.
+    """
+    if dtype not in SUPPORTED_DTYPES:
+        raise ValueError(f"Unsupported sample dtype: {dtype}")
+    
+    native = decoded_audio_cache.get(audio_key(content_digest(audio_file), None, mono))
+    if native is not None:
+        y, sr = native
+        first, frames = frame_range(y.shape[-1], sr, start, duration)
+        y, total = y[..., first:first + frames], y.shape[-1] / sr
+    else:
+        y, sr, total = decode_audio_range(audio_file, original_filename, start, duration, mono)
+    
+    y, sr = derive_variant(y, sr, sample_rate, dtype)
+    return y, sr, total
+
+
+def derive_variant(y: np.ndarray, sr: int, sample_rate: int = None,
+                   dtype: str = 'float32') -> Tuple[np.ndarray, int]:
+    """Resample and/or convert a native-rate float32 buffer without decoding again."""
+    if sample_rate is not None and sample_rate != sr:
+        y, sr = resample(y, sr, sample_rate), sample_rate
+    if dtype == 'int16':
+        y = float_to_int16(y)
+    return np.ascontiguousarray(y), sr
+
+
+def load_audio_bytes(data: bytes, original_filename: str, sample_rate: int = None,
+                     mono: bool = True, dtype: str = 'float32') -> Tuple[np.ndarray, int]:
+    return load_audio(io.BytesIO(data), original_filename, sample_rate, mono, dtype)
+
+
+def decode_to_cache(audio_file: BinaryIO, original_filename: str, key: tuple,
+                    mono: bool = True) -> Tuple[np.ndarray, int]:
+    """Decode at the native rate as float32 and store the buffer under key."""
+    y, sr = decode_audio(audio_file, original_filename, mono=mono)
+    y = np.ascontiguousarray(y, dtype=np.float32)
+    decoded_audio_cache.put(key, y, sr)
+    return y, sr
\ No newline at end of file
@@ -0,0 +1,174 @@
+import hashlib
+import io
+import math
+import os
+import struct
+import tempfile
+from typing import BinaryIO, Optional, Tuple, Union
+
+import librosa
+import numpy as np
+import soundfile as sf
+
+
+CHUNK_SIZE = 1024 * 1024
+# libsndfile formats whose seeks and block reads return exactly the samples of
+# one full read; its MP3 decoder is off by up to a frame at each block boundary
+SAMPLE_ACCURATE_FORMATS = ('WAV', 'WAVEX', 'W64', 'RF64', 'AIFF', 'CAF', 'FLAC', 'OGG')
+
+
+def upload_source(audio_file: BinaryIO) -> Union[str, BinaryIO]:
+    """Return something librosa/soundfile can decode without copying the upload."""
+    # Django's TemporaryUploadedFile is already spooled to disk
+    if hasattr(audio_file, 'temporary_file_path'):
+        return audio_file.temporary_file_path()
+    
+    source = getattr(audio_file, 'file', audio_file)
+    source.seek(0)
+    return source
+
+
+def is_soundfile_readable(source: Union[str, BinaryIO]) -> bool:
+    try:
+        sf.info(source)
+        return True
+    except RuntimeError:
+        return False
+    finally:
+        if not isinstance(source, str):
+            source.seek(0)
+
+
+def open_sample_accurate(source: Union[str, BinaryIO]) -> Optional[sf.SoundFile]:
+    """Open `source` for seeking and block reads, or return None (with `source` rewound) to decode it in full."""
+    try:
+        sound_file = sf.SoundFile(source)
+    except RuntimeError:
+        sound_file = None
+    
+    if sound_file is not None and sound_file.format not in SAMPLE_ACCURATE_FORMATS:
+        sound_file.close()
+        sound_file = None
+    if sound_file is None and not isinstance(source, str):
+        source.seek(0)
+    return sound_file
+
+
+def content_digest(audio_file: BinaryIO) -> str:
+    # Stored assets already know their hash
+    known = getattr(audio_file, 'sha256', None)
+    if known:
+        return known
+    
+    digest = hashlib.sha256()
+    
+    audio_file.seek(0)
+    if hasattr(audio_file, 'chunks'):
+        for chunk in audio_file.chunks(CHUNK_SIZE):
+            digest.update(chunk)
+    else:
+        for chunk in iter(lambda: audio_file.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    audio_file.seek(0)
+    
+    return digest.hexdigest()
+
+
+def decode_audio(audio_file: BinaryIO, original_filename: str, sample_rate: int = None,
+                 mono: bool = True, offset: float = 0.0, duration: float = None) -> Tuple[np.ndarray, int]:
+    source = upload_source(audio_file)
+    
+    if isinstance(source, str) or is_soundfile_readable(source):
+        return librosa.load(source, sr=sample_rate, mono=mono, offset=offset, duration=duration)
+    
+    # audioread (used for mp4/aac/wma/...) can only open paths, so only these
+    # formats still need the upload copied to disk
+    file_extension = original_filename.split('.')[-1].lower()
+    
+    with tempfile.NamedTemporaryFile(suffix=f'.{file_extension}', delete=False) as temp_input:
+        for chunk in iter(lambda: source.read(CHUNK_SIZE), b''):
+            temp_input.write(chunk)
+        temp_input_path = temp_input.name
+    
+    try:
+        return librosa.load(temp_input_path, sr=sample_rate, mono=mono, offset=offset, duration=duration)
+    finally:
+        os.unlink(temp_input_path)
+
+
+def frame_range(total_frames: int, sample_rate: int, start: float = 0.0,
+                duration: float = None) -> Tuple[int, int]:
+    """Clip [start, start + duration) seconds to the file; returns (first frame, frame count)."""
+    first = int(start * sample_rate)
+    if start and first >= total_frames:
+        raise ValueError(f"start ({start:g}s) is beyond the end of the audio ({total_frames / sample_rate:.3f}s)")
+    frames = total_frames - first
+    if duration is not None:
+        frames = min(int(round(duration * sample_rate)), frames)
+    return first, frames
+
+
+def decode_audio_range(audio_file: BinaryIO, original_filename: str, start: float = 0.0, duration: float = None,
+                       mono: bool = True) -> Tuple[np.ndarray, int, Optional[float]]:
+    """Decode [start, start + duration) seconds as float32; also returns the file's duration if known.
+    
+    Sample-accurate libsndfile formats seek straight to the first frame, so
+    only the window is read; other containers (including mp3, whose seeks
+    land off by up to a frame) are decoded from the start to the end of the window.
+    """
+    source = upload_source(audio_file)
+    sound_file = open_sample_accurate(source)
+    if sound_file is None:
+        end = None if duration is None else start + duration
+        y, sr = decode_audio(audio_file, original_filename, mono=mono, duration=end)
+        first, frames = frame_range(y.shape[-1], sr, start, duration)
+        return y[..., first:first + frames], sr, None
+    
+    with sound_file:
+        sr = sound_file.samplerate
+        first, frames = frame_range(sound_file.frames, sr, start, duration)
+        sound_file.seek(first)
+        y = sound_file.read(frames, dtype='float32', always_2d=True)
+        total = sound_file.frames / sr
+    
+    # Same channel mix librosa.load applies
+    y = y.mean(axis=1) if mono else np.ascontiguousarray(y.T)
+    return y, sr, total
+
+
+def encode_wav(audio_data: np.ndarray, sample_rate: int, subtype: str = None) -> bytes:
+    wav_buffer = io.BytesIO()
+    sf.write(wav_buffer, audio_data, sample_rate, format='WAV', subtype=subtype)
+    return wav_buffer.getvalue()
+
+
+def wav_header(frames: int, sample_rate: int, channels: int = 1, sample_width: int = 2) -> bytes:
+    data_size = frames * channels * sample_width
+    return struct.pack(
+        '<4sI4s4sIHHIIHH4sI',
+        b'RIFF', 36 + data_size, b'WAVE',
+        b'fmt ', 16, 1, channels, sample_rate,
+        sample_rate * channels * sample_width, channels * sample_width, sample_width * 8,
+        b'data', data_size
+    )
+
+
+def resample(audio_data: np.ndarray, orig_sr: int, target_sr: int) -> np.ndarray:
+    if orig_sr == target_sr:
+        return audio_data
+    
+    from scipy.signal import resample_poly
+    
+    # Polyphase filtering by the reduced up/down ratio; samples are on the last axis
+    divisor = math.gcd(orig_sr, target_sr)
+    resampled = resample_poly(audio_data, target_sr // divisor, orig_sr // divisor, axis=-1)
+    return resampled.astype(audio_data.dtype, copy=False)
+
+
+def float_to_int16(audio_data: np.ndarray) -> np.ndarray:
+    # Same scaling and clipping libsndfile applies when writing float data as PCM_16
+    return np.clip(np.floor(audio_data * 32768.0), -32768, 32767).astype(np.int16)
+
+
+def float_to_pcm16(audio_data: np.ndarray) -> bytes:
+    return float_to_int16(audio_data).astype('<i2', copy=False).tobytes()
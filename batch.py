@@ -0,0 +1,281 @@
+import io
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import BinaryIO, Callable, Iterator, List, Tuple
+
+from audio_io import CHUNK_SIZE
+from format_conversion import AudioConverter
+from ingest import UploadRejected, check_limits, probe_duration
+from jobs import run_operation
+
+
+BATCH_WORKERS = int(os.environ.get('BATCH_WORKERS', os.cpu_count() or 2))
+# Most files one zip archive may contain
+BATCH_MAX_FILES = int(os.environ.get('BATCH_MAX_FILES', 1000))
+BATCH_OPERATIONS = ('convert', 'waveform', 'spectrogram')
+
+
+class ZipStream(io.RawIOBase):
+    """Write-only sink for zipfile that hands out whatever has been written so far."""
+    
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+    
+    def writable(self) -> bool:
+        return True
+    
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+    
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def parse_operations(values: List[str]) -> List[str]:
+    operations = []
+    for value in values:
+        for operation in value.split(','):
+            operation = operation.strip().lower()
+            if not operation:
+                continue
+            if operation not in BATCH_OPERATIONS:
+                raise ValueError(f"Unsupported batch operation: {operation}")
+            if operation not in operations:
+                operations.append(operation)
+    if not operations:
+        raise ValueError("No operations requested")
+    return operations
+
+
+def spool(source: BinaryIO, limit: int = None) -> str:
+    """Copy a file object to a temporary file in CHUNK_SIZE pieces; returns its path.
+    
+    With `limit`, more than that many bytes is rejected as the ingest limits
+    would reject the upload, without reading further.
+    """
+    fd, path = tempfile.mkstemp(suffix='.batch')
+    try:
+        with os.fdopen(fd, 'wb') as spool_file:
+            written = 0
+            for chunk in iter(lambda: source.read(CHUNK_SIZE), b''):
+                written += len(chunk)
+                if limit is not None and written > limit:
+                    raise UploadRejected(f'File is larger than the {limit} bytes its archive declares')
+                check_limits(written, None)
+                spool_file.write(chunk)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return path
+
+
+def expand_uploads(uploads: List[BinaryIO]) -> List[Tuple[str, Callable[[], Tuple[str, bool]]]]:
+    """Turn uploads and zip archives into (filename, loader) inputs.
+    
+    A loader returns (path, temporary) once the file is about to be handed to
+    a worker. Workers open the path themselves, so file contents are never
+    pickled; temporary copies are deleted once the file's operations finish.
+    Zip archives are held to the upload limits before anything is extracted.
+    """
+    inputs = []
+    for upload in uploads:
+        if upload.name.lower().endswith('.zip'):
+            archive = zipfile.ZipFile(upload)
+            members = [member for member in archive.infolist() if not member.is_dir()]
+            if len(members) > BATCH_MAX_FILES:
+                raise UploadRejected(f'Archive has {len(members)} files; the maximum is {BATCH_MAX_FILES}')
+            # Sizes as declared by the archive; extraction stops at the declared size
+            for member in members:
+                check_limits(member.file_size, None)
+            check_limits(sum(member.file_size for member in members), None)
+            
+            for member in members:
+                inputs.append((os.path.basename(member.filename), lambda a=archive, m=member: _spool_member(a, m)))
+        elif hasattr(upload, 'temporary_file_path'):
+            inputs.append((upload.name, lambda u=upload: (u.temporary_file_path(), False)))
+        else:
+            inputs.append((upload.name, lambda u=upload: (spool(u), True)))
+    return inputs
+
+
+def _spool_member(archive: zipfile.ZipFile, member: zipfile.ZipInfo) -> Tuple[str, bool]:
+    with archive.open(member) as member_file:
+        path = spool(member_file, member.file_size)
+    
+    # Uploads have their duration checked by the ingest handler; archive members only now
+    try:
+        check_limits(member.file_size, probe_duration(path))
+    except UploadRejected:
+        os.unlink(path)
+        raise
+    return path, True
+
+
+class BatchProcessor:
+    """Fans (file, operation) pairs out over a process pool and streams a zip of the results."""
+    
+    def __init__(self, max_workers: int = BATCH_WORKERS):
+        self.max_workers = max_workers
+        self._executor = None
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is not None and self._executor._broken:
+            # A worker died (e.g. OOM-killed); the pool refuses all further work
+            self._reset_executor()
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return self._executor
+    
+    def _reset_executor(self) -> None:
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _submit(self, *args):
+        try:
+            return self._get_executor().submit(*args)
+        except (BrokenProcessPool, RuntimeError):
+            # The pool broke since it was last checked; retry once on a new one
+            self._reset_executor()
+            return self._get_executor().submit(*args)
+    
+    @staticmethod
+    def _tasks(inputs, operations, spooled):
+        # Yields (index, filename, operation, path, outcome), where outcome is
+        # None for work to run, or how to record an input that cannot be run;
+        # `spooled` maps an input's index to [path, temporary, operations still to finish]
+        for index, (filename, load) in enumerate(inputs):
+            file_extension = filename.split('.')[-1].lower()
+            if file_extension not in AudioConverter.SUPPORTED_FORMATS:
+                yield index, filename, None, None, {
+                    'status': 'skipped', 'message': f"Unsupported audio format: {file_extension}"
+                }
+                continue
+            
+            runnable = [operation for operation in operations
+                        if not (operation == 'convert' and file_extension == 'wav')]
+            rejected = None
+            for operation in operations:
+                if operation not in runnable:
+                    yield index, filename, operation, None, {
+                        'status': 'skipped', 'message': 'The file is already in .wav format'
+                    }
+                    continue
+                if index not in spooled and rejected is None:
+                    try:
+                        spooled[index] = [*load(), len(runnable)]
+                    except UploadRejected as e:
+                        rejected = {'status': 'failed', 'error': str(e), 'status_code': e.status_code}
+                if rejected is not None:
+                    yield index, filename, operation, None, rejected
+                    continue
+                yield index, filename, operation, spooled[index][0], None
+    
+    @staticmethod
+    def _release(spooled, index) -> None:
+        entry = spooled.get(index)
+        if entry is None:
+            return
+        entry[2] -= 1
+        if entry[2] <= 0:
+            del spooled[index]
+            if entry[1]:
+                try:
+                    os.unlink(entry[0])
+                except FileNotFoundError:
+                    pass
+    
+    def stream(self, inputs: List[Tuple[str, Callable[[], Tuple[str, bool]]]],
+               operations: List[str]) -> Iterator[bytes]:
+        sink = ZipStream()
+        archive = zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_STORED)
+        manifest = []
+        used_names = set()
+        
+        def record(index, filename, operation, status, **details):
+            manifest.append(dict({'index': index, 'filename': filename, 'operation': operation,
+                                  'status': status}, **details))
+        
+        def member_name(index, name):
+            if name in used_names:
+                name = f'{index:04d}_{name}'
+            used_names.add(name)
+            return name
+        
+        pending = {}
+        spooled = {}
+        # Cap in-flight work so thousands of inputs are not all spooled at once
+        max_in_flight = self.max_workers * 2
+        tasks = self._tasks(inputs, operations, spooled)
+        
+        def fill():
+            for index, filename, operation, path, outcome in tasks:
+                if outcome is not None:
+                    record(index, filename, operation, **outcome)
+                    continue
+                try:
+                    future = self._submit(run_operation, operation, path, filename)
+                except RuntimeError:
+                    record(index, filename, operation, 'failed', error='No worker process is available',
+                           status_code=503)
+                    self._release(spooled, index)
+                    continue
+                pending[future] = (index, filename, operation)
+                if len(pending) >= max_in_flight:
+                    return
+        
+        try:
+            fill()
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, filename, operation = pending.pop(future)
+                    self._release(spooled, index)
+                    try:
+                        result = future.result()
+                    except BrokenProcessPool:
+                        # Also fails the other files the dead worker's pool was running;
+                        # the pool is rebuilt for the files still to come
+                        record(index, filename, operation, 'failed',
+                               error='The worker process died (e.g. out of memory)', status_code=500)
+                        continue
+                    except Exception as e:
+                        record(index, filename, operation, 'failed', error=str(e),
+                               status_code=getattr(e, 'status_code', 500))
+                        continue
+                    
+                    name = member_name(index, result['filename'])
+                    archive.writestr(name, result['content'])
+                    record(index, filename, operation, 'done', output=name)
+                    yield sink.drain()
+                
+                fill()
+            
+            manifest.sort(key=lambda entry: (entry['index'], entry['operation'] or ''))
+            archive.writestr('manifest.json', json.dumps(manifest, indent=2))
+            archive.close()
+            yield sink.drain()
+        finally:
+            # Also runs when the client disconnects and the generator is closed early
+            for path, temporary, _ in spooled.values():
+                if temporary:
+                    try:
+                        os.unlink(path)
+                    except FileNotFoundError:
+                        pass
+
+
+batch_processor = BatchProcessor()
\ No newline at end of file
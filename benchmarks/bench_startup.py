@@ -0,0 +1,131 @@
+"""Measure API cold start: importing the app, then the first and second request per endpoint.
+
+Each sample is a fresh interpreter, so module imports, lazily loaded
+dependencies and per-thread figure templates all start cold. With --warmup
+the app is imported with WARMUP_ON_START=1, the way a preloading server or
+a post-fork hook would run it, so the cost moves from the first request
+into startup:
+    
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --endpoints waveform,spectrogram --repeat 7 --warmup
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from run_benchmarks import git_revision, install_local_recognizer, parse_list, percentile  # noqa: E402
+from signals import encode, synthesize  # noqa: E402
+
+
+ENDPOINTS = ('health', 'convert', 'waveform', 'spectrogram', 'transcribe')
+SAMPLE_RATE = 22050
+DURATION = 5.0
+
+
+def request(client, endpoint, data, index):
+    if endpoint == 'health':
+        response = client.get('/health/')
+    else:
+        upload = io.BytesIO(data)
+        upload.name = f'startup_{index}.ogg'
+        response = client.post(f'/{endpoint}/', {'audio_file': upload, 'language': 'en-US'})
+    if response.status_code != 200:
+        raise RuntimeError(f'/{endpoint}/ returned {response.status_code}')
+    if response.streaming:
+        for _ in response.streaming_content:
+            pass
+
+
+def run_sample(endpoint, warmup):
+    """Executed in a child interpreter; prints one JSON result line."""
+    os.environ['RESULT_CACHE_DIR'] = tempfile.mkdtemp(prefix='spectrolingua-startup-')
+    os.environ['WARMUP_ON_START'] = '1' if warmup else '0'
+    
+    # Input is prepared with soundfile only, before the app is imported
+    data = [encode(synthesize('speech', DURATION + index, SAMPLE_RATE), SAMPLE_RATE, 'ogg') for index in range(2)]
+    
+    start = time.perf_counter()
+    import main  # noqa: F401
+    import_s = time.perf_counter() - start
+    
+    from django.test import Client
+    
+    install_local_recognizer()
+    client = Client()
+    
+    latencies = []
+    for index in range(2):
+        start = time.perf_counter()
+        request(client, endpoint, data[index], index)
+        latencies.append(time.perf_counter() - start)
+    
+    print(json.dumps({'import_s': import_s, 'first_request_s': latencies[0], 'second_request_s': latencies[1]}))
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description='Spectrolingua startup benchmark')
+    parser.add_argument('--endpoints', default=','.join(ENDPOINTS), type=lambda v: parse_list(v, ENDPOINTS))
+    parser.add_argument('--repeat', type=int, default=5, help='fresh interpreters per endpoint')
+    parser.add_argument('--warmup', action='store_true', help='import the app with WARMUP_ON_START=1')
+    parser.add_argument('--output', default='startup_results.json')
+    parser.add_argument('--sample', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.sample:
+        sample = json.loads(args.sample)
+        run_sample(sample['endpoint'], sample['warmup'])
+        return
+    
+    results = []
+    for endpoint in args.endpoints:
+        samples = []
+        for _ in range(args.repeat):
+            sample = json.dumps({'endpoint': endpoint, 'warmup': args.warmup})
+            completed = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--sample', sample],
+                cwd=REPO_DIR, capture_output=True, text=True
+            )
+            if completed.returncode != 0:
+                print(f'FAILED {endpoint}\n{completed.stderr}', file=sys.stderr)
+                continue
+            samples.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+        if not samples:
+            continue
+        
+        result = {'endpoint': endpoint, 'warmup': args.warmup, 'samples': len(samples)}
+        for metric in ('import_s', 'first_request_s', 'second_request_s'):
+            result[f'{metric[:-2]}_p50_s'] = percentile([sample[metric] for sample in samples], 50)
+        results.append(result)
+        print(f'{endpoint:<12} import {result["import_p50_s"]:6.2f}s  '
+              f'first request {result["first_request_p50_s"]:6.2f}s  '
+              f'second request {result["second_request_p50_s"]:6.2f}s')
+    
+    report = {
+        'meta': {
+            'git_revision': git_revision(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'duration_s': DURATION,
+        },
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'\nWrote {len(results)} results to {args.output}')
+
+
+if __name__ == '__main__':
+    main_cli()
\ No newline at end of file
@@ -0,0 +1,115 @@
+"""Compare the legacy temp-file upload path with the in-memory I/O layer.
+
+Measures wall time and bytes moved through read()/write() syscalls (from
+/proc/self/io) for AudioConverter.convert_to_wav on Django in-memory and
+disk-spooled uploads.
+    
+    python benchmarks/bench_upload_io.py --duration 60 --repeat 5
+"""
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: F401  (configures Django settings)
+import librosa
+import numpy as np
+import soundfile as sf
+from django.core.files.uploadedfile import InMemoryUploadedFile, TemporaryUploadedFile
+
+from audio_cache import decoded_audio_cache
+from format_conversion import AudioConverter
+
+
+def legacy_convert_to_wav(audio_file, original_filename):
+    # The pre-audio_io implementation: spool upload to disk, decode, write a
+    # second temp WAV and read it back
+    file_extension = original_filename.split('.')[-1].lower()
+    
+    with tempfile.NamedTemporaryFile(suffix=f'.{file_extension}', delete=False) as temp_input:
+        temp_input.write(audio_file.read())
+        temp_input_path = temp_input.name
+    
+    try:
+        audio_data, sample_rate = librosa.load(temp_input_path, sr=None)
+        
+        with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_output:
+            temp_output_path = temp_output.name
+        
+        sf.write(temp_output_path, audio_data, sample_rate, format='WAV')
+        
+        with open(temp_output_path, 'rb') as wav_file:
+            wav_data = wav_file.read()
+        
+        os.unlink(temp_output_path)
+        return wav_data
+    finally:
+        os.unlink(temp_input_path)
+
+
+def io_counters():
+    try:
+        with open('/proc/self/io') as f:
+            fields = dict(line.split(': ') for line in f.read().splitlines())
+        return int(fields['rchar']), int(fields['wchar'])
+    except OSError:
+        return 0, 0
+
+
+def make_flac(duration, sample_rate=44100):
+    t = np.arange(int(duration * sample_rate)) / sample_rate
+    y = 0.5 * np.sin(2 * np.pi * 220 * t) + 0.05 * np.random.default_rng(0).standard_normal(len(t))
+    buffer = io.BytesIO()
+    sf.write(buffer, y.astype(np.float32), sample_rate, format='FLAC')
+    return buffer.getvalue()
+
+
+def make_upload(kind, data):
+    if kind == 'memory':
+        return InMemoryUploadedFile(io.BytesIO(data), 'audio_file', 'bench.flac', 'audio/flac', len(data), None)
+    upload = TemporaryUploadedFile('bench.flac', 'audio/flac', len(data), None)
+    upload.write(data)
+    upload.flush()
+    upload.seek(0)
+    return upload
+
+
+def measure(convert, kind, data, repeat):
+    timings, copied = [], []
+    for _ in range(repeat):
+        upload = make_upload(kind, data)
+        decoded_audio_cache.clear()
+        
+        rchar, wchar = io_counters()
+        start = time.perf_counter()
+        convert(upload, 'bench.flac')
+        timings.append(time.perf_counter() - start)
+        rchar_after, wchar_after = io_counters()
+        copied.append((rchar_after - rchar) + (wchar_after - wchar))
+        
+        upload.close()
+    return min(timings), int(np.median(copied))
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--duration', type=float, default=60.0, help='seconds of synthetic audio')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    
+    data = make_flac(args.duration)
+    print(f'input: {args.duration:.0f}s FLAC, {len(data) / 1e6:.1f} MB')
+    print(f'{"upload":<8} {"path":<8} {"wall (s)":>10} {"syscall bytes":>15}')
+    
+    for kind in ('memory', 'disk'):
+        for label, convert in (('before', legacy_convert_to_wav), ('after', AudioConverter.convert_to_wav)):
+            wall, copied = measure(convert, kind, data, args.repeat)
+            print(f'{kind:<8} {label:<8} {wall:>10.3f} {copied:>15,}')
+
+
+if __name__ == '__main__':
+    main_cli()
\ No newline at end of file
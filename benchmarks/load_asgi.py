@@ -0,0 +1,190 @@
+"""Compare how one process serves light requests while heavy ones are in flight, ASGI vs WSGI.
+
+A batch of concurrent /spectrogram/ uploads is started, and /health/ is probed
+at a fixed interval until the batch completes. Probe latency shows whether
+the process keeps answering while it decodes and renders:
+    
+    asgi         asgi.application driven by django.test.AsyncClient; heavy views run
+                 on the view executor, light views on the event loop
+    wsgi         main.application on a single-threaded WSGI server (one request at a
+                 time, like a sync worker)
+    wsgi-thread  main.application on a thread-per-request WSGI server
+    
+    python benchmarks/load_asgi.py --heavy 8 --duration 30
+    python benchmarks/load_asgi.py --modes asgi,wsgi --output load.json
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from wsgiref.simple_server import WSGIServer, make_server
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from run_benchmarks import parse_list, percentile  # noqa: E402
+from signals import encode, synthesize  # noqa: E402
+from stress_render import QuietHandler, ThreadingWSGIServer, post  # noqa: E402
+
+
+MODES = ('asgi', 'wsgi', 'wsgi-thread')
+SAMPLE_RATE = 22050
+
+
+def make_inputs(count, duration):
+    # Distinct files so the decoded-audio cache cannot short-circuit the work
+    return [
+        (f'load_{index}.flac', encode(synthesize('speech', duration) * (1 - 0.05 * index / count), SAMPLE_RATE, 'flac'))
+        for index in range(count)
+    ]
+
+
+def summarize(mode, wall, heavy, probes):
+    heavy_ok = [elapsed for status, elapsed in heavy if status == 200]
+    probe_ok = [elapsed for status, elapsed in probes if status == 200]
+    return {
+        'mode': mode,
+        'wall_s': wall,
+        'heavy_requests': len(heavy),
+        'heavy_failed': len(heavy) - len(heavy_ok),
+        'heavy_p50_s': percentile(heavy_ok, 50) if heavy_ok else None,
+        'probes': len(probes),
+        'probe_failed': len(probes) - len(probe_ok),
+        'probe_p50_s': percentile(probe_ok, 50) if probe_ok else None,
+        'probe_p95_s': percentile(probe_ok, 95) if probe_ok else None,
+        'probe_max_s': max(probe_ok) if probe_ok else None,
+    }
+
+
+async def run_asgi(inputs, interval):
+    import asgi  # noqa: F401  (routes to the async views)
+    from django.test import AsyncClient
+    
+    client = AsyncClient()
+    heavy, probes = [], []
+    
+    async def upload(filename, data):
+        audio_file = io.BytesIO(data)
+        audio_file.name = filename
+        start = time.perf_counter()
+        response = await client.post('/spectrogram/', {'audio_file': audio_file})
+        heavy.append((response.status_code, time.perf_counter() - start))
+    
+    async def probe(done):
+        while not done.is_set():
+            start = time.perf_counter()
+            response = await client.get('/health/')
+            probes.append((response.status_code, time.perf_counter() - start))
+            await asyncio.sleep(interval)
+    
+    done = asyncio.Event()
+    start = time.perf_counter()
+    prober = asyncio.create_task(probe(done))
+    await asyncio.gather(*(upload(filename, data) for filename, data in inputs))
+    wall = time.perf_counter() - start
+    done.set()
+    await prober
+    return wall, heavy, probes
+
+
+def run_wsgi(inputs, interval, threaded):
+    import main
+    
+    server = make_server('127.0.0.1', 0, main.application, handler_class=QuietHandler,
+                         server_class=ThreadingWSGIServer if threaded else WSGIServer)
+    server.request_queue_size = 1024
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f'http://127.0.0.1:{server.server_port}'
+    
+    heavy, probes = [], []
+    done = threading.Event()
+    
+    def upload(item):
+        filename, data = item
+        try:
+            status, _, elapsed = post(f'{base_url}/spectrogram/', filename, data)
+        except Exception:
+            status, elapsed = None, 0.0
+        heavy.append((status, elapsed))
+    
+    def probe():
+        while not done.is_set():
+            start = time.perf_counter()
+            with urllib.request.urlopen(f'{base_url}/health/', timeout=600) as response:
+                response.read()
+                probes.append((response.status, time.perf_counter() - start))
+            time.sleep(interval)
+    
+    prober = threading.Thread(target=probe)
+    start = time.perf_counter()
+    prober.start()
+    with ThreadPoolExecutor(max_workers=len(inputs)) as executor:
+        list(executor.map(upload, inputs))
+    wall = time.perf_counter() - start
+    done.set()
+    prober.join()
+    server.shutdown()
+    return wall, heavy, probes
+
+
+def run_mode(mode, heavy, duration, interval):
+    """Executed in a child interpreter; prints one JSON result line."""
+    os.environ['RESULT_CACHE_MAX_BYTES'] = '0'
+    os.environ['RESULT_CACHE_DIR'] = tempfile.mkdtemp(prefix='spectrolingua-load-')
+    inputs = make_inputs(heavy, duration)
+    
+    if mode == 'asgi':
+        wall, heavy_results, probes = asyncio.run(run_asgi(inputs, interval))
+    else:
+        wall, heavy_results, probes = run_wsgi(inputs, interval, threaded=mode == 'wsgi-thread')
+    print(json.dumps(summarize(mode, wall, heavy_results, probes)))
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description='ASGI vs WSGI concurrency load test')
+    parser.add_argument('--modes', default=','.join(MODES), type=lambda v: parse_list(v, MODES))
+    parser.add_argument('--heavy', type=int, default=6, help='concurrent /spectrogram/ uploads')
+    parser.add_argument('--duration', type=float, default=20.0, help='seconds of audio per upload')
+    parser.add_argument('--interval', type=float, default=0.05, help='seconds between /health/ probes')
+    parser.add_argument('--output', help='write results as JSON')
+    parser.add_argument('--mode', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.mode:
+        run_mode(args.mode, args.heavy, args.duration, args.interval)
+        return
+    
+    results = []
+    for mode in args.modes:
+        completed = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--mode', mode, '--heavy', str(args.heavy),
+             '--duration', str(args.duration), '--interval', str(args.interval)],
+            cwd=REPO_DIR, capture_output=True, text=True
+        )
+        if completed.returncode != 0:
+            print(f'FAILED {mode}\n{completed.stderr}', file=sys.stderr)
+            continue
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        results.append(result)
+        print(f'{mode:<12} {result["heavy_requests"]} heavy in {result["wall_s"]:6.2f}s '
+              f'(p50 {result["heavy_p50_s"]:6.2f}s, {result["heavy_failed"]} failed)  '
+              f'/health/ x{result["probes"]}: p50 {result["probe_p50_s"] * 1000:7.1f}ms  '
+              f'p95 {result["probe_p95_s"] * 1000:7.1f}ms  max {result["probe_max_s"] * 1000:7.1f}ms')
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'heavy': args.heavy, 'duration_s': args.duration, 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main_cli()
\ No newline at end of file
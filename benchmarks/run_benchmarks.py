@@ -0,0 +1,287 @@
+"""Reproducible benchmark suite for the converters, generators and API views.
+
+Every (target, signal, format, duration) case runs in a fresh interpreter so
+peak RSS is attributable to that case alone. Results are written as JSON and
+can be compared against a previous run:
+    
+    python benchmarks/run_benchmarks.py --output bench.json
+    python benchmarks/run_benchmarks.py --output new.json --compare bench.json
+
+Targets:
+    convert            AudioConverter.convert_to_wav
+    convert_stream     AudioConverter.stream_wav (fully consumed)
+    waveform           WaveformGenerator.generate_waveform_from_file
+    spectrogram        SpectrogramGenerator.generate_spectrogram_from_file
+    transcribe         AudioTranscriber.transcribe_segments with a local no-op backend
+    view_convert       POST /convert/ through the Django test client
+    view_waveform      POST /waveform/
+    view_spectrogram   POST /spectrogram/
+    view_transcribe    POST /transcribe/ with the local no-op backend
+
+Decoded-audio and on-disk result caches are cleared before every iteration,
+so each measurement includes a full decode.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from signals import FORMATS, SIGNALS, encode, synthesize  # noqa: E402
+
+
+TARGETS = (
+    'convert', 'convert_stream', 'waveform', 'spectrogram', 'transcribe',
+    'view_convert', 'view_waveform', 'view_spectrogram', 'view_transcribe',
+)
+SAMPLE_RATE = 22050
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    index = (len(ordered) - 1) * q / 100
+    lower = int(index)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (index - lower)
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def build_runner(target, data, filename):
+    """Return a zero-argument callable that performs one iteration of `target`."""
+    if target.startswith('view_'):
+        from django.test import Client
+        client = Client()
+        endpoint = '/' + target[len('view_'):] + '/'
+        
+        def run_view():
+            upload = io.BytesIO(data)
+            upload.name = filename
+            response = client.post(endpoint, {'audio_file': upload, 'language': 'en-US'})
+            if response.status_code != 200:
+                raise RuntimeError(f'{endpoint} returned {response.status_code}')
+            if response.streaming:
+                for _ in response.streaming_content:
+                    pass
+            response.close()
+        return run_view
+    
+    if target in ('convert', 'convert_stream'):
+        from format_conversion import AudioConverter
+        
+        if target == 'convert':
+            return lambda: AudioConverter.convert_to_wav(io.BytesIO(data), filename)
+        
+        def run_stream():
+            _, chunks = AudioConverter.stream_wav(io.BytesIO(data), filename)
+            for _ in chunks:
+                pass
+        return run_stream
+    
+    if target == 'waveform':
+        from waveform import WaveformGenerator
+        return lambda: WaveformGenerator.generate_waveform_from_file(io.BytesIO(data), filename)
+    
+    if target == 'spectrogram':
+        from spectrogram import SpectrogramGenerator
+        return lambda: SpectrogramGenerator.generate_spectrogram_from_file(io.BytesIO(data), filename)
+    
+    if target == 'transcribe':
+        from transcribe import AudioTranscriber
+        return lambda: AudioTranscriber.transcribe_segments(io.BytesIO(data), filename, 'en-US')
+    
+    raise ValueError(f'Unknown target: {target}')
+
+
+def install_local_recognizer():
+    # Transcription must not depend on the network; measure decode, VAD,
+    # chunking and the thread pool with a backend that answers instantly
+    import transcribe
+    
+    class LocalRecognizerBackend(transcribe.RecognizerBackend):
+        def recognize(self, samples, sample_rate, language):
+            return f'{len(samples) / sample_rate:.2f}s'
+    
+    transcribe.RECOGNIZER_BACKENDS['benchmark'] = LocalRecognizerBackend
+    transcribe.TRANSCRIBE_BACKEND = 'benchmark'
+
+
+def run_case(case):
+    """Executed in a child interpreter; prints one JSON result line."""
+    cache_dir = tempfile.mkdtemp(prefix='spectrolingua-bench-')
+    os.environ['RESULT_CACHE_DIR'] = cache_dir
+    
+    import main  # noqa: F401  (configures Django and imports the app)
+    from audio_cache import decoded_audio_cache
+    from result_cache import result_cache
+    
+    install_local_recognizer()
+    
+    y = synthesize(case['signal'], case['duration'], SAMPLE_RATE)
+    data = encode(y, SAMPLE_RATE, case['format'])
+    filename = f"bench_{case['signal']}.{case['format']}"
+    del y
+    
+    runner = build_runner(case['target'], data, filename)
+    
+    def reset_caches():
+        decoded_audio_cache.clear()
+        shutil.rmtree(result_cache.directory, ignore_errors=True)
+    
+    for _ in range(case['warmup']):
+        reset_caches()
+        runner()
+    
+    latencies = []
+    for _ in range(case['repeat']):
+        reset_caches()
+        start = time.perf_counter()
+        runner()
+        latencies.append(time.perf_counter() - start)
+    
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    
+    p50 = percentile(latencies, 50)
+    result = dict(case)
+    result.update({
+        'input_bytes': len(data),
+        'latency_p50_s': p50,
+        'latency_p95_s': percentile(latencies, 95),
+        'latency_mean_s': sum(latencies) / len(latencies),
+        'throughput_x_realtime': case['duration'] / p50,
+        'throughput_input_mb_s': len(data) / 1e6 / p50,
+        'peak_rss_mb': peak_rss_mb(),
+    })
+    print(json.dumps(result))
+
+
+def case_key(result):
+    return (result['target'], result['signal'], result['format'], result['duration'])
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path, threshold):
+    with open(baseline_path) as f:
+        baseline = {case_key(r): r for r in json.load(f)['results']}
+    
+    regressions = 0
+    print(f'\nComparison against {baseline_path} (p50 latency, peak RSS)')
+    print(f'{"case":<52} {"p50 old":>9} {"p50 new":>9} {"change":>8} {"rss old":>8} {"rss new":>8}')
+    for result in results:
+        old = baseline.get(case_key(result))
+        if old is None:
+            continue
+        change = result['latency_p50_s'] / old['latency_p50_s'] - 1
+        flag = ''
+        if change > threshold:
+            flag = '  REGRESSION'
+            regressions += 1
+        label = '/'.join(str(part) for part in case_key(result))
+        print(f'{label:<52} {old["latency_p50_s"]:>9.3f} {result["latency_p50_s"]:>9.3f} '
+              f'{change:>+8.1%} {old["peak_rss_mb"]:>8.0f} {result["peak_rss_mb"]:>8.0f}{flag}')
+    return regressions
+
+
+def parse_list(value, allowed=None, convert=str):
+    items = [convert(item.strip()) for item in value.split(',') if item.strip()]
+    if allowed is not None:
+        unknown = [item for item in items if item not in allowed]
+        if unknown:
+            raise argparse.ArgumentTypeError(f'unknown values {unknown}; choose from {list(allowed)}')
+    return items
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description='Spectrolingua benchmark suite')
+    parser.add_argument('--targets', default=','.join(TARGETS),
+                        type=lambda v: parse_list(v, TARGETS))
+    parser.add_argument('--signals', default=','.join(SIGNALS),
+                        type=lambda v: parse_list(v, SIGNALS))
+    parser.add_argument('--formats', default='wav,flac,ogg',
+                        type=lambda v: parse_list(v, FORMATS))
+    parser.add_argument('--durations', default='5,60',
+                        type=lambda v: parse_list(v, convert=float), help='seconds, comma-separated')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--output', default='bench_results.json')
+    parser.add_argument('--compare', help='previous results JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='relative p50 slowdown reported as a regression (default 0.10)')
+    parser.add_argument('--fail-on-regression', action='store_true')
+    parser.add_argument('--case', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.case:
+        run_case(json.loads(args.case))
+        return
+    
+    results = []
+    for target in args.targets:
+        for signal in args.signals:
+            for file_format in args.formats:
+                if target == 'view_convert' and file_format == 'wav':
+                    # The view answers WAV uploads with a JSON notice instead of converting
+                    continue
+                for duration in args.durations:
+                    case = {'target': target, 'signal': signal, 'format': file_format,
+                            'duration': duration, 'repeat': args.repeat, 'warmup': args.warmup}
+                    completed = subprocess.run(
+                        [sys.executable, os.path.abspath(__file__), '--case', json.dumps(case)],
+                        cwd=REPO_DIR, capture_output=True, text=True
+                    )
+                    if completed.returncode != 0:
+                        print(f'FAILED {target}/{signal}/{file_format}/{duration}s\n{completed.stderr}',
+                              file=sys.stderr)
+                        continue
+                    result = json.loads(completed.stdout.strip().splitlines()[-1])
+                    results.append(result)
+                    print(f'{target:<17} {signal:<7} {file_format:<5} {duration:>7.0f}s  '
+                          f'p50 {result["latency_p50_s"]:7.3f}s  p95 {result["latency_p95_s"]:7.3f}s  '
+                          f'{result["throughput_x_realtime"]:8.1f}x rt  rss {result["peak_rss_mb"]:6.0f} MB')
+    
+    report = {
+        'meta': {
+            'git_revision': git_revision(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'sample_rate': SAMPLE_RATE,
+        },
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'\nWrote {len(results)} results to {args.output}')
+    
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        if regressions and args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main_cli()
\ No newline at end of file
@@ -0,0 +1,70 @@
+"""Deterministic synthetic test audio for the benchmark harness."""
+import io
+
+import numpy as np
+import soundfile as sf
+from scipy.signal import lfilter
+
+
+SIGNALS = ('sweep', 'noise', 'speech')
+FORMATS = {
+    'wav': ('WAV', 'PCM_16'),
+    'flac': ('FLAC', 'PCM_16'),
+    'ogg': ('OGG', 'VORBIS'),
+    'aiff': ('AIFF', 'PCM_16'),
+}
+
+
+def sine_sweep(duration, sample_rate):
+    # Exponential sweep 20 Hz -> Nyquist/2
+    t = np.arange(int(duration * sample_rate)) / sample_rate
+    f0, f1 = 20.0, sample_rate / 4
+    k = np.log(f1 / f0) / duration
+    return 0.5 * np.sin(2 * np.pi * f0 * (np.exp(k * t) - 1) / k)
+
+
+def noise(duration, sample_rate, seed=0):
+    # Pink-ish noise: white noise through a one-pole low-pass, mixed with the white part
+    rng = np.random.default_rng(seed)
+    white = rng.standard_normal(int(duration * sample_rate))
+    low = lfilter([0.02], [1, -0.98], white)
+    mixed = 0.6 * low / max(np.abs(low).max(), 1e-9) + 0.1 * white / max(np.abs(white).max(), 1e-9)
+    return 0.8 * mixed
+
+
+def speech_like(duration, sample_rate, seed=0):
+    # Voiced "syllables": a harmonic stack with formant-like weighting and a
+    # syllable-rate amplitude envelope, separated by pauses
+    rng = np.random.default_rng(seed)
+    n = int(duration * sample_rate)
+    y = np.zeros(n)
+    position = 0
+    while position < n:
+        length = int(rng.uniform(0.8, 3.5) * sample_rate)
+        pause = int(rng.uniform(0.15, 0.9) * sample_rate)
+        segment = min(length, n - position)
+        t = np.arange(segment) / sample_rate
+        pitch = rng.uniform(90, 220) * (1 + 0.05 * np.sin(2 * np.pi * 0.7 * t))
+        phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+        voice = sum(np.sin(h * phase) / h * np.exp(-((h * 150 - 700) / 900) ** 2) for h in range(1, 16))
+        envelope = np.clip(np.sin(2 * np.pi * rng.uniform(3, 5) * t), 0, None) ** 0.5
+        y[position:position + segment] = voice * envelope
+        position += segment + pause
+    return 0.7 * y / max(np.abs(y).max(), 1e-9)
+
+
+def synthesize(signal, duration, sample_rate=22050):
+    if signal == 'sweep':
+        return sine_sweep(duration, sample_rate).astype(np.float32)
+    if signal == 'noise':
+        return noise(duration, sample_rate).astype(np.float32)
+    if signal == 'speech':
+        return speech_like(duration, sample_rate).astype(np.float32)
+    raise ValueError(f'Unknown signal: {signal}')
+
+
+def encode(y, sample_rate, file_format):
+    container, subtype = FORMATS[file_format]
+    buffer = io.BytesIO()
+    sf.write(buffer, y, sample_rate, format=container, subtype=subtype)
+    return buffer.getvalue()
\ No newline at end of file
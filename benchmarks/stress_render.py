@@ -0,0 +1,162 @@
+"""Hammer /waveform/ and /spectrogram/ concurrently on a threaded WSGI server.
+
+Each distinct input is first requested once, sequentially, to get a reference
+PNG. That reference is checked to be a decodable image of the expected size
+that is not blank. Then hundreds of simultaneous requests are fired, and every
+response must match its reference byte for byte. The result cache is disabled,
+so every request really renders.
+    
+    python benchmarks/stress_render.py --requests 400 --concurrency 64
+    python benchmarks/stress_render.py --pool process --workers 4
+"""
+import argparse
+import io
+import os
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from socketserver import ThreadingMixIn
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from signals import SIGNALS, encode, synthesize  # noqa: E402
+
+
+ENDPOINTS = ('waveform', 'spectrogram')
+
+
+class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def multipart_body(filename, data):
+    boundary = uuid.uuid4().hex
+    body = (
+        f'--{boundary}\r\n'
+        f'Content-Disposition: form-data; name="audio_file"; filename="{filename}"\r\n'
+        f'Content-Type: application/octet-stream\r\n\r\n'
+    ).encode() + data + f'\r\n--{boundary}--\r\n'.encode()
+    return body, f'multipart/form-data; boundary={boundary}'
+
+
+def post(url, filename, data):
+    body, content_type = multipart_body(filename, data)
+    request = urllib.request.Request(url, data=body, headers={'Content-Type': content_type})
+    start = time.perf_counter()
+    with urllib.request.urlopen(request, timeout=600) as response:
+        content = response.read()
+        status = response.status
+    return status, content, time.perf_counter() - start
+
+
+def expected_size(endpoint):
+    if endpoint == 'waveform':
+        from waveform import WaveformGenerator as generator
+    else:
+        from spectrogram import SpectrogramGenerator as generator
+    width, height = generator.FIGURE_SIZE
+    return round(width * generator.DPI), round(height * generator.DPI)
+
+
+def check_png(content, endpoint):
+    from matplotlib.image import imread
+    
+    image = imread(io.BytesIO(content), format='png')
+    height, width = image.shape[:2]
+    if (width, height) != expected_size(endpoint):
+        return f'unexpected size {width}x{height}'
+    if float(image[..., :3].std()) == 0.0:
+        return 'blank image'
+    return None
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description='Concurrent rendering stress test')
+    parser.add_argument('--requests', type=int, default=400, help='total concurrent-phase requests')
+    parser.add_argument('--concurrency', type=int, default=64, help='simultaneous client connections')
+    parser.add_argument('--files', type=int, default=6, help='distinct input files')
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds of audio per file')
+    parser.add_argument('--pool', choices=('thread', 'process'), default='thread')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2)
+    args = parser.parse_args()
+    
+    # Must be set before the app modules read their configuration
+    os.environ['RESULT_CACHE_MAX_BYTES'] = '0'
+    os.environ['RESULT_CACHE_DIR'] = tempfile.mkdtemp(prefix='spectrolingua-stress-')
+    os.environ['RENDER_POOL'] = args.pool
+    os.environ['RENDER_WORKERS'] = str(args.workers)
+    
+    import main
+    
+    server = make_server('127.0.0.1', 0, main.application,
+                         server_class=ThreadingWSGIServer, handler_class=QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f'http://127.0.0.1:{server.server_port}'
+    
+    inputs = []
+    for index in range(args.files):
+        signal = SIGNALS[index % len(SIGNALS)]
+        y = synthesize(signal, args.duration + index) * (1 - 0.1 * index / args.files)
+        inputs.append((f'stress_{index}_{signal}.flac', encode(y, 22050, 'flac')))
+    
+    cases = [(endpoint, filename, data) for endpoint in ENDPOINTS for filename, data in inputs]
+    
+    print(f'Server {base_url} (render pool: {args.pool} x {args.workers})')
+    references = {}
+    for endpoint, filename, data in cases:
+        status, content, elapsed = post(f'{base_url}/{endpoint}/', filename, data)
+        problem = f'HTTP {status}' if status != 200 else check_png(content, endpoint)
+        if problem:
+            print(f'reference {endpoint} {filename} is invalid: {problem}')
+            sys.exit(1)
+        references[(endpoint, filename)] = content
+        print(f'reference {endpoint:<11} {filename:<24} {elapsed:6.2f}s {len(content):>8} bytes')
+    
+    def fire(number):
+        endpoint, filename, data = cases[number % len(cases)]
+        try:
+            status, content, elapsed = post(f'{base_url}/{endpoint}/', filename, data)
+        except Exception as e:
+            return endpoint, filename, f'error: {e}', 0.0
+        if status != 200:
+            return endpoint, filename, f'HTTP {status}', elapsed
+        if content != references[(endpoint, filename)]:
+            return endpoint, filename, 'PNG differs from reference', elapsed
+        return endpoint, filename, None, elapsed
+    
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        results = list(executor.map(fire, range(args.requests)))
+    wall = time.perf_counter() - start
+    server.shutdown()
+    
+    failures = [result for result in results if result[2] is not None]
+    latencies = sorted(result[3] for result in results if result[2] is None)
+    
+    print(f'\n{args.requests} requests, concurrency {args.concurrency}, {wall:.1f}s wall, '
+          f'{args.requests / wall:.1f} req/s')
+    if latencies:
+        print(f'latency p50 {latencies[len(latencies) // 2]:.2f}s  '
+              f'p95 {latencies[int(len(latencies) * 0.95) - 1]:.2f}s  max {latencies[-1]:.2f}s')
+    print(f'{len(results) - len(failures)} correct, {len(failures)} failed')
+    for endpoint, filename, problem, _ in failures[:20]:
+        print(f'  {endpoint} {filename}: {problem}')
+    
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main_cli()
\ No newline at end of file
@@ -0,0 +1,57 @@
+import base64
+import json
+import struct
+from typing import Tuple
+
+import numpy as np
+
+
+OUTPUT_FORMATS = ('png', 'json', 'binary')
+CONTENT_TYPES = {
+    'png': 'image/png',
+    'json': 'application/json',
+    'binary': 'application/octet-stream',
+}
+
+
+def parse_output_format(value: str) -> str:
+    output_format = (value or 'png').lower()
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unsupported output format: {value} (choose from {', '.join(OUTPUT_FORMATS)})")
+    return output_format
+
+
+def output_filename(base_name: str, suffix: str, output_format: str) -> str:
+    extension = {'png': 'png', 'json': 'json', 'binary': 'bin'}[output_format]
+    return f'{base_name}_{suffix}.{extension}'
+
+
+def encode_array_payload(meta: dict, array: np.ndarray, output_format: str) -> bytes:
+    """Serialize render-ready data for client-side drawing.
+    
+    json:   the metadata plus dtype, shape and the array bytes as base64 in `data`
+    binary: little-endian uint32 header length, the same JSON header without
+            `data`, then the raw C-order array bytes
+    """
+    array = np.ascontiguousarray(array)
+    header = dict(meta, dtype=array.dtype.str, shape=list(array.shape))
+    
+    if output_format == 'json':
+        header['data'] = base64.b64encode(array.tobytes()).decode('ascii')
+        return json.dumps(header).encode('utf-8')
+    
+    header_bytes = json.dumps(header).encode('utf-8')
+    return struct.pack('<I', len(header_bytes)) + header_bytes + array.tobytes()
+
+
+def decode_array_payload(data: bytes, output_format: str) -> Tuple[dict, np.ndarray]:
+    if output_format == 'json':
+        header = json.loads(data)
+        raw = base64.b64decode(header.pop('data'))
+    else:
+        (header_length,) = struct.unpack_from('<I', data)
+        header = json.loads(data[4:4 + header_length])
+        raw = data[4 + header_length:]
+    
+    array = np.frombuffer(raw, dtype=np.dtype(header['dtype'])).reshape(header['shape'])
+    return header, array
\ No newline at end of file
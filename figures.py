@@ -0,0 +1,141 @@
+import io
+from typing import Tuple
+
+import numpy as np
+from librosa.display import TimeFormatter
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.cm import ScalarMappable
+from matplotlib.collections import PolyCollection
+from matplotlib.colors import Normalize
+from matplotlib.figure import Figure
+from matplotlib.ticker import FixedLocator, FuncFormatter, MaxNLocator
+
+from render import colormap_lut, log_frequency_rows, quantize_db
+
+
+PLOT_MARGIN = 0.05
+
+
+def _axes_rect(figsize: Tuple[float, float], left: float, right: float, bottom: float,
+               top: float) -> Tuple[float, float, float, float]:
+    # Margins are in inches so labels keep their room at any figure width
+    width, height = figsize
+    return left / width, bottom / height, 1 - (left + right) / width, 1 - (bottom + top) / height
+
+
+def _padded_limits(low: float, high: float) -> Tuple[float, float]:
+    # Same 5% margins pyplot's autoscaling applied to the old figures
+    span = high - low or 1.0
+    return low - span * PLOT_MARGIN, high + span * PLOT_MARGIN
+
+
+def _to_png(figure: Figure) -> bytes:
+    buffer = io.BytesIO()
+    figure.canvas.print_png(buffer)
+    return buffer.getvalue()
+
+
+class WaveformTemplate:
+    """Prebuilt waveform figure: axes, labels and grid are created once, data artists are updated."""
+    
+    def __init__(self, figsize: Tuple[float, float], dpi: int):
+        self.figure = Figure(figsize=figsize, dpi=dpi)
+        FigureCanvasAgg(self.figure)
+        
+        self.axes = self.figure.add_axes(_axes_rect(figsize, 0.75, 0.15, 0.55, 0.35))
+        self.axes.set_xlabel('Time (seconds)')
+        self.axes.set_ylabel('Amplitude')
+        self.axes.grid(True, alpha=0.3)
+        
+        self.peaks = PolyCollection([], facecolors='C0', linewidths=0)
+        self.rms = PolyCollection([], facecolors='#5fa2dd', linewidths=0)
+        self.axes.add_collection(self.peaks)
+        self.axes.add_collection(self.rms)
+        self.line, = self.axes.plot([], [], color='C0')
+    
+    @staticmethod
+    def _band(times: np.ndarray, lower: np.ndarray, upper: np.ndarray) -> np.ndarray:
+        return np.concatenate([np.column_stack([times, upper]), np.column_stack([times, lower])[::-1]])
+    
+    def render_envelope(self, times: np.ndarray, mins: np.ndarray, maxs: np.ndarray, rms: np.ndarray,
+                        title: str, xlim: Tuple[float, float] = None) -> bytes:
+        self.line.set_visible(False)
+        self.peaks.set_verts([self._band(times, mins, maxs)])
+        self.rms.set_verts([self._band(times, -rms, rms)])
+        self.peaks.set_visible(True)
+        self.rms.set_visible(True)
+        
+        self.axes.set_xlim(xlim or _padded_limits(times[0], times[-1]))
+        self.axes.set_ylim(_padded_limits(float(mins.min()), float(maxs.max())))
+        self.axes.set_title(title)
+        return _to_png(self.figure)
+    
+    def render_samples(self, times: np.ndarray, y: np.ndarray, title: str) -> bytes:
+        self.peaks.set_visible(False)
+        self.rms.set_visible(False)
+        self.line.set_data(times, y)
+        self.line.set_visible(True)
+        
+        if len(y):
+            self.axes.set_xlim(_padded_limits(times[0], times[-1]))
+            self.axes.set_ylim(_padded_limits(float(y.min()), float(y.max())))
+        self.axes.set_title(title)
+        return _to_png(self.figure)
+
+
+class SpectrogramTemplate:
+    """Prebuilt spectrogram figure with a fixed dB colorbar; the image itself is a colormap lookup."""
+    
+    def __init__(self, figsize: Tuple[float, float], dpi: int, colormap: str, db_range: float):
+        self.figure = Figure(figsize=figsize, dpi=dpi)
+        FigureCanvasAgg(self.figure)
+        
+        self.axes = self.figure.add_axes(_axes_rect(figsize, 0.8, 1.55, 0.55, 0.35))
+        self.axes.set_xlabel('Time (seconds)')
+        self.axes.set_ylabel('Frequency (Hz)')
+        self.axes.xaxis.set_major_formatter(TimeFormatter(lag=False))
+        self.axes.xaxis.set_major_locator(MaxNLocator(prune=None, steps=[1, 1.5, 5, 6, 10]))
+        
+        colorbar_rect = _axes_rect(figsize, figsize[0] - 1.25, 1.1, 0.55, 0.35)
+        self.colorbar_axes = self.figure.add_axes(colorbar_rect)
+        mappable = ScalarMappable(norm=Normalize(-db_range, 0), cmap=colormap)
+        self.colorbar = self.figure.colorbar(mappable, cax=self.colorbar_axes, format='%+2.0f dB')
+        
+        self.image = self.axes.imshow(
+            np.zeros((1, 1, 3), dtype=np.uint8), origin='lower', aspect='auto', interpolation='none'
+        )
+        self.lut = colormap_lut(colormap)
+        self.db_range = db_range
+        
+        # Plot area size in device pixels, so the raster is drawn 1:1 without resampling
+        self.pixel_width = max(int(round(self.axes.bbox.width)), 1)
+        self.pixel_height = max(int(round(self.axes.bbox.height)), 1)
+    
+    def render(self, S_db: np.ndarray, sr: int, n_fft: int, hop_length: int, title: str,
+               frequency_range: Tuple[float, float], colorbar_label: str = None, time_offset: float = 0.0) -> bytes:
+        fmin, fmax = frequency_range
+        fmax = min(fmax, sr / 2)
+        duration = S_db.shape[1] * hop_length / sr
+        # Time of the first column, when only part of a file was analyzed
+        end = time_offset + duration
+        
+        # Position on the y axis is log2(Hz); each pixel row reads its nearest FFT bin
+        rows = log_frequency_rows(sr, n_fft, fmin, fmax, self.pixel_height, S_db.shape[0])
+        columns = np.minimum(
+            (np.arange(self.pixel_width) * S_db.shape[1] / self.pixel_width).astype(int), S_db.shape[1] - 1
+        )
+        indices = quantize_db(S_db[np.ix_(rows, columns)], self.db_range)
+        
+        low, high = np.log2(fmin), np.log2(fmax)
+        self.image.set_data(self.lut[indices])
+        self.image.set_extent((time_offset, end, low, high))
+        self.axes.set_xlim(time_offset, end)
+        self.axes.set_ylim(low, high)
+        
+        octaves = np.arange(np.ceil(low), np.floor(high) + 1)
+        self.axes.yaxis.set_major_locator(FixedLocator(octaves))
+        self.axes.yaxis.set_major_formatter(FuncFormatter(lambda value, _: f'{2 ** value:g}'))
+        
+        self.axes.set_title(title)
+        self.colorbar.set_label(colorbar_label or '')
+        return _to_png(self.figure)
\ No newline at end of file
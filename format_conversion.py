@@ -1,12 +1,182 @@
-import librosa
-import soundfile as sf
-import tempfile
 import os
-from typing import BinaryIO
+import struct
+import time
+import numpy as np
+import soundfile as sf
+from typing import BinaryIO, Iterator, Optional, Tuple, Union
+from audio_cache import audio_key, decoded_audio_cache, load_audio, load_audio_range
+from audio_io import content_digest, encode_wav, float_to_pcm16, frame_range, open_sample_accurate, upload_source, wav_header
+from metrics import STAGE_SECONDS, observe_audio, stage_timer
+
+
+# Sample sizes of the libsndfile subtypes that have one; lossy codecs have no bit depth
+SUBTYPE_BITS = {
+    'PCM_S8': 8, 'PCM_U8': 8, 'PCM_16': 16, 'PCM_24': 24, 'PCM_32': 32, 'FLOAT': 32, 'DOUBLE': 64,
+    'ALAC_16': 16, 'ALAC_20': 20, 'ALAC_24': 24, 'ALAC_32': 32,
+}
+MP4_CODECS = {b'mp4a': 'AAC', b'alac': 'ALAC', b'ac-3': 'AC3', b'ec-3': 'EAC3', b'Opus': 'OPUS', b'fLaC': 'FLAC'}
+# Placeholder sizes written by encoders that do not know the length up front
+UNKNOWN_DATA_SIZES = (0, 0xFFFFFFFF)
+
+
+def probe(source: Union[str, BinaryIO]) -> Optional[dict]:
+    """Read format, codec, duration, sample rate, channels and bit depth from the file's headers only.
+    
+    Works on partially received files: WAV and AIFF report the length their
+    header declares, and MP4 the length in its moov box when that comes first.
+    Returns None when the container cannot be parsed (e.g. WMA, raw AAC).
+    """
+    if isinstance(source, str):
+        with open(source, 'rb') as source_file:
+            return probe(source_file)
+    
+    try:
+        return _probe_soundfile(source) or _probe_mp4(source)
+    except (OSError, struct.error):
+        return None
+    finally:
+        source.seek(0)
+
+
+def _probe_soundfile(source: BinaryIO) -> Optional[dict]:
+    source.seek(0)
+    try:
+        info = sf.info(source)
+    except RuntimeError:
+        return None
+    
+    frames = info.frames
+    if info.format in ('WAV', 'AIFF'):
+        source.seek(0)
+        frames = max(frames, _declared_frames(source, info.format) or 0)
+    
+    return _describe(info.format.lower(), info.subtype, frames, info.samplerate, info.channels,
+                     SUBTYPE_BITS.get(info.subtype))
+
+
+def _chunks(source: BinaryIO, byteorder: str) -> Iterator[Tuple[bytes, int]]:
+    # RIFF/IFF chunks after the 12-byte file header, as (id, size); the
+    # source is left at the start of each chunk's data
+    position = 12
+    while True:
+        source.seek(position)
+        header = source.read(8)
+        if len(header) < 8:
+            return
+        chunk_id, size = struct.unpack(byteorder + '4sI', header)
+        yield chunk_id, size
+        position += 8 + size + (size & 1)
+
+
+def _declared_frames(source: BinaryIO, container: str) -> Optional[int]:
+    """Frame count the header declares, which libsndfile ignores when the file is cut short."""
+    if container == 'AIFF':
+        for chunk_id, _ in _chunks(source, '>'):
+            if chunk_id == b'COMM':
+                return struct.unpack('>hI', source.read(6))[1]
+        return None
+    
+    block_align = None
+    for chunk_id, size in _chunks(source, '<'):
+        if chunk_id == b'fmt ':
+            block_align = struct.unpack('<12xH', source.read(14))[0]
+        elif chunk_id == b'data':
+            if not block_align or size in UNKNOWN_DATA_SIZES:
+                return None
+            return size // block_align
+    return None
+
+
+def _mp4_boxes(source: BinaryIO, start: int, end: int) -> Iterator[Tuple[bytes, int, int]]:
+    # Child boxes as (type, content start, box end); only headers are read,
+    # so a multi-GB mdat is skipped with a single seek
+    position = start
+    while position + 8 <= end:
+        source.seek(position)
+        size, kind = struct.unpack('>I4s', source.read(8))
+        content = position + 8
+        if size == 1:
+            size = struct.unpack('>Q', source.read(8))[0]
+            content += 8
+        elif size == 0:
+            size = end - position
+        if size < content - position:
+            return
+        yield kind, content, position + size
+        position += size
+
+
+def _find_box(source: BinaryIO, start: int, end: int, *path: bytes) -> Optional[Tuple[int, int]]:
+    for kind, content, box_end in _mp4_boxes(source, start, end):
+        if kind == path[0]:
+            return (content, box_end) if len(path) == 1 else _find_box(source, content, box_end, *path[1:])
+    return None
+
+
+def _probe_mp4(source: BinaryIO) -> Optional[dict]:
+    end = source.seek(0, os.SEEK_END)
+    source.seek(4)
+    if source.read(4) != b'ftyp':
+        return None
+    
+    moov = _find_box(source, 0, end, b'moov')
+    if moov is None:
+        return None
+    
+    for kind, content, trak_end in _mp4_boxes(source, *moov):
+        if kind != b'trak':
+            continue
+        hdlr = _find_box(source, content, trak_end, b'mdia', b'hdlr')
+        if hdlr is None:
+            continue
+        source.seek(hdlr[0] + 8)
+        if source.read(4) != b'soun':
+            continue
+        
+        mdhd = _find_box(source, content, trak_end, b'mdia', b'mdhd')
+        stsd = _find_box(source, content, trak_end, b'mdia', b'minf', b'stbl', b'stsd')
+        if mdhd is None or stsd is None:
+            return None
+        
+        source.seek(mdhd[0])
+        if source.read(1) == b'\x01':
+            timescale, duration = struct.unpack('>19xIQ', source.read(31))
+        else:
+            timescale, duration = struct.unpack('>11xII', source.read(19))
+        
+        # First sample entry: 8-byte box header, 16 bytes of reserved/version
+        # fields, then channel count, sample size and 16.16 sample rate
+        source.seek(stsd[0] + 8)
+        entry = source.read(36)
+        codec = entry[4:8]
+        channels, sample_size = struct.unpack('>HH', entry[24:28])
+        sample_rate = struct.unpack('>I', entry[32:36])[0] >> 16 or timescale
+        if not timescale:
+            return None
+        
+        bit_depth = sample_size if codec in (b'alac', b'fLaC', b'lpcm') else None
+        frames = round(duration * sample_rate / timescale)
+        return _describe('mp4', MP4_CODECS.get(codec, codec.decode('latin-1').strip()), frames, sample_rate,
+                         channels, bit_depth)
+    return None
+
+
+def _describe(container: str, codec: str, frames: int, sample_rate: int, channels: int,
+              bit_depth: Optional[int]) -> dict:
+    return {
+        'format': container,
+        'codec': codec,
+        'duration': round(frames / sample_rate, 6) if sample_rate else None,
+        'sample_rate': sample_rate,
+        'channels': channels,
+        'bit_depth': bit_depth,
+        'frames': frames,
+    }
 
 
 class AudioConverter:
     SUPPORTED_FORMATS = ['mp3', 'mp4', 'wav', 'flac', 'aac', 'ogg', 'wma', 'm4a', 'aiff']
+    STREAM_CHUNK_FRAMES = 64 * 1024
     
     @staticmethod
     def convert_to_wav(audio_file: BinaryIO, original_filename: str) -> bytes:
@@ -15,26 +185,103 @@ class AudioConverter:
         if file_extension not in AudioConverter.SUPPORTED_FORMATS:
             raise ValueError(f"Unsupported audio format: {file_extension}")
         
-        with tempfile.NamedTemporaryFile(suffix=f'.{file_extension}', delete=False) as temp_input:
-            temp_input.write(audio_file.read())
-            temp_input_path = temp_input.name
+        with stage_timer('convert', 'decode'):
+            audio_data, sample_rate = load_audio(audio_file, original_filename)
+        observe_audio('convert', len(audio_data), sample_rate)
         
-        try:
-            audio_data, sample_rate = librosa.load(temp_input_path, sr=None)
-            
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_output:
-                temp_output_path = temp_output.name
-            
-            sf.write(temp_output_path, audio_data, sample_rate, format='WAV')
-            
-            with open(temp_output_path, 'rb') as wav_file:
-                wav_data = wav_file.read()
-            
-            os.unlink(temp_output_path)
-            return wav_data
+        with stage_timer('convert', 'encode'):
+            return encode_wav(audio_data, sample_rate)
+    
+    @staticmethod
+    def stream_wav(audio_file: BinaryIO, original_filename: str, chunk_frames: int = STREAM_CHUNK_FRAMES,
+                   start: float = 0.0, duration: float = None) -> Tuple[int, Iterator[bytes]]:
+        """Return the WAV size in bytes and a generator of header + PCM chunks.
+        
+        Produces the same bytes as convert_to_wav (mono PCM_16 at the native rate).
+        With start/duration (seconds) only that window is converted.
+        """
+        file_extension = original_filename.split('.')[-1].lower()
+        
+        if file_extension not in AudioConverter.SUPPORTED_FORMATS:
+            raise ValueError(f"Unsupported audio format: {file_extension}")
+        
+        cached = decoded_audio_cache.get(audio_key(content_digest(audio_file)))
+        source = upload_source(audio_file)
+        
+        if cached is None:
+            sound_file = open_sample_accurate(source)
             
+            # Containers libsndfile cannot read block by block without glitches
+            # (mp3, mp4, ...) are decoded in full, then chunked
+            if sound_file is None:
+                with stage_timer('convert', 'decode'):
+                    if start or duration is not None:
+                        # Decoded up to the end of the window only, so it is already trimmed
+                        audio_data, sample_rate, _ = load_audio_range(audio_file, original_filename, start, duration)
+                        cached, start, duration = (audio_data, sample_rate), 0.0, None
+                    else:
+                        cached = load_audio(audio_file, original_filename)
+        
+        if cached is not None:
+            audio_data, sample_rate = cached
+            first, frames = frame_range(len(audio_data), sample_rate, start, duration)
+            audio_data = audio_data[first:first + frames]
+            blocks = (audio_data[offset:offset + chunk_frames] for offset in range(0, frames, chunk_frames))
+        else:
+            sample_rate = sound_file.samplerate
+            first, frames = frame_range(sound_file.frames, sample_rate, start, duration)
+            sound_file.seek(first)
+            blocks = AudioConverter._mono_blocks(sound_file, chunk_frames)
+        
+        observe_audio('convert', frames, sample_rate)
+        header = wav_header(frames, sample_rate)
+        return len(header) + frames * 2, AudioConverter._wav_chunks(header, blocks, frames)
+    
+    @staticmethod
+    def _mono_blocks(sound_file: sf.SoundFile, chunk_frames: int) -> Iterator[np.ndarray]:
+        with sound_file:
+            for block in sound_file.blocks(blocksize=chunk_frames, dtype='float32', always_2d=True):
+                yield block.mean(axis=1)
+    
+    @staticmethod
+    def _wav_chunks(header: bytes, blocks: Iterator[np.ndarray], frames: int) -> Iterator[bytes]:
+        yield header
+        
+        # The header promised exactly `frames` samples; some decoders only
+        # estimate the length up front, so pad or truncate to match it.
+        # Stage time is summed per chunk so time spent sending to the client
+        # between chunks is not counted
+        remaining = frames
+        decode_seconds = encode_seconds = 0.0
+        blocks = iter(blocks)
+        try:
+            while remaining > 0:
+                start = time.perf_counter()
+                block = next(blocks, None)
+                decode_seconds += time.perf_counter() - start
+                if block is None:
+                    break
+                
+                start = time.perf_counter()
+                block = block[:remaining]
+                remaining -= len(block)
+                chunk = float_to_pcm16(block)
+                encode_seconds += time.perf_counter() - start
+                yield chunk
         finally:
-            os.unlink(temp_input_path)
+            # Releases the SoundFile behind _mono_blocks right away when the
+            # window ends before the file does or the client disconnects
+            close = getattr(blocks, 'close', None)
+            if close is not None:
+                close()
+        
+        STAGE_SECONDS.observe(decode_seconds, operation='convert', stage='decode')
+        STAGE_SECONDS.observe(encode_seconds, operation='convert', stage='encode')
+        
+        while remaining > 0:
+            padding = min(remaining, AudioConverter.STREAM_CHUNK_FRAMES)
+            remaining -= padding
+            yield bytes(padding * 2)
     
     @staticmethod
     def get_supported_formats():
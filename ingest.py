@@ -0,0 +1,145 @@
+import os
+from typing import Optional, Union
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.http import JsonResponse
+
+from format_conversion import probe
+from metrics import endpoint_label, stage_timer
+
+
+MAX_UPLOAD_BYTES = int(os.environ.get('MAX_UPLOAD_BYTES', 1024 ** 3))
+MAX_AUDIO_SECONDS = float(os.environ.get('MAX_AUDIO_SECONDS', 4 * 3600))
+UPLOAD_CHUNK_BYTES = int(os.environ.get('UPLOAD_CHUNK_BYTES', 1024 * 1024))
+# Bytes of a file received before its header is probed for the duration
+PROBE_BYTES = 64 * 1024
+
+
+class UploadRejected(Exception):
+    def __init__(self, message: str, status_code: int = 413):
+        super().__init__(message, status_code)
+        self.message = message
+        self.status_code = status_code
+    
+    def __str__(self):
+        return self.message
+
+
+def probe_duration(source: Union[str, object]) -> Optional[float]:
+    """Duration in seconds from the container header, or None if it cannot be read."""
+    info = probe(source)
+    return info['duration'] if info is not None else None
+
+
+def check_limits(size: int, duration: Optional[float]) -> None:
+    if MAX_UPLOAD_BYTES and size > MAX_UPLOAD_BYTES:
+        raise UploadRejected(f'Upload exceeds the maximum size of {MAX_UPLOAD_BYTES} bytes')
+    if MAX_AUDIO_SECONDS and duration is not None and duration > MAX_AUDIO_SECONDS:
+        raise UploadRejected(
+            f'Audio is {duration:.0f}s long; the maximum is {MAX_AUDIO_SECONDS:.0f}s'
+        )
+
+
+class SpoolingUploadHandler(TemporaryFileUploadHandler):
+    """Streams each uploaded file to the spool directory (UPLOAD_SPOOL_DIR, Django's
+    FILE_UPLOAD_TEMP_DIR) in chunks, enforcing the limits as it arrives.
+    
+    The size is checked on every chunk and the duration as soon as the header
+    is in, so oversize uploads are rejected before they are fully received or
+    decoded. Archives (.zip, for /batch/) are only size-limited.
+    """
+    
+    chunk_size = UPLOAD_CHUNK_BYTES
+    
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+        self.probed = not self.file_name or self.file_name.lower().endswith('.zip')
+    
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        self.file.write(raw_data)
+        
+        duration = None
+        if not self.probed and self.received >= PROBE_BYTES:
+            # WAV, AIFF and MP4 (moov first) headers declare the full length;
+            # containers whose length is only known at the end (ogg, mp3)
+            # under-report here, so a partial probe never rejects valid files
+            self.probed = True
+            self.file.flush()
+            duration = probe_duration(self.file.temporary_file_path())
+        self._check(duration)
+        return None
+    
+    def file_complete(self, file_size):
+        duration = None
+        if not self.file_name.lower().endswith('.zip'):
+            self.file.flush()
+            duration = probe_duration(self.file.temporary_file_path())
+        self._check(duration)
+        return super().file_complete(file_size)
+    
+    def _check(self, duration: Optional[float]) -> None:
+        try:
+            check_limits(self.received, duration)
+        except UploadRejected:
+            self.file.close()
+            raise
+
+
+def receive_upload(request) -> None:
+    """Parse a multipart request through SpoolingUploadHandler; the parse is timed as the upload stage.
+    
+    Raises UploadRejected when a file exceeds the limits. DRF reuses the parsed
+    request.POST/FILES afterwards.
+    """
+    if request.method != 'POST' or request.content_type != 'multipart/form-data':
+        return
+    
+    request.upload_handlers = [SpoolingUploadHandler(request)]
+    with stage_timer(endpoint_label(request), 'upload'):
+        request.POST
+
+
+def rejection_response(error: UploadRejected) -> JsonResponse:
+    return JsonResponse({'error': str(error)}, status=error.status_code)
+
+
+class IngestMiddleware:
+    """Rejects oversize requests from Content-Length before reading the body, then spools
+    multipart uploads with SpoolingUploadHandler."""
+    
+    sync_capable = True
+    async_capable = True
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+    
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return IngestMiddleware._early_rejection(request) or self.get_response(request)
+    
+    async def __acall__(self, request):
+        return IngestMiddleware._early_rejection(request) or await self.get_response(request)
+    
+    @staticmethod
+    def _early_rejection(request) -> Optional[JsonResponse]:
+        try:
+            check_limits(int(request.META.get('CONTENT_LENGTH') or 0), None)
+        except UploadRejected as e:
+            return rejection_response(e)
+        return None
+    
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # Async views (asgi.py) receive the upload on their executor thread instead
+        if iscoroutinefunction(view_func):
+            return None
+        try:
+            receive_upload(request)
+        except UploadRejected as e:
+            return rejection_response(e)
+        return None
\ No newline at end of file
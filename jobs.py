@@ -0,0 +1,238 @@
+import hashlib
+import io
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Union
+
+
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', os.cpu_count() or 2))
+JOB_QUEUE_DEPTH = int(os.environ.get('JOB_QUEUE_DEPTH', 16))
+JOB_RESULT_TTL = int(os.environ.get('JOB_RESULT_TTL', 600))
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class OperationError(Exception):
+    def __init__(self, message: str, status_code: int = 500):
+        # Both arguments go to Exception so the error survives pickling back
+        # from a worker process
+        super().__init__(message, status_code)
+        self.message = message
+        self.status_code = status_code
+    
+    def __str__(self):
+        return self.message
+
+
+OPERATION_FAILURES = {
+    'convert': 'Conversion failed',
+    'waveform': 'Waveform generation failed',
+    'spectrogram': 'Spectrogram generation failed',
+    'transcribe': 'Transcription failed',
+}
+
+
+def run_operation(operation: str, source: Union[bytes, str], filename: str, options: dict = None) -> dict:
+    """Run one operation on the file's bytes, or on the file at path `source`."""
+    if operation not in OPERATION_FAILURES:
+        raise OperationError(f'Unknown operation: {operation}', 400)
+    
+    options = options or {}
+    if isinstance(source, str):
+        try:
+            audio_file = open(source, 'rb')
+        except FileNotFoundError:
+            raise OperationError('The audio file is no longer available; upload it again', 404)
+    else:
+        audio_file = io.BytesIO(source)
+    base_name = filename.rsplit(".", 1)[0]
+    
+    with audio_file:
+        return _run(operation, audio_file, filename, base_name, options)
+
+
+def _run(operation: str, audio_file, filename: str, base_name: str, options: dict) -> dict:
+    # Imported here so the module stays light for the web process and each
+    # spawned worker only loads what its operations need
+    try:
+        if operation != 'transcribe':
+            from result_cache import ResultCache, result_cache, result_params
+            digest = hashlib.sha256()
+            for chunk in iter(lambda: audio_file.read(1024 * 1024), b''):
+                digest.update(chunk)
+            audio_file.seek(0)
+            key = ResultCache.make_key(digest.hexdigest(), operation, result_params(operation, filename))
+        
+        if operation == 'convert':
+            from format_conversion import AudioConverter
+            content = result_cache.get_or_compute(key, lambda: AudioConverter.convert_to_wav(audio_file, filename))
+            return {'content': content, 'content_type': 'audio/wav', 'filename': base_name + ".wav"}
+        
+        if operation == 'waveform':
+            from waveform import WaveformGenerator
+            content = result_cache.get_or_compute(
+                key, lambda: WaveformGenerator.generate_waveform_from_file(audio_file, filename)
+            )
+            return {'content': content, 'content_type': 'image/png', 'filename': base_name + "_waveform.png"}
+        
+        if operation == 'spectrogram':
+            from spectrogram import SpectrogramGenerator
+            content = result_cache.get_or_compute(
+                key, lambda: SpectrogramGenerator.generate_spectrogram_from_file(audio_file, filename)
+            )
+            return {'content': content, 'content_type': 'image/png', 'filename': base_name + "_spectrogram.png"}
+        
+        from transcribe import AudioTranscriber
+        language = options.get('language', 'en-US')
+        segments = AudioTranscriber.transcribe_segments(audio_file, filename, language)
+        return {'json': {
+            'transcription': AudioTranscriber.join_segments(segments),
+            'language': language,
+            'filename': filename,
+            'segments': segments,
+        }}
+        
+    except ValueError as e:
+        raise OperationError(str(e), 400)
+    except Exception as e:
+        if operation == 'transcribe':
+            raise OperationError(f'Transcription failed: {str(e)}', 500)
+        raise OperationError(OPERATION_FAILURES[operation], 500)
+
+
+class Job:
+    def __init__(self, job_id: str, operation: str, filename: str, future, temporary_path: str = None):
+        self.id = job_id
+        self.operation = operation
+        self.filename = filename
+        self.future = future
+        # Spooled copy of the upload owned by the job, deleted once it finishes
+        self.temporary_path = temporary_path
+        self.created_at = time.time()
+        self.finished_at = None
+    
+    @property
+    def status(self) -> str:
+        if self.future.done():
+            return 'failed' if self.future.exception() is not None else 'done'
+        return 'running' if self.future.running() else 'queued'
+    
+    def to_dict(self) -> dict:
+        info = {
+            'job_id': self.id,
+            'operation': self.operation,
+            'filename': self.filename,
+            'status': self.status,
+        }
+        if info['status'] == 'failed':
+            info['error'] = str(self.future.exception())
+        return info
+
+
+class JobQueue:
+    """Runs audio operations in a local process pool with bounded queue depth."""
+    
+    def __init__(self, max_workers: int = JOB_WORKERS, max_depth: int = JOB_QUEUE_DEPTH,
+                 result_ttl: int = JOB_RESULT_TTL):
+        self.max_workers = max_workers
+        self.max_depth = max_depth
+        self.result_ttl = result_ttl
+        self._executor = None
+        self._jobs = {}
+        self._active = 0
+        self._lock = threading.Lock()
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is not None and self._executor._broken:
+            # A worker died (e.g. OOM-killed); the pool refuses all further work
+            self._reset_executor()
+        if self._executor is None:
+            # spawn avoids forking a multi-threaded server process
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return self._executor
+    
+    def _reset_executor(self) -> None:
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _submit_to_pool(self, *args):
+        try:
+            return self._get_executor().submit(*args)
+        except (BrokenProcessPool, RuntimeError):
+            # The pool broke or was shut down since it was last checked; retry once on a new one
+            self._reset_executor()
+            return self._get_executor().submit(*args)
+    
+    def _on_done(self, job: Job, future) -> None:
+        with self._lock:
+            self._active -= 1
+            job.finished_at = time.time()
+        
+        if job.temporary_path is not None:
+            try:
+                os.unlink(job.temporary_path)
+            except FileNotFoundError:
+                pass
+    
+    def _purge_expired(self) -> None:
+        cutoff = time.time() - self.result_ttl
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished_at is not None and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+    
+    def submit(self, operation: str, source: Union[bytes, str], filename: str, options: dict = None,
+               temporary: bool = False) -> Job:
+        """Queue an operation on file bytes or a file path; workers open paths themselves,
+        so large uploads are not pickled. With temporary=True the queue owns the
+        file at `source` and deletes it when the job finishes or is refused."""
+        try:
+            with self._lock:
+                self._purge_expired()
+                if self._active >= self.max_depth:
+                    raise QueueFullError(f'Job queue is full ({self.max_depth} jobs pending)')
+                
+                future = self._submit_to_pool(run_operation, operation, source, filename, options)
+                job = Job(uuid.uuid4().hex, operation, filename, future, source if temporary else None)
+                self._jobs[job.id] = job
+                self._active += 1
+        except BaseException:
+            # The job never started, so the file it would have owned is removed here
+            if temporary:
+                try:
+                    os.unlink(source)
+                except FileNotFoundError:
+                    pass
+            raise
+        
+        future.add_done_callback(lambda f: self._on_done(job, f))
+        return job
+    
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            self._purge_expired()
+            return self._jobs.get(job_id)
+    
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'active': self._active,
+                'max_depth': self.max_depth,
+                'workers': self.max_workers,
+                # A dead worker breaks the pool until the next submit rebuilds it
+                'broken': bool(self._executor is not None and self._executor._broken),
+            }
+
+
+job_queue = JobQueue()
\ No newline at end of file
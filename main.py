@@ -7,10 +7,11 @@ from django.urls import path, re_path
 
 if not settings.configured:
     settings.configure(
-        DEBUG=True,
-        SECRET_KEY='your-secret-key-here',
-        ROOT_URLCONF=__name__,
-        ALLOWED_HOSTS=['*'],
+        DEBUG=os.environ.get('DEBUG', 'True').lower() in ('1', 'true', 'yes'),
+        SECRET_KEY=os.environ.get('SECRET_KEY', 'your-secret-key-here'),
+        # asgi.py serves the same routes with async views
+        ROOT_URLCONF=os.environ.get('ROOT_URLCONF', __name__),
+        ALLOWED_HOSTS=os.environ.get('ALLOWED_HOSTS', '*').split(','),
         INSTALLED_APPS=[
             'django.contrib.contenttypes',
             'django.contrib.auth',
@@ -34,8 +35,13 @@ if not settings.configured:
             },
         ],
         STATIC_URL='/static/',
+        # Uploads are spooled here by ingest.SpoolingUploadHandler
+        FILE_UPLOAD_TEMP_DIR=os.environ.get('UPLOAD_SPOOL_DIR') or None,
         MIDDLEWARE=[
             'django.middleware.common.CommonMiddleware',
+            'metrics.MetricsMiddleware',
+            'ingest.IngestMiddleware',
+            'profiling.ProfilingMiddleware',
         ],
         USE_TZ=True,
         REST_FRAMEWORK={
@@ -48,17 +54,27 @@ if not settings.configured:
 
 
 from swagger_config import schema_view
-from api_endpoints import convert_audio, supported_formats, health_check, generate_waveform, generate_spectrogram, transcribe_audio, supported_languages
+from api_endpoints import convert_audio, supported_formats, health_check, generate_waveform, generate_spectrogram, transcribe_audio, supported_languages, job_status, batch_process, analyze_audio, upload_asset, asset_detail, create_upload, upload_session, complete_upload, export_metrics, audio_info
 
 
 urlpatterns = [
     path('convert/', convert_audio, name='convert_audio'),
     path('formats/', supported_formats, name='supported_formats'),
     path('health/', health_check, name='health_check'),
+    path('metrics/', export_metrics, name='export_metrics'),
     path('waveform/', generate_waveform, name='generate_waveform'),
     path('spectrogram/', generate_spectrogram, name='generate_spectrogram'),
     path('transcribe/', transcribe_audio, name='transcribe_audio'),
+    path('info/', audio_info, name='audio_info'),
     path('languages/', supported_languages, name='supported_languages'),
+    path('jobs/<str:job_id>/', job_status, name='job_status'),
+    path('batch/', batch_process, name='batch_process'),
+    path('analyze/', analyze_audio, name='analyze_audio'),
+    path('assets/', upload_asset, name='upload_asset'),
+    path('assets/<str:asset_id>/', asset_detail, name='asset_detail'),
+    path('uploads/', create_upload, name='create_upload'),
+    path('uploads/<str:upload_id>/', upload_session, name='upload_session'),
+    path('uploads/<str:upload_id>/complete/', complete_upload, name='complete_upload'),
     re_path(r'^swagger(?P<format>\.json|\.yaml)$', schema_view.without_ui(cache_timeout=0), name='schema-json'),
     re_path(r'^docs/$', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
     re_path(r'^redoc/$', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
@@ -66,6 +82,11 @@ urlpatterns = [
 
 application = get_wsgi_application()
 
+from warmup import WARMUP_ON_START, warm_up
+
+if WARMUP_ON_START:
+    warm_up()
+
 
 if __name__ == '__main__':
     import sys
@@ -0,0 +1,232 @@
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.urls import Resolver404, resolve
+
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+BYTES_BUCKETS = tuple(1024 * 4 ** power for power in range(11))  # 1 KiB .. 1 GiB
+AUDIO_SECONDS_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600, 7200)
+
+# Stage durations of the request being handled, for its Server-Timing header
+_request_stages = contextvars.ContextVar('request_stages', default=None)
+
+
+def _format_labels(labelnames: Sequence[str], values: Tuple[str, ...], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Metric:
+    kind = None
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+    
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+    
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+    
+    def expose(self) -> str:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        lines.extend(self.samples())
+        return '\n'.join(lines)
+
+
+class Counter(Metric):
+    kind = 'counter'
+    
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+    
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}'
+                for key, value in values]
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DURATION_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+    
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[index] += 1
+            self._values[key] = (counts, total + value)
+    
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+        
+        lines = []
+        for key, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f'{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}')
+            lines.append(f'{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}')
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+    
+    def register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+    
+    def expose(self) -> str:
+        return '\n'.join(metric.expose() for metric in self._metrics) + '\n'
+
+
+REGISTRY = Registry()
+
+REQUESTS = REGISTRY.register(Counter(
+    'spectrolingua_http_requests_total', 'HTTP requests by endpoint, method and status.',
+    ('endpoint', 'method', 'status')
+))
+REQUEST_SECONDS = REGISTRY.register(Histogram(
+    'spectrolingua_http_request_duration_seconds', 'Time to produce the response, excluding streamed bodies.',
+    ('endpoint', 'method')
+))
+REQUEST_BYTES = REGISTRY.register(Histogram(
+    'spectrolingua_http_request_bytes', 'Request body size.', ('endpoint',), buckets=BYTES_BUCKETS
+))
+RESPONSE_BYTES = REGISTRY.register(Histogram(
+    'spectrolingua_http_response_bytes', 'Response body size.', ('endpoint',), buckets=BYTES_BUCKETS
+))
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    'spectrolingua_stage_duration_seconds',
+    'Time spent per processing stage (upload, probe, decode, dsp, render, encode, recognize).',
+    ('operation', 'stage')
+))
+AUDIO_SECONDS = REGISTRY.register(Histogram(
+    'spectrolingua_audio_duration_seconds', 'Duration of the audio processed.', ('operation',),
+    buckets=AUDIO_SECONDS_BUCKETS
+))
+
+
+@contextmanager
+def stage_timer(operation: str, stage: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, operation=operation, stage=stage)
+        stages = _request_stages.get()
+        if stages is not None:
+            stages[stage] = stages.get(stage, 0.0) + elapsed
+
+
+def server_timing(stages: Dict[str, float], total: float) -> str:
+    entries = [f'{stage};dur={seconds * 1000:.1f}' for stage, seconds in stages.items()]
+    entries.append(f'total;dur={total * 1000:.1f}')
+    return ', '.join(entries)
+
+
+def observe_audio(operation: str, samples: int, sample_rate: int) -> None:
+    if sample_rate:
+        AUDIO_SECONDS.observe(samples / sample_rate, operation=operation)
+
+
+def endpoint_label(request) -> str:
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        # Responses from middleware that run before URL resolution
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return 'unmatched'
+    return match.route.rstrip('/') or '/'
+
+
+class MetricsMiddleware:
+    """Records request counts, latency and body sizes, and reports the stages of each
+    request in a Server-Timing header."""
+    
+    sync_capable = True
+    async_capable = True
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+    
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        
+        stages = {}
+        token = _request_stages.set(stages)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_stages.reset(token)
+        return self._record(request, response, stages, time.perf_counter() - start)
+    
+    async def __acall__(self, request):
+        stages = {}
+        token = _request_stages.set(stages)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_stages.reset(token)
+        return self._record(request, response, stages, time.perf_counter() - start)
+    
+    @staticmethod
+    def _record(request, response, stages: Dict[str, float], elapsed: float):
+        # Streamed bodies are produced after the headers are sent, so only
+        # the stages run before the response was returned can be reported
+        response['Server-Timing'] = server_timing(stages, elapsed)
+        
+        endpoint = endpoint_label(request)
+        REQUESTS.inc(endpoint=endpoint, method=request.method, status=response.status_code)
+        REQUEST_SECONDS.observe(elapsed, endpoint=endpoint, method=request.method)
+        REQUEST_BYTES.observe(int(request.META.get('CONTENT_LENGTH') or 0), endpoint=endpoint)
+        
+        if response.has_header('Content-Length'):
+            RESPONSE_BYTES.observe(int(response['Content-Length']), endpoint=endpoint)
+        elif not response.streaming:
+            RESPONSE_BYTES.observe(len(response.content), endpoint=endpoint)
+        return response
\ No newline at end of file
@@ -0,0 +1,133 @@
+import cProfile
+import io
+import marshal
+import os
+import pstats
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.http import HttpResponse, JsonResponse
+
+from render import run_inline
+
+
+PROFILE_REQUESTS = os.environ.get('PROFILE_REQUESTS', '').lower() in ('1', 'true', 'yes')
+PROFILE_TOKEN = os.environ.get('PROFILE_TOKEN', '')
+PROFILE_LINES = int(os.environ.get('PROFILE_LINES', 60))
+PROFILE_SORT_KEYS = ('cumulative', 'tottime', 'ncalls')
+
+
+class ProfilingMiddleware:
+    """Runs a request under cProfile when it asks for ?profile=1 and returns the stats instead.
+    
+    Off unless PROFILE_REQUESTS is set; with PROFILE_TOKEN set, the request must
+    also carry a matching X-Profile-Token header. ?profile=raw returns the
+    marshalled stats for pstats or snakeviz; ?profile_sort picks the sort key
+    of the text report.
+    """
+    
+    sync_capable = True
+    async_capable = True
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+    
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        
+        mode, sort_key, error = ProfilingMiddleware._options(request)
+        if error is not None or mode is None:
+            return error or self.get_response(request)
+        
+        # cProfile only sees the thread it runs on, so rendering is kept off the
+        # render pool and streamed bodies are produced inside the profile
+        profiler = cProfile.Profile()
+        token = run_inline.set(True)
+        start = time.perf_counter()
+        try:
+            profiler.enable()
+            response = self.get_response(request)
+            body_bytes = ProfilingMiddleware._consume(response)
+            profiler.disable()
+        finally:
+            run_inline.reset(token)
+        
+        return ProfilingMiddleware._report(request, response, profiler, body_bytes,
+                                           time.perf_counter() - start, mode, sort_key)
+    
+    async def __acall__(self, request):
+        mode, sort_key, error = ProfilingMiddleware._options(request)
+        if error is not None or mode is None:
+            return error or await self.get_response(request)
+        
+        # The view then runs on the event loop thread instead of its executor;
+        # the profile also picks up anything else the loop runs meanwhile
+        profiler = cProfile.Profile()
+        token = run_inline.set(True)
+        start = time.perf_counter()
+        try:
+            profiler.enable()
+            response = await self.get_response(request)
+            if response.streaming and response.is_async:
+                body_bytes = 0
+                async for chunk in response.streaming_content:
+                    body_bytes += len(chunk)
+            else:
+                body_bytes = ProfilingMiddleware._consume(response)
+            profiler.disable()
+        finally:
+            run_inline.reset(token)
+        
+        return ProfilingMiddleware._report(request, response, profiler, body_bytes,
+                                           time.perf_counter() - start, mode, sort_key)
+    
+    @staticmethod
+    def _options(request):
+        """Return (mode, sort key, error response); mode is None when the request is not profiled."""
+        mode = request.GET.get('profile', '')
+        if not PROFILE_REQUESTS or mode in ('', '0'):
+            return None, None, None
+        
+        if PROFILE_TOKEN and request.headers.get('X-Profile-Token') != PROFILE_TOKEN:
+            return None, None, JsonResponse(
+                {'error': 'Profiling requires a valid X-Profile-Token header'}, status=403
+            )
+        
+        sort_key = request.GET.get('profile_sort', 'cumulative')
+        if sort_key not in PROFILE_SORT_KEYS:
+            return None, None, JsonResponse(
+                {'error': f"Unsupported profile_sort: {sort_key} (choose from {', '.join(PROFILE_SORT_KEYS)})"},
+                status=400
+            )
+        return mode, sort_key, None
+    
+    @staticmethod
+    def _report(request, response, profiler: cProfile.Profile, body_bytes: int, elapsed: float,
+                mode: str, sort_key: str) -> HttpResponse:
+        if mode == 'raw':
+            profiler.create_stats()
+            profile = HttpResponse(marshal.dumps(profiler.stats), content_type='application/octet-stream')
+            profile['Content-Disposition'] = 'attachment; filename="request.prof"'
+        else:
+            report = io.StringIO()
+            report.write(f'{request.method} {request.get_full_path()}\n')
+            report.write(f"Response: {response.status_code} {response.get('Content-Type', '')}, "
+                         f'{body_bytes} bytes in {elapsed:.3f}s\n\n')
+            pstats.Stats(profiler, stream=report).sort_stats(sort_key).print_stats(PROFILE_LINES)
+            profile = HttpResponse(report.getvalue(), content_type='text/plain; charset=utf-8')
+        
+        profile['Cache-Control'] = 'no-store'
+        return profile
+    
+    @staticmethod
+    def _consume(response) -> int:
+        if not response.streaming:
+            return len(response.content)
+        
+        body_bytes = 0
+        for chunk in response.streaming_content:
+            body_bytes += len(chunk)
+        return body_bytes
\ No newline at end of file
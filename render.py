@@ -0,0 +1,135 @@
+import contextvars
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Tuple
+
+import numpy as np
+
+
+RENDER_POOL = os.environ.get('RENDER_POOL', 'thread')
+RENDER_WORKERS = int(os.environ.get('RENDER_WORKERS', os.cpu_count() or 2))
+
+# Figures (see figures.py, imported on first render to keep matplotlib out of
+# startup) are built once per thread and reused; matplotlib artists are not
+# safe to share between threads, but separate figures rendered with the
+# object-oriented Agg API are
+_local = threading.local()
+MAX_TEMPLATES_PER_THREAD = 8
+
+# Set while a request is profiled, so rendering (and, under ASGI, the offloaded
+# view) runs on the profiled thread
+run_inline = contextvars.ContextVar('run_inline', default=False)
+
+
+def _template(kind, factory, *args):
+    templates = getattr(_local, 'templates', None)
+    if templates is None:
+        templates = _local.templates = {}
+    
+    key = (kind,) + args
+    template = templates.get(key)
+    if template is None:
+        if len(templates) >= MAX_TEMPLATES_PER_THREAD:
+            templates.clear()
+        template = templates[key] = factory(*args)
+    return template
+
+
+_luts = {}
+
+
+def colormap_lut(name: str) -> np.ndarray:
+    lut = _luts.get(name)
+    if lut is None:
+        from matplotlib import colormaps
+        
+        lut = _luts[name] = (colormaps[name](np.arange(256))[:, :3] * 255).round().astype(np.uint8)
+    return lut
+
+
+def quantize_db(S_db: np.ndarray, db_range: float) -> np.ndarray:
+    """Map dB values relative to the peak (-db_range..0) onto colormap indices 0..255."""
+    scaled = (np.asarray(S_db, dtype=np.float32) + db_range) * (255.0 / db_range)
+    return np.clip(np.round(scaled), 0, 255).astype(np.uint8)
+
+
+def log_frequency_rows(sr: int, n_fft: int, fmin: float, fmax: float, height: int, bins: int) -> np.ndarray:
+    # FFT bin nearest to the centre frequency of each log-spaced pixel row
+    low, high = np.log2(fmin), np.log2(fmax)
+    centers = np.exp2(low + (np.arange(height) + 0.5) * (high - low) / height)
+    return np.minimum(np.round(centers * n_fft / sr).astype(int), bins - 1)
+
+
+def render_waveform_envelope(figsize: Tuple[float, float], dpi: int, times: np.ndarray, mins: np.ndarray,
+                             maxs: np.ndarray, rms: np.ndarray, title: str,
+                             xlim: Tuple[float, float] = None) -> bytes:
+    from figures import WaveformTemplate
+    
+    template = _template('waveform', WaveformTemplate, tuple(figsize), dpi)
+    return template.render_envelope(times, mins, maxs, rms, title, xlim)
+
+
+def render_waveform_samples(figsize: Tuple[float, float], dpi: int, times: np.ndarray, y: np.ndarray,
+                            title: str) -> bytes:
+    from figures import WaveformTemplate
+    
+    template = _template('waveform', WaveformTemplate, tuple(figsize), dpi)
+    return template.render_samples(times, y, title)
+
+
+def render_spectrogram(figsize: Tuple[float, float], dpi: int, S_db: np.ndarray, sr: int, n_fft: int,
+                       hop_length: int, title: str, frequency_range: Tuple[float, float],
+                       colorbar_label: str = None, colormap: str = 'viridis', db_range: float = 80.0,
+                       time_offset: float = 0.0) -> bytes:
+    from figures import SpectrogramTemplate
+    
+    template = _template('spectrogram', SpectrogramTemplate, tuple(figsize), dpi, colormap, db_range)
+    return template.render(S_db, sr, n_fft, hop_length, title, frequency_range, colorbar_label, time_offset)
+
+
+class RenderPool:
+    """Bounded pool that all figure rendering goes through.
+    
+    'thread' keeps rendering in-process on a fixed set of threads, each with
+    its own figure templates; 'process' moves it to spawned worker processes
+    so rendering never competes with request threads for the GIL.
+    """
+    
+    KINDS = ('thread', 'process')
+    
+    def __init__(self, kind: str = RENDER_POOL, max_workers: int = RENDER_WORKERS):
+        if kind not in RenderPool.KINDS:
+            raise ValueError(f"Unknown render pool kind: {kind} (choose from {', '.join(RenderPool.KINDS)})")
+        self.kind = kind
+        self.max_workers = max_workers
+        self._executor = None
+        self._lock = threading.Lock()
+    
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.kind == 'process':
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=multiprocessing.get_context('spawn')
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix='render'
+                    )
+            return self._executor
+    
+    def run(self, function: Callable[..., bytes], *args, **kwargs) -> bytes:
+        # Job and batch workers are already separate processes; render inline there
+        # rather than nesting another pool
+        if multiprocessing.parent_process() is not None or run_inline.get():
+            return function(*args, **kwargs)
+        return self._get_executor().submit(function, *args, **kwargs).result()
+    
+    def stats(self) -> dict:
+        return {'kind': self.kind, 'workers': self.max_workers}
+
+
+render_pool = RenderPool()
\ No newline at end of file
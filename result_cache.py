@@ -0,0 +1,209 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from typing import BinaryIO, Callable, Iterator, Optional
+
+
+RESULT_CACHE_DIR = os.environ.get(
+    'RESULT_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'spectrolingua-results')
+)
+RESULT_CACHE_MAX_BYTES = int(os.environ.get('RESULT_CACHE_MAX_BYTES', 1024 * 1024 * 1024))
+# Bump when rendered output changes so stale PNGs and their ETags are not served
+RENDERER_VERSION = 2
+
+
+class ResultCache:
+    """Content-addressed on-disk cache for rendered PNGs and converted WAVs."""
+    
+    def __init__(self, directory: str = RESULT_CACHE_DIR, max_bytes: int = RESULT_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # Running size of the entries, seeded from disk on first use so writes
+        # only walk the directory when the budget is actually exceeded
+        self._total_bytes = None
+    
+    @staticmethod
+    def make_key(content_digest: str, operation: str, params: dict) -> str:
+        payload = json.dumps([content_digest, operation, params], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key)
+    
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as cached_file:
+                data = cached_file.read()
+        except FileNotFoundError:
+            return None
+        
+        # Touch the entry so eviction drops the least recently used results first
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return data
+    
+    def open(self, key: str) -> Optional[BinaryIO]:
+        path = self._path(key)
+        try:
+            cached_file = open(path, 'rb')
+        except FileNotFoundError:
+            return None
+        
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return cached_file
+    
+    def tee(self, key: str, chunks: Iterator[bytes]) -> Iterator[bytes]:
+        """Pass chunks through while writing them to the cache; only complete streams are kept.
+        
+        Streams larger than max_bytes are passed through without being cached,
+        like put(), instead of evicting every other entry to make room.
+        """
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        temp_file = os.fdopen(fd, 'wb')
+        
+        written = 0
+        try:
+            for chunk in chunks:
+                if temp_file is not None:
+                    written += len(chunk)
+                    if written > self.max_bytes:
+                        temp_file.close()
+                        os.unlink(temp_path)
+                        temp_file = None
+                    else:
+                        temp_file.write(chunk)
+                yield chunk
+            
+            if temp_file is not None:
+                temp_file.close()
+                self._replace(temp_path, path)
+                temp_file = None
+                self._evict()
+        finally:
+            # Client disconnects close the generator early; drop the partial file
+            if temp_file is not None:
+                temp_file.close()
+                os.unlink(temp_path)
+    
+    def put(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        
+        # Write to a sibling temp file and rename so readers never see partial results
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as temp_file:
+                temp_file.write(data)
+            self._replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        
+        self._evict()
+    
+    def get_or_compute(self, key: str, compute: Callable[[], bytes]) -> bytes:
+        data = self.get(key)
+        if data is None:
+            data = compute()
+            self.put(key, data)
+        return data
+    
+    def _replace(self, temp_path: str, path: str) -> None:
+        # Move a finished temp file into place and account for its size
+        size = os.path.getsize(temp_path)
+        with self._lock:
+            try:
+                previous = os.path.getsize(path)
+            except FileNotFoundError:
+                previous = 0
+            os.replace(temp_path, path)
+            if self._total_bytes is not None:
+                self._total_bytes += size - previous
+    
+    def _evict(self) -> None:
+        with self._lock:
+            if self._total_bytes is not None and self._total_bytes <= self.max_bytes:
+                return
+            
+            # Other processes share the directory, so the running total is only
+            # an estimate; walking re-syncs it before anything is deleted
+            entries = []
+            total = 0
+            for root, _, files in os.walk(self.directory):
+                for name in files:
+                    if name.endswith('.tmp'):
+                        continue
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, path))
+                    total += stat.st_size
+            
+            if total > self.max_bytes:
+                entries.sort()
+                for _, size, path in entries:
+                    try:
+                        os.unlink(path)
+                    except FileNotFoundError:
+                        pass
+                    total -= size
+                    if total <= self.max_bytes:
+                        break
+            self._total_bytes = total
+
+
+def result_params(operation: str, original_filename: str) -> dict:
+    # Everything besides the audio content that changes the produced bytes
+    if operation == 'convert':
+        return {'format': 'wav'}
+    
+    if operation == 'waveform':
+        from waveform import WaveformGenerator
+        return {
+            'title': original_filename,
+            'figure_size': WaveformGenerator.FIGURE_SIZE,
+            'dpi': WaveformGenerator.DPI,
+            'columns': WaveformGenerator.ENVELOPE_COLUMNS,
+            'renderer': RENDERER_VERSION,
+        }
+    
+    if operation == 'peaks':
+        from waveform import WaveformGenerator
+        return {
+            'format': 'npz-int16',
+            'base_bin': WaveformGenerator.PYRAMID_BASE_BIN,
+            'min_bins': WaveformGenerator.PYRAMID_MIN_BINS,
+        }
+    
+    if operation == 'spectrogram':
+        from spectrogram import SpectrogramGenerator
+        return {
+            'title': original_filename,
+            'figure_size': SpectrogramGenerator.FIGURE_SIZE,
+            'dpi': SpectrogramGenerator.DPI,
+            'n_fft': SpectrogramGenerator.N_FFT,
+            'hop_length': SpectrogramGenerator.HOP_LENGTH,
+            'columns': SpectrogramGenerator.TIME_COLUMNS,
+            'renderer': RENDERER_VERSION,
+        }
+    
+    raise ValueError(f"Results of '{operation}' are not cached")
+
+
+result_cache = ResultCache()
\ No newline at end of file
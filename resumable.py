@@ -0,0 +1,270 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from typing import BinaryIO, Optional, Tuple
+
+from django.core.files import File
+
+from audio_io import CHUNK_SIZE
+from ingest import PROBE_BYTES, check_limits, probe_duration
+
+
+UPLOAD_SESSION_DIR = os.environ.get(
+    'UPLOAD_SESSION_DIR', os.path.join(tempfile.gettempdir(), 'spectrolingua-uploads')
+)
+# Seconds an unfinished upload is kept after its last chunk
+UPLOAD_SESSION_TTL = int(os.environ.get('UPLOAD_SESSION_TTL', 24 * 3600))
+
+CONTENT_RANGE_PATTERN = re.compile(r'^bytes (\d+)-(\d+)/(\d+|\*)$')
+UPLOAD_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+
+class ResumableUploadError(Exception):
+    def __init__(self, message: str, status_code: int = 400, offset: int = None):
+        super().__init__(message, status_code)
+        self.message = message
+        self.status_code = status_code
+        # Where the client should resume, for 409 responses
+        self.offset = offset
+    
+    def __str__(self):
+        return self.message
+
+
+class SpooledPart(File):
+    """A completed upload handed to the asset store, which moves it instead of copying."""
+    
+    def __init__(self, path: str, name: str, sha256: str):
+        super().__init__(open(path, 'rb'), name=name)
+        self.path = path
+        self.sha256 = sha256
+    
+    def temporary_file_path(self) -> str:
+        return self.path
+
+
+def parse_content_range(value: str) -> Tuple[int, int, Optional[int]]:
+    """Parse `bytes start-end/total` into (start, end exclusive, total or None)."""
+    match = CONTENT_RANGE_PATTERN.match((value or '').strip())
+    if match is None:
+        raise ResumableUploadError('A Content-Range header of the form "bytes start-end/total" is required')
+    start, last, total = int(match.group(1)), int(match.group(2)), match.group(3)
+    if last < start:
+        raise ResumableUploadError(f'Invalid Content-Range: {value}')
+    return start, last + 1, None if total == '*' else int(total)
+
+
+class ResumableUploads:
+    """Upload sessions that receive a file as a series of byte ranges.
+    
+    Each session is a part file plus a JSON state file, so an interrupted
+    transfer resumes from the last stored byte, from any server process. Chunks
+    must arrive in order; the header is probed as soon as it is in, so uploads
+    over the duration limit are rejected before the rest is sent.
+    """
+    
+    def __init__(self, directory: str = UPLOAD_SESSION_DIR, ttl: int = UPLOAD_SESSION_TTL):
+        self.directory = directory
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # Running SHA-256 per session, so finalizing a contiguous upload does not
+        # read the file again; lost on restart, in which case the part is re-hashed
+        self._hashers = {}
+    
+    def _path(self, upload_id: str) -> str:
+        return os.path.join(self.directory, upload_id)
+    
+    def _load(self, upload_id: str) -> dict:
+        if not UPLOAD_ID_PATTERN.match(upload_id or ''):
+            raise ResumableUploadError('Unknown upload', 404)
+        try:
+            with open(self._path(upload_id) + '.json') as state_file:
+                state = json.load(state_file)
+            state['offset'] = os.path.getsize(self._path(upload_id) + '.part')
+        except (FileNotFoundError, ValueError):
+            raise ResumableUploadError('Unknown upload', 404)
+        return state
+    
+    def _save(self, state: dict) -> None:
+        path = self._path(state['upload_id']) + '.json'
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as temp_file:
+            json.dump({name: value for name, value in state.items() if name != 'offset'}, temp_file)
+        os.replace(temp_path, path)
+    
+    def create(self, filename: str, size: int, sha256: str = None) -> dict:
+        if not filename:
+            raise ResumableUploadError('filename is required')
+        if size is None or size < 0:
+            raise ResumableUploadError('size (total bytes) is required')
+        check_limits(size, None)
+        
+        os.makedirs(self.directory, exist_ok=True)
+        self.cleanup()
+        
+        state = {
+            'upload_id': uuid.uuid4().hex,
+            'filename': filename,
+            'size': size,
+            'sha256': sha256.lower() if sha256 else None,
+            'duration': None,
+            'probed': False,
+            'created_at': round(time.time(), 3),
+        }
+        open(self._path(state['upload_id']) + '.part', 'wb').close()
+        self._save(state)
+        with self._lock:
+            self._hashers[state['upload_id']] = (0, hashlib.sha256())
+        
+        state['offset'] = 0
+        return state
+    
+    def status(self, upload_id: str) -> dict:
+        return self._load(upload_id)
+    
+    def write(self, upload_id: str, content_range: str, body: BinaryIO, chunk_sha256: str = None) -> dict:
+        state = self._load(upload_id)
+        start, end, total = parse_content_range(content_range)
+        offset = state['offset']
+        
+        if total is not None and total != state['size']:
+            raise ResumableUploadError(f"Content-Range total {total} does not match the upload size {state['size']}")
+        if end > state['size']:
+            raise ResumableUploadError(f"Content-Range ends beyond the upload size {state['size']}")
+        if end <= offset:
+            # A retry of a chunk that was already stored
+            return state
+        if start != offset:
+            raise ResumableUploadError(f'Expected the chunk starting at byte {offset}', 409, offset)
+        
+        with self._lock:
+            hashed, hasher = self._hashers.pop(upload_id, (None, None))
+        # A hasher that missed a chunk (stored by another process) is dropped
+        if hashed != start:
+            hasher = None
+        
+        part_path = self._path(upload_id) + '.part'
+        chunk_hash = hashlib.sha256()
+        received = 0
+        with open(part_path, 'r+b') as part_file:
+            part_file.seek(start)
+            try:
+                for chunk in iter(lambda: body.read(min(CHUNK_SIZE, end - start - received + 1)), b''):
+                    received += len(chunk)
+                    if received > end - start:
+                        break
+                    part_file.write(chunk)
+                    chunk_hash.update(chunk)
+                    if hasher is not None:
+                        hasher.update(chunk)
+                
+                # One byte past the range is read to detect an overlong body,
+                # so only a short body's length is known exactly
+                if received > end - start:
+                    raise ResumableUploadError(
+                        f'Chunk body is longer than the {end - start} bytes Content-Range announces'
+                    )
+                if received < end - start:
+                    raise ResumableUploadError(
+                        f'Chunk body has {received} bytes but Content-Range announces {end - start}'
+                    )
+                if chunk_sha256 and chunk_hash.hexdigest() != chunk_sha256.lower():
+                    raise ResumableUploadError('Chunk checksum mismatch; send the chunk again')
+            except BaseException:
+                # Nothing of a rejected chunk is kept, so the client resumes from `offset`
+                part_file.truncate(offset)
+                raise
+        
+        if hasher is not None:
+            with self._lock:
+                self._hashers[upload_id] = (end, hasher)
+        
+        state['offset'] = end
+        try:
+            self._probe(state, part_path)
+        except BaseException:
+            self.delete(upload_id)
+            raise
+        
+        os.utime(self._path(upload_id) + '.json')
+        return state
+    
+    def _probe(self, state: dict, part_path: str) -> None:
+        # Containers whose length is only known at the end (ogg, mp3) under-report
+        # on a partial file, so the early probe can only reject, never approve
+        complete = state['offset'] == state['size']
+        if state['probed'] and not complete:
+            return
+        if state['offset'] < min(PROBE_BYTES, state['size']):
+            return
+        
+        duration = probe_duration(part_path)
+        if duration is not None:
+            state['duration'] = round(duration, 3)
+        state['probed'] = True
+        check_limits(state['size'], duration)
+        self._save(state)
+    
+    def finalize(self, upload_id: str) -> Tuple[SpooledPart, dict]:
+        """Verify a complete upload; returns the part as a file for the asset store, and the session."""
+        state = self._load(upload_id)
+        if state['offset'] != state['size']:
+            raise ResumableUploadError(
+                f"Upload is incomplete ({state['offset']} of {state['size']} bytes)", 409, state['offset']
+            )
+        
+        part_path = self._path(upload_id) + '.part'
+        with self._lock:
+            hashed, hasher = self._hashers.pop(upload_id, (None, None))
+        if hashed == state['size']:
+            digest = hasher.hexdigest()
+        else:
+            hasher = hashlib.sha256()
+            with open(part_path, 'rb') as part_file:
+                for chunk in iter(lambda: part_file.read(CHUNK_SIZE), b''):
+                    hasher.update(chunk)
+            digest = hasher.hexdigest()
+        
+        if state['sha256'] and digest != state['sha256']:
+            self.delete(upload_id)
+            raise ResumableUploadError('Checksum mismatch: the assembled file does not match sha256')
+        
+        return SpooledPart(part_path, state['filename'], digest), state
+    
+    def delete(self, upload_id: str) -> bool:
+        if not UPLOAD_ID_PATTERN.match(upload_id or ''):
+            return False
+        
+        with self._lock:
+            self._hashers.pop(upload_id, None)
+        
+        removed = False
+        for suffix in ('.part', '.json'):
+            try:
+                os.unlink(self._path(upload_id) + suffix)
+                removed = True
+            except FileNotFoundError:
+                pass
+        return removed
+    
+    def cleanup(self) -> None:
+        if not self.ttl:
+            return
+        
+        cutoff = time.time() - self.ttl
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json'):
+                continue
+            try:
+                if os.path.getmtime(os.path.join(self.directory, name)) < cutoff:
+                    self.delete(name[:-len('.json')])
+            except FileNotFoundError:
+                continue
+
+
+resumable_uploads = ResumableUploads()
\ No newline at end of file
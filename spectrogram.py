@@ -1,92 +1,237 @@
 import librosa
-import librosa.display
-import matplotlib
-matplotlib.use('Agg')  # Use non-interactive backend
-import matplotlib.pyplot as plt
 import numpy as np
-import tempfile
-import os
-from typing import BinaryIO
-import io
+import soundfile as sf
+from typing import BinaryIO, Iterable, Optional, Tuple, Union
+from audio_cache import audio_key, decode_to_cache, decoded_audio_cache, load_audio_bytes, load_audio_range
+from audio_io import content_digest, open_sample_accurate, upload_source
+from metrics import observe_audio, stage_timer
+from render import quantize_db, render_pool, render_spectrogram
 
 
 class SpectrogramGenerator:
+    N_FFT = 2048
+    HOP_LENGTH = 512
+    FIGURE_SIZE = (14, 8)
+    DPI = 150
+    # STFT frames are max-pooled in time down to one column per horizontal pixel
+    TIME_COLUMNS = FIGURE_SIZE[0] * DPI
+    # STFT frames computed per streamed block; bounds peak memory per block
+    BLOCK_FRAMES = 256
+    # Dynamic range kept below the peak in dB; also the uint8 quantization range
+    TOP_DB = 80.0
+    MIN_FREQUENCY = 20
+    COLORMAP = 'viridis'
     
     @staticmethod
-    def generate_spectrogram(audio_data: bytes, sample_rate: int = None) -> bytes:
-        with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_file:
-            temp_file.write(audio_data)
-            temp_file_path = temp_file.name
+    def _array_blocks(y: np.ndarray, block_frames: int, n_fft: int, hop_length: int) -> Iterable[np.ndarray]:
+        # Same framing as librosa.stream: consecutive blocks overlap by n_fft - hop_length
+        block_step = block_frames * hop_length
+        block_size = n_fft + (block_frames - 1) * hop_length
+        for start in range(0, max(len(y) - n_fft, 0) + 1, block_step):
+            yield y[start:start + block_size]
+    
+    @staticmethod
+    def stream_magnitude(blocks: Iterable[np.ndarray], total_samples: int, columns: int,
+                         n_fft: int, hop_length: int) -> Tuple[np.ndarray, int]:
+        n_frames = 1 + (total_samples - n_fft) // hop_length
+        frames_per_column = int(np.ceil(n_frames / columns))
+        n_columns = int(np.ceil(n_frames / frames_per_column))
         
-        try:
-            y, sr = librosa.load(temp_file_path, sr=sample_rate)
-            
-            D = librosa.stft(y)
-            S_db = librosa.amplitude_to_db(np.abs(D), ref=np.max)
-            
-            plt.figure(figsize=(14, 8))
-            librosa.display.specshow(
-                S_db, 
-                sr=sr, 
-                x_axis='time', 
-                y_axis='log',
-                cmap='viridis'
-            )
-            plt.colorbar(format='%+2.0f dB')
-            plt.title('STFT Spectrogram (Log-Frequency Scale)')
-            plt.xlabel('Time (seconds)')
-            plt.ylabel('Frequency (Hz)')
-            plt.tight_layout()
-            
-            img_buffer = io.BytesIO()
-            plt.savefig(img_buffer, format='png', dpi=150, bbox_inches='tight')
-            img_buffer.seek(0)
+        S = np.zeros((1 + n_fft // 2, n_columns), dtype=np.float32)
+        frame_offset = 0
+        
+        for block in blocks:
+            if len(block) < n_fft:
+                continue
             
-            plt.close()
+            M = np.abs(librosa.stft(block, n_fft=n_fft, hop_length=hop_length, center=False))
+            M = M[:, :n_frames - frame_offset]
+            if M.shape[1] == 0:
+                break
             
-            return img_buffer.getvalue()
+            column_index = (frame_offset + np.arange(M.shape[1])) // frames_per_column
+            starts = np.flatnonzero(np.r_[True, np.diff(column_index) != 0])
+            pooled = np.maximum.reduceat(M, starts, axis=1)
+            target = column_index[starts]
+            S[:, target] = np.maximum(S[:, target], pooled)
             
-        finally:
-            os.unlink(temp_file_path)
+            frame_offset += M.shape[1]
+        
+        return S, frames_per_column
     
     @staticmethod
-    def generate_spectrogram_from_file(audio_file: BinaryIO, original_filename: str) -> bytes:
-        file_extension = original_filename.split('.')[-1].lower()
+    def magnitude_from_array(y: np.ndarray, columns: int, n_fft: int, hop_length: int) -> Tuple[np.ndarray, int]:
+        if len(y) < n_fft:
+            y = np.pad(y, (0, n_fft - len(y)))
+        blocks = SpectrogramGenerator._array_blocks(y, SpectrogramGenerator.BLOCK_FRAMES, n_fft, hop_length)
+        return SpectrogramGenerator.stream_magnitude(blocks, len(y), columns, n_fft, hop_length)
+    
+    @staticmethod
+    def magnitude_from_source(source: Union[str, BinaryIO], columns: int, n_fft: int,
+                              hop_length: int) -> Tuple[np.ndarray, int, int]:
+        info = sf.info(source)
+        if not isinstance(source, str):
+            source.seek(0)
+        blocks = librosa.stream(
+            source,
+            block_length=SpectrogramGenerator.BLOCK_FRAMES,
+            frame_length=n_fft,
+            hop_length=hop_length,
+            dtype=np.float32
+        )
+        S, frames_per_column = SpectrogramGenerator.stream_magnitude(blocks, info.frames, columns, n_fft, hop_length)
+        return S, info.samplerate, frames_per_column
+    
+    @staticmethod
+    def _is_streamable(source: Union[str, BinaryIO], n_fft: int) -> bool:
+        # Containers libsndfile cannot read (mp4, aac, wma, ...), or whose block
+        # reads differ from a full decode (mp3), go through librosa.load
+        sound_file = open_sample_accurate(source)
+        if sound_file is None:
+            return False
         
-        with tempfile.NamedTemporaryFile(suffix=f'.{file_extension}', delete=False) as temp_input:
-            temp_input.write(audio_file.read())
-            temp_input_path = temp_input.name
+        with sound_file:
+            streamable = sound_file.frames >= n_fft
+        if not isinstance(source, str):
+            source.seek(0)
+        return streamable
+    
+    @staticmethod
+    def render_spectrogram(S_db: np.ndarray, sr: int, hop_length: int, title: str,
+                           frequency_range: Tuple[int, int] = None, colorbar_label: str = None,
+                           time_offset: float = 0.0) -> bytes:
+        with stage_timer('spectrogram', 'render'):
+            return render_pool.run(
+                render_spectrogram,
+                SpectrogramGenerator.FIGURE_SIZE,
+                SpectrogramGenerator.DPI,
+                S_db,
+                sr,
+                SpectrogramGenerator.N_FFT,
+                hop_length,
+                title,
+                frequency_range or (SpectrogramGenerator.MIN_FREQUENCY, sr // 2),
+                colorbar_label=colorbar_label,
+                colormap=SpectrogramGenerator.COLORMAP,
+                db_range=SpectrogramGenerator.TOP_DB,
+                time_offset=time_offset
+            )
+    
+    @staticmethod
+    def generate_spectrogram(audio_data: bytes, sample_rate: int = None) -> bytes:
+        with stage_timer('spectrogram', 'decode'):
+            y, sr = load_audio_bytes(audio_data, 'audio.wav', sample_rate)
+        observe_audio('spectrogram', len(y), sr)
         
-        try:
-            y, sr = librosa.load(temp_input_path, sr=None)
-            
-            D = librosa.stft(y, hop_length=512, n_fft=2048)
-            S_db = librosa.amplitude_to_db(np.abs(D), ref=np.max)
-            
-            plt.figure(figsize=(14, 8))
-            librosa.display.specshow(
-                S_db, 
-                sr=sr, 
-                hop_length=512,
-                x_axis='time', 
-                y_axis='log',
-                cmap='viridis',
-                fmin=20,
-                fmax=sr//2
+        n_fft, hop_length = SpectrogramGenerator.N_FFT, SpectrogramGenerator.HOP_LENGTH
+        with stage_timer('spectrogram', 'dsp'):
+            S, frames_per_column = SpectrogramGenerator.magnitude_from_array(
+                y, SpectrogramGenerator.TIME_COLUMNS, n_fft, hop_length
             )
-            plt.colorbar(format='%+2.0f dB', label='Magnitude (dB)')
-            plt.title(f'STFT Spectrogram - {original_filename} (Log-Frequency Scale)')
-            plt.xlabel('Time (seconds)')
-            plt.ylabel('Frequency (Hz)')
-            plt.tight_layout()
-            
-            img_buffer = io.BytesIO()
-            plt.savefig(img_buffer, format='png', dpi=150, bbox_inches='tight')
-            img_buffer.seek(0)
-            
-            plt.close()
-            
-            return img_buffer.getvalue()
-            
-        finally:
-            os.unlink(temp_input_path)
\ No newline at end of file
+            S_db = librosa.amplitude_to_db(S, ref=np.max)
+        
+        return SpectrogramGenerator.render_spectrogram(
+            S_db, sr, hop_length * frames_per_column, 'STFT Spectrogram (Log-Frequency Scale)'
+        )
+    
+    @staticmethod
+    def magnitude_from_file(audio_file: BinaryIO, original_filename: str) -> Tuple[np.ndarray, int, int]:
+        """Return the column-pooled STFT magnitude, sample rate and frames per column."""
+        n_fft, hop_length = SpectrogramGenerator.N_FFT, SpectrogramGenerator.HOP_LENGTH
+        columns = SpectrogramGenerator.TIME_COLUMNS
+        
+        key = audio_key(content_digest(audio_file))
+        cached = decoded_audio_cache.get(key)
+        source = upload_source(audio_file)
+        
+        if cached is not None:
+            y, sr = cached
+            with stage_timer('spectrogram', 'dsp'):
+                S, frames_per_column = SpectrogramGenerator.magnitude_from_array(y, columns, n_fft, hop_length)
+            samples = len(y)
+        elif SpectrogramGenerator._is_streamable(source, n_fft):
+            # Stream sample-accurate formats block by block so memory stays
+            # bounded by the block size and output width, not the duration.
+            # Decoding is interleaved with the STFT here, so it is all counted as dsp
+            with stage_timer('spectrogram', 'dsp'):
+                S, sr, frames_per_column = SpectrogramGenerator.magnitude_from_source(
+                    source, columns, n_fft, hop_length
+                )
+            samples = S.shape[1] * frames_per_column * hop_length
+        else:
+            with stage_timer('spectrogram', 'decode'):
+                y, sr = decode_to_cache(audio_file, original_filename, key)
+            with stage_timer('spectrogram', 'dsp'):
+                S, frames_per_column = SpectrogramGenerator.magnitude_from_array(y, columns, n_fft, hop_length)
+            samples = len(y)
+        
+        observe_audio('spectrogram', samples, sr)
+        return S, sr, frames_per_column
+    
+    @staticmethod
+    def magnitude_range_from_file(audio_file: BinaryIO, original_filename: str, start: float,
+                                  duration: float = None) -> Tuple[np.ndarray, int, int, Tuple[float, float]]:
+        """Like magnitude_from_file for [start, start + duration) seconds only; also returns the clipped range."""
+        n_fft, hop_length = SpectrogramGenerator.N_FFT, SpectrogramGenerator.HOP_LENGTH
+        
+        with stage_timer('spectrogram', 'decode'):
+            y, sr, _ = load_audio_range(audio_file, original_filename, start, duration)
+        observe_audio('spectrogram', len(y), sr)
+        
+        with stage_timer('spectrogram', 'dsp'):
+            S, frames_per_column = SpectrogramGenerator.magnitude_from_array(
+                y, SpectrogramGenerator.TIME_COLUMNS, n_fft, hop_length
+            )
+        return S, sr, frames_per_column, (start, start + len(y) / sr)
+    
+    @staticmethod
+    def generate_spectrogram_from_file(audio_file: BinaryIO, original_filename: str) -> bytes:
+        S, sr, frames_per_column = SpectrogramGenerator.magnitude_from_file(audio_file, original_filename)
+        return SpectrogramGenerator.render_magnitude(S, sr, frames_per_column, original_filename)
+    
+    @staticmethod
+    def render_magnitude(S: np.ndarray, sr: int, frames_per_column: int, original_filename: str,
+                         time_range: Optional[Tuple[float, float]] = None) -> bytes:
+        with stage_timer('spectrogram', 'dsp'):
+            S_db = librosa.amplitude_to_db(S, ref=np.max, top_db=SpectrogramGenerator.TOP_DB)
+        
+        title = f'STFT Spectrogram - {original_filename} (Log-Frequency Scale)'
+        if time_range is not None:
+            title = f'STFT Spectrogram - {original_filename} ({time_range[0]:.2f}s - {time_range[1]:.2f}s)'
+        
+        return SpectrogramGenerator.render_spectrogram(
+            S_db,
+            sr,
+            SpectrogramGenerator.HOP_LENGTH * frames_per_column,
+            title,
+            frequency_range=(20, sr//2),
+            colorbar_label='Magnitude (dB)',
+            time_offset=time_range[0] if time_range is not None else 0.0
+        )
+    
+    @staticmethod
+    def spectrogram_data_from_file(audio_file: BinaryIO, original_filename: str) -> Tuple[np.ndarray, dict]:
+        """Return the dB spectrogram quantized to uint8 (rows = linear FFT bins, low to high) and its axes."""
+        S, sr, frames_per_column = SpectrogramGenerator.magnitude_from_file(audio_file, original_filename)
+        return SpectrogramGenerator.magnitude_data(S, sr, frames_per_column)
+    
+    @staticmethod
+    def magnitude_data(S: np.ndarray, sr: int, frames_per_column: int,
+                       time_range: Optional[Tuple[float, float]] = None) -> Tuple[np.ndarray, dict]:
+        top_db = SpectrogramGenerator.TOP_DB
+        with stage_timer('spectrogram', 'dsp'):
+            S_db = librosa.amplitude_to_db(S, ref=np.max, top_db=top_db)
+            # 0 maps to -top_db dB and 255 to the loudest bin (0 dB)
+            quantized = quantize_db(S_db, top_db)
+        
+        meta = {
+            'type': 'spectrogram',
+            'sample_rate': sr,
+            'n_fft': SpectrogramGenerator.N_FFT,
+            'hop_length': SpectrogramGenerator.HOP_LENGTH * frames_per_column,
+            'db_min': -top_db,
+            'db_max': 0.0,
+        }
+        if time_range is not None:
+            meta['start'], meta['end'] = time_range
+        return quantized, meta
\ No newline at end of file
@@ -2,8 +2,14 @@ import streamlit as st
 import requests
 import io
 import time
+import zipfile
 from PIL import Image
 import json
+import altair as alt
+import numpy as np
+import pandas as pd
+from matplotlib import colormaps
+from data_formats import decode_array_payload
 
 # Configure Streamlit page
 st.set_page_config(
@@ -44,74 +50,85 @@ def get_supported_languages():
         pass
     return {'en-US': 'English (US)', 'es-ES': 'Spanish (Spain)', 'fr-FR': 'French (France)'}
 
-def convert_audio(audio_file, filename):
-    """Convert audio to WAV format"""
+OUTPUT_LABELS = {
+    'convert': "🎵 Convert to WAV",
+    'waveform': "📊 Generate Waveform",
+    'spectrogram': "🔬 Generate Spectrogram",
+    'transcribe': "🎤 Transcribe to Text",
+}
+
+def analyze_audio(audio_file, filename, outputs, language='en-US'):
+    """Run every selected output from one upload; the server decodes the file once"""
     files = {'audio_file': (filename, audio_file, 'audio/*')}
+    data = {'outputs': ','.join(outputs), 'language': language}
     
-    with st.spinner('Converting audio to WAV...'):
+    with st.spinner('Analyzing audio...'):
         try:
-            response = requests.post(f"{API_BASE_URL}/convert/", files=files)
+            # Visual outputs come back as data and are drawn here instead of on the API server
+            response = requests.post(f"{API_BASE_URL}/analyze/", files=files, data=data, params={'output': 'binary'})
             
             if response.status_code == 200:
-                if response.headers.get('content-type') == 'audio/wav':
-                    return response.content, None
-                else:
-                    # JSON response (file already WAV)
-                    return None, response.json().get('message', 'File is already in WAV format')
+                archive = zipfile.ZipFile(io.BytesIO(response.content))
+                manifest = json.loads(archive.read('manifest.json'))
+                results = {}
+                for entry in manifest['results']:
+                    if entry['status'] == 'done':
+                        results[entry['operation']] = (archive.read(entry['output']), None)
+                    else:
+                        results[entry['operation']] = (None, entry.get('error') or entry.get('message'))
+                return results, None
             else:
-                error_msg = response.json().get('error', 'Conversion failed')
+                error_msg = response.json().get('error', 'Analysis failed')
                 return None, f"Error: {error_msg}"
         except Exception as e:
             return None, f"Error: {str(e)}"
 
-def generate_waveform(audio_file, filename):
-    """Generate waveform visualization"""
-    files = {'audio_file': (filename, audio_file, 'audio/*')}
+def waveform_chart(peak_data, output_format='json'):
+    """Build a min/max + RMS band chart from /waveform/ JSON or binary peak data"""
+    meta, peaks = decode_array_payload(peak_data, output_format)
+    scale = float(2 ** (meta['bits'] - 1))
+    mins, maxs, rms = peaks / scale
     
-    with st.spinner('Generating waveform...'):
-        try:
-            response = requests.post(f"{API_BASE_URL}/waveform/", files=files)
-            
-            if response.status_code == 200:
-                return response.content, None
-            else:
-                error_msg = response.json().get('error', 'Waveform generation failed')
-                return None, f"Error: {error_msg}"
-        except Exception as e:
-            return None, f"Error: {str(e)}"
+    frame = pd.DataFrame({
+        'time': np.linspace(meta['start'], meta['end'], peaks.shape[1]),
+        'min': mins,
+        'max': maxs,
+        'rms_low': -rms,
+        'rms_high': rms,
+    })
+    x = alt.X('time:Q', title='Time (seconds)')
+    peaks_band = alt.Chart(frame).mark_area(color='#1f77b4').encode(
+        x=x, y=alt.Y('min:Q', title='Amplitude'), y2='max:Q'
+    )
+    rms_band = alt.Chart(frame).mark_area(color='#5fa2dd').encode(x=x, y='rms_low:Q', y2='rms_high:Q')
+    return (peaks_band + rms_band).properties(height=360)
 
-def generate_spectrogram(audio_file, filename):
-    """Generate spectrogram visualization"""
-    files = {'audio_file': (filename, audio_file, 'audio/*')}
+def waveform_image(peak_data, height=360):
+    """Draw /waveform/ binary peak data as an RGB image: the min/max band with the RMS band over it"""
+    meta, peaks = decode_array_payload(peak_data, 'binary')
+    mins, maxs, rms = peaks / float(2 ** (meta['bits'] - 1))
     
-    with st.spinner('Generating spectrogram...'):
-        try:
-            response = requests.post(f"{API_BASE_URL}/spectrogram/", files=files)
-            
-            if response.status_code == 200:
-                return response.content, None
-            else:
-                error_msg = response.json().get('error', 'Spectrogram generation failed')
-                return None, f"Error: {error_msg}"
-        except Exception as e:
-            return None, f"Error: {str(e)}"
+    # Row of each amplitude, +1 at the top and -1 at the bottom
+    def row(amplitude):
+        return np.clip(np.round((1 - amplitude) / 2 * (height - 1)), 0, height - 1)[np.newaxis, :]
+    rows = np.arange(height)[:, np.newaxis]
+    
+    image = np.full((height, peaks.shape[1], 3), 255, dtype=np.uint8)
+    image[(rows >= row(maxs)) & (rows <= row(mins))] = (0x1f, 0x77, 0xb4)
+    image[(rows >= row(rms)) & (rows <= row(-rms))] = (0x5f, 0xa2, 0xdd)
+    return Image.fromarray(image)
 
-def transcribe_audio(audio_file, filename, language='en-US'):
-    """Transcribe audio to text"""
-    files = {'audio_file': (filename, audio_file, 'audio/*')}
-    data = {'language': language}
+def spectrogram_image(spectrogram_data, height=512, colormap='viridis'):
+    """Turn /spectrogram/ binary data into an RGB image on a log-frequency axis"""
+    meta, matrix = decode_array_payload(spectrogram_data, 'binary')
     
-    with st.spinner('Transcribing audio...'):
-        try:
-            response = requests.post(f"{API_BASE_URL}/transcribe/", files=files, data=data)
-            
-            if response.status_code == 200:
-                return response.json(), None
-            else:
-                error_msg = response.json().get('error', 'Transcription failed')
-                return None, f"Error: {error_msg}"
-        except Exception as e:
-            return None, f"Error: {str(e)}"
+    # Pick the FFT bin nearest to each log-spaced output row, low frequencies at the bottom
+    bin_hz = meta['sample_rate'] / meta['n_fft']
+    frequencies = np.geomspace(20, meta['sample_rate'] / 2, height)[::-1]
+    rows = np.minimum(np.round(frequencies / bin_hz).astype(int), matrix.shape[0] - 1)
+    
+    palette = (colormaps[colormap](np.arange(256))[:, :3] * 255).astype(np.uint8)
+    return Image.fromarray(palette[matrix[rows]])
 
 def main():
     # Header
@@ -146,20 +163,18 @@ def main():
         st.sidebar.success(f"✅ File uploaded: {uploaded_file.name}")
         st.sidebar.info(f"📊 File size: {uploaded_file.size / 1024:.1f} KB")
         
-        # Operation selection
-        st.sidebar.subheader("🔧 Select Operation")
-        operation = st.sidebar.selectbox(
+        # Output selection
+        st.sidebar.subheader("🔧 Select Outputs")
+        outputs = st.sidebar.multiselect(
             "Choose what you want to do:",
-            [
-                "🎵 Convert to WAV",
-                "📊 Generate Waveform",
-                "🔬 Generate Spectrogram", 
-                "🎤 Transcribe to Text"
-            ]
+            options=list(OUTPUT_LABELS.keys()),
+            default=['waveform', 'spectrogram'],
+            format_func=lambda x: OUTPUT_LABELS[x]
         )
         
         # Language selection for transcription
-        if "Transcribe" in operation:
+        language_code = 'en-US'
+        if 'transcribe' in outputs:
             st.sidebar.subheader("🌐 Language Settings")
             language_code = st.sidebar.selectbox(
                 "Select language:",
@@ -169,7 +184,7 @@ def main():
             )
         
         # Process button
-        if st.sidebar.button("🚀 Process Audio", type="primary"):
+        if st.sidebar.button("🚀 Process Audio", type="primary", disabled=not outputs):
             # Read file content
             audio_content = uploaded_file.read()
             uploaded_file.seek(0)  # Reset file pointer
@@ -180,12 +195,15 @@ def main():
             with col1:
                 st.header("📋 Processing Results")
                 
-                if "Convert" in operation:
-                    wav_data, error = convert_audio(io.BytesIO(audio_content), uploaded_file.name)
+                results, error = analyze_audio(io.BytesIO(audio_content), uploaded_file.name, outputs, language_code)
+                if error:
+                    st.error(error)
+                    results = {}
+                
+                if 'convert' in results:
+                    wav_data, error = results['convert']
                     
-                    if error:
-                        st.error(error)
-                    elif wav_data:
+                    if wav_data:
                         st.success("✅ Audio converted to WAV successfully!")
                         st.download_button(
                             label="📥 Download WAV File",
@@ -196,60 +214,66 @@ def main():
                         
                         # Audio player
                         st.audio(wav_data, format='audio/wav')
-                    else:
+                    elif uploaded_file.name.lower().endswith('.wav'):
                         st.info("ℹ️ File is already in WAV format")
                         st.audio(audio_content, format='audio/wav')
+                    else:
+                        st.error(f"Error: {error}")
                 
-                elif "Waveform" in operation:
-                    waveform_data, error = generate_waveform(io.BytesIO(audio_content), uploaded_file.name)
+                if 'waveform' in results:
+                    waveform_data, error = results['waveform']
                     
                     if error:
-                        st.error(error)
+                        st.error(f"Error: {error}")
                     else:
                         st.success("✅ Waveform generated successfully!")
                         
-                        # Display waveform image
-                        image = Image.open(io.BytesIO(waveform_data))
-                        st.image(image, caption="Audio Waveform Visualization", use_container_width=True)
+                        # Draw the waveform from peak data
+                        st.altair_chart(waveform_chart(waveform_data, 'binary'), use_container_width=True)
+                        st.caption("Audio Waveform Visualization")
+                        
+                        # Drawn here from the same peaks, so the download costs no extra render or upload
+                        image_buffer = io.BytesIO()
+                        waveform_image(waveform_data).save(image_buffer, format='PNG')
                         
                         # Download button
                         st.download_button(
                             label="📥 Download Waveform Image",
-                            data=waveform_data,
+                            data=image_buffer.getvalue(),
                             file_name=f"{uploaded_file.name.rsplit('.', 1)[0]}_waveform.png",
                             mime="image/png"
                         )
                 
-                elif "Spectrogram" in operation:
-                    spectrogram_data, error = generate_spectrogram(io.BytesIO(audio_content), uploaded_file.name)
+                if 'spectrogram' in results:
+                    spectrogram_data, error = results['spectrogram']
                     
                     if error:
-                        st.error(error)
+                        st.error(f"Error: {error}")
                     else:
                         st.success("✅ Spectrogram generated successfully!")
                         
-                        # Display spectrogram image
-                        image = Image.open(io.BytesIO(spectrogram_data))
+                        # Draw the spectrogram from the quantized dB matrix
+                        image = spectrogram_image(spectrogram_data)
                         st.image(image, caption="STFT Spectrogram (Log-Frequency Scale)", use_container_width=True)
                         
+                        image_buffer = io.BytesIO()
+                        image.save(image_buffer, format='PNG')
+                        
                         # Download button
                         st.download_button(
                             label="📥 Download Spectrogram Image",
-                            data=spectrogram_data,
+                            data=image_buffer.getvalue(),
                             file_name=f"{uploaded_file.name.rsplit('.', 1)[0]}_spectrogram.png",
                             mime="image/png"
                         )
                 
-                elif "Transcribe" in operation:
-                    transcription_result, error = transcribe_audio(
-                        io.BytesIO(audio_content), 
-                        uploaded_file.name, 
-                        language_code
-                    )
+                if 'transcribe' in results:
+                    transcription_data, error = results['transcribe']
                     
                     if error:
-                        st.error(error)
+                        st.error(f"Error: {error}")
                     else:
+                        transcription_result = json.loads(transcription_data)
                         st.success("✅ Audio transcribed successfully!")
                         
                         # Display transcription
@@ -32,6 +32,8 @@ schema_view = get_schema_view(
         5. **Check Formats**: Use `/formats/` to see all supported audio formats
         6. **Check Languages**: Use `/languages/` to see supported transcription languages
         7. **Health Check**: Use `/health/` to verify API status
+        8. **Async Jobs**: Add `?async=1` to any processing endpoint and poll `/jobs/<id>/`
+        9. **Batch Processing**: Upload many files (or a zip) to `/batch/` and get a zip of results
         
         ## Endpoints Overview
         
@@ -45,6 +47,12 @@ schema_view = get_schema_view(
         ### Audio Processing
         - `POST /transcribe/` - Transcribe speech to text using Google Speech Recognition
         
+        ### Batch Processing
+        - `POST /batch/` - Convert/visualize many files in one request, streamed back as a zip
+        
+        ### Jobs
+        - `GET /jobs/<id>/` - Status or result of an async job (`?async=1`)
+        
         ### Information
         - `GET /formats/` - List supported audio formats
         - `GET /languages/` - List supported transcription languages
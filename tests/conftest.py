@@ -0,0 +1,65 @@
+import io
+import os
+import sys
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+# The modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def tone():
+    def make(seconds, sample_rate=16000, frequency=220.0, amplitude=0.5):
+        t = np.arange(int(seconds * sample_rate)) / sample_rate
+        return (amplitude * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+    return make
+
+
+@pytest.fixture
+def encode():
+    def make(y, sample_rate, container, subtype=None):
+        buffer = io.BytesIO()
+        sf.write(buffer, y, sample_rate, format=container, subtype=subtype)
+        return buffer.getvalue()
+    return make
+
+
+@pytest.fixture
+def audio_cache():
+    # Start from an empty decoded-audio cache so tests cannot see each other's decodes
+    from audio_cache import decoded_audio_cache
+    decoded_audio_cache.clear()
+    # clear() keeps the counters, which are cumulative metrics
+    decoded_audio_cache.hits = decoded_audio_cache.misses = decoded_audio_cache.evictions = 0
+    yield decoded_audio_cache
+    decoded_audio_cache.clear()
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch, audio_cache):
+    """A Django test client whose on-disk stores live in tmp_path."""
+    import main  # noqa: F401 (configures Django)
+    from django.test import Client
+    from asset_store import asset_store
+    from result_cache import result_cache
+    from resumable import resumable_uploads
+    
+    monkeypatch.setattr(result_cache, 'directory', str(tmp_path / 'results'))
+    monkeypatch.setattr(result_cache, '_total_bytes', None)
+    monkeypatch.setattr(asset_store, 'directory', str(tmp_path / 'assets'))
+    monkeypatch.setattr(resumable_uploads, 'directory', str(tmp_path / 'uploads'))
+    monkeypatch.setattr(resumable_uploads, '_hashers', {})
+    return Client()
+
+
+@pytest.fixture
+def upload(encode, tone):
+    """An in-memory audio file, named like an upload, for the test client."""
+    def make(container='FLAC', seconds=2.0, sample_rate=16000, name=None, subtype=None):
+        audio_file = io.BytesIO(encode(tone(seconds, sample_rate), sample_rate, container, subtype))
+        audio_file.name = name or f'tone.{container.lower()}'
+        return audio_file
+    return make
\ No newline at end of file
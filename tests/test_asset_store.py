@@ -0,0 +1,105 @@
+import io
+import os
+import time
+
+import soundfile as sf
+
+from asset_store import AssetStore
+
+
+def test_put_deduplicates_by_content(tmp_path, upload):
+    store = AssetStore(str(tmp_path), ttl=3600)
+    
+    first, created = store.put(upload('WAV', 1.0, name='a.wav'))
+    second, created_again = store.put(upload('WAV', 1.0, name='b.wav'))
+    
+    assert created and not created_again
+    assert first['asset_id'] == second['asset_id']
+    # The first upload's metadata is kept
+    assert second['filename'] == 'a.wav'
+    assert sorted(name for _, _, files in os.walk(tmp_path) for name in files) == [first['asset_id'], first['asset_id'] + '.json']
+    
+    other, created = store.put(upload('WAV', 2.0))
+    assert created and other['asset_id'] != first['asset_id']
+
+
+def test_open_reads_stored_content(tmp_path, upload):
+    store = AssetStore(str(tmp_path), ttl=3600)
+    audio_file = upload('FLAC', 1.0)
+    asset, _ = store.put(audio_file)
+    
+    stored = store.open(asset['asset_id'])
+    try:
+        assert stored.name == 'tone.flac'
+        assert stored.sha256 == asset['asset_id']
+        assert stored.read() == audio_file.getvalue()
+    finally:
+        stored.close()
+
+
+def test_get_rejects_malformed_and_unknown_ids(tmp_path):
+    store = AssetStore(str(tmp_path), ttl=3600)
+    
+    assert store.get('../../etc/passwd') is None
+    assert store.get('') is None
+    assert store.get('0' * 64) is None
+    assert store.open('0' * 64) is None
+    assert not store.delete('0' * 64)
+
+
+def test_expired_assets_are_cleaned_up(tmp_path, upload):
+    store = AssetStore(str(tmp_path), ttl=60)
+    asset, _ = store.put(upload('WAV', 1.0))
+    path = os.path.join(str(tmp_path), asset['asset_id'][:2], asset['asset_id'])
+    
+    stale = time.time() - 120
+    os.utime(path, (stale, stale))
+    assert store.get(asset['asset_id']) is None
+    
+    assert store.cleanup() == 1
+    assert not os.path.exists(path) and not os.path.exists(path + '.json')
+
+
+def test_use_extends_lifetime(tmp_path, upload):
+    store = AssetStore(str(tmp_path), ttl=60)
+    asset, _ = store.put(upload('WAV', 1.0))
+    path = os.path.join(str(tmp_path), asset['asset_id'][:2], asset['asset_id'])
+    
+    almost_stale = time.time() - 50
+    os.utime(path, (almost_stale, almost_stale))
+    assert store.get(asset['asset_id'])['expires_at'] > time.time() + 50
+
+
+def test_upload_endpoint_deduplicates(client, upload):
+    first = client.post('/assets/', {'audio_file': upload('FLAC', 1.0)})
+    second = client.post('/assets/', {'audio_file': upload('FLAC', 1.0)})
+    
+    assert (first.status_code, second.status_code) == (201, 200)
+    assert first.json()['asset_id'] == second.json()['asset_id']
+    
+    asset_id = first.json()['asset_id']
+    assert client.get(f'/assets/{asset_id}/').json()['size'] == first.json()['size']
+    assert client.delete(f'/assets/{asset_id}/').status_code == 204
+    assert client.get(f'/assets/{asset_id}/').status_code == 404
+
+
+def test_processing_endpoints_accept_asset_id(client, upload):
+    asset_id = client.post('/assets/', {'audio_file': upload('FLAC', 2.0)}).json()['asset_id']
+    
+    response = client.post('/convert/?output_format=wav', {'asset_id': asset_id})
+    assert response.status_code == 200
+    y, sr = sf.read(io.BytesIO(b''.join(response.streaming_content)))
+    assert (len(y), sr) == (32000, 16000)
+    
+    response = client.post('/waveform/?output=json', {'asset_id': asset_id})
+    assert response.status_code == 200
+    
+    # Reading an asset leaves it in the store for the next request
+    assert client.get(f'/assets/{asset_id}/').status_code == 200
+
+
+def test_unknown_asset_id_is_not_found(client):
+    response = client.post('/convert/', {'asset_id': '0' * 64})
+    
+    assert response.status_code == 404
+    assert 'upload the file to /assets/ again' in response.json()['error']
\ No newline at end of file
@@ -0,0 +1,96 @@
+import io
+
+import numpy as np
+import pytest
+
+import audio_cache as audio_cache_module
+from audio_cache import AudioBufferCache, audio_key, load_audio, load_audio_range
+from audio_io import content_digest
+
+
+@pytest.fixture
+def decodes(monkeypatch):
+    # Counts real decodes, so cache hits can be told apart from misses
+    calls = []
+    decode_audio = audio_cache_module.decode_audio
+    
+    def counting(*args, **kwargs):
+        calls.append(args[1])
+        return decode_audio(*args, **kwargs)
+    monkeypatch.setattr(audio_cache_module, 'decode_audio', counting)
+    return calls
+
+
+def test_second_load_is_a_cache_hit(audio_cache, decodes, encode, tone):
+    data = encode(tone(1.0, 22050), 22050, 'FLAC')
+    
+    first, sr = load_audio(io.BytesIO(data), 'tone.flac')
+    second, _ = load_audio(io.BytesIO(data), 'renamed.flac')
+    
+    assert sr == 22050
+    assert second is first
+    assert decodes == ['tone.flac']
+    assert (audio_cache.hits, audio_cache.misses) == (1, 1)
+    assert not first.flags.writeable
+
+
+def test_variants_are_derived_from_the_native_decode(audio_cache, decodes, encode, tone):
+    data = encode(tone(1.0, 22050), 22050, 'WAV')
+    native, _ = load_audio(io.BytesIO(data), 'tone.wav')
+    
+    resampled, sr = load_audio(io.BytesIO(data), 'tone.wav', sample_rate=16000)
+    samples, _ = load_audio(io.BytesIO(data), 'tone.wav', sample_rate=16000, dtype='int16')
+    
+    assert decodes == ['tone.wav']
+    assert sr == 16000 and len(resampled) == 16000
+    assert samples.dtype == np.int16 and len(samples) == 16000
+    assert audio_cache.stats()['entries'] == 3
+    # Asking again is served from the cached variant
+    assert load_audio(io.BytesIO(data), 'tone.wav', sample_rate=16000, dtype='int16')[0] is samples
+
+
+def test_variant_without_a_cached_native_decode(audio_cache, decodes, encode, tone):
+    data = encode(tone(1.0, 22050), 22050, 'WAV')
+    
+    load_audio(io.BytesIO(data), 'tone.wav', sample_rate=16000)
+    
+    assert decodes == ['tone.wav']
+    assert audio_cache.get(audio_key(content_digest(io.BytesIO(data)))) is not None
+
+
+def test_unsupported_dtype(audio_cache, encode, tone):
+    with pytest.raises(ValueError, match='Unsupported sample dtype'):
+        load_audio(io.BytesIO(encode(tone(0.1), 16000, 'WAV')), 'tone.wav', dtype='float64')
+
+
+def test_range_of_a_cached_file_is_sliced_without_decoding(audio_cache, decodes, encode, tone):
+    data = encode(tone(4.0), 16000, 'FLAC')
+    native, _ = load_audio(io.BytesIO(data), 'tone.flac')
+    
+    y, sr, total = load_audio_range(io.BytesIO(data), 'tone.flac', start=1.0, duration=0.5)
+    
+    assert decodes == ['tone.flac']
+    assert total == 4.0
+    np.testing.assert_array_equal(y, native[16000:24000])
+
+
+def test_buffer_cache_evicts_least_recently_used():
+    cache = AudioBufferCache(max_bytes=3000)
+    for key in 'abc':
+        cache.put(key, np.zeros(250, dtype=np.float32), 16000)
+    cache.get('a')
+    
+    cache.put('d', np.zeros(250, dtype=np.float32), 16000)
+    
+    assert cache.get('b') is None
+    assert all(cache.get(key) is not None for key in 'acd')
+    assert cache.stats()['bytes'] == 3000 and cache.evictions == 1
+
+
+def test_buffer_cache_skips_buffers_over_the_budget():
+    cache = AudioBufferCache(max_bytes=1000)
+    cache.put('a', np.zeros(100, dtype=np.float32), 16000)
+    
+    cache.put('b', np.zeros(1000, dtype=np.float32), 16000)
+    
+    assert cache.get('b') is None and cache.get('a') is not None
\ No newline at end of file
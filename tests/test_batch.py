@@ -0,0 +1,156 @@
+import io
+import json
+import os
+import signal
+import tempfile
+import zipfile
+
+import pytest
+
+from batch import BatchProcessor, expand_uploads, parse_operations, spool
+from ingest import UploadRejected
+
+
+@pytest.fixture
+def spool_dir(tmp_path, monkeypatch):
+    # Temporary copies of the inputs are made here, so leftovers can be checked
+    directory = tmp_path / 'spool'
+    directory.mkdir()
+    monkeypatch.setattr(tempfile, 'tempdir', str(directory))
+    return directory
+
+
+@pytest.fixture
+def processor(tmp_path, monkeypatch):
+    monkeypatch.setenv('RESULT_CACHE_DIR', str(tmp_path / 'results'))
+    processor = BatchProcessor(max_workers=1)
+    yield processor
+    if processor._executor is not None:
+        processor._executor.shutdown(cancel_futures=True)
+
+
+def zipped(files):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        for name, data in files.items():
+            archive.writestr(name, data)
+    buffer.seek(0)
+    buffer.name = 'inputs.zip'
+    return buffer
+
+
+def run(processor, inputs, operations):
+    archive = zipfile.ZipFile(io.BytesIO(b''.join(processor.stream(inputs, operations))))
+    return archive, json.loads(archive.read('manifest.json'))
+
+
+def test_parse_operations():
+    assert parse_operations(['convert, waveform', 'convert']) == ['convert', 'waveform']
+    with pytest.raises(ValueError, match='Unsupported batch operation'):
+        parse_operations(['transcribe'])
+    with pytest.raises(ValueError, match='No operations requested'):
+        parse_operations([' , '])
+
+
+def test_batch_of_zip_members(processor, spool_dir, upload):
+    uploads = [zipped({'a/one.flac': upload('FLAC').getvalue(), 'two.wav': upload('WAV').getvalue(),
+                       'notes.txt': b'not audio'})]
+    
+    archive, manifest = run(processor, expand_uploads(uploads), ['convert'])
+    
+    assert [(entry['filename'], entry['status']) for entry in manifest] == [
+        ('one.flac', 'done'), ('two.wav', 'skipped'), ('notes.txt', 'skipped'),
+    ]
+    assert archive.read('one.wav')[:4] == b'RIFF'
+    # Spooled copies are removed once their operations finish
+    assert os.listdir(spool_dir) == []
+
+
+def test_closing_the_stream_early_removes_spooled_copies(processor, spool_dir, upload):
+    inputs = expand_uploads([zipped({f'{index}.flac': upload('FLAC').getvalue() for index in range(4)})])
+    stream = processor.stream(inputs, ['convert', 'waveform'])
+    next(stream)
+    
+    stream.close()
+    
+    assert os.listdir(spool_dir) == []
+
+
+def test_batch_survives_a_dead_worker(processor, spool_dir, upload):
+    data = upload('FLAC').getvalue()
+    inputs = expand_uploads([zipped({f'{index}.flac': data for index in range(3)})])
+    load_second = inputs[1][1]
+    
+    def kill_workers_then_load():
+        # Simulates an OOM kill while the first file is still being processed
+        for process in list(processor._executor._processes.values()):
+            os.kill(process.pid, signal.SIGKILL)
+        return load_second()
+    inputs[1] = (inputs[1][0], kill_workers_then_load)
+    
+    archive, manifest = run(processor, inputs, ['convert', 'waveform'])
+    
+    # The archive is complete, and every task is accounted for
+    assert archive.testzip() is None
+    assert len(manifest) == 6
+    assert {entry['status'] for entry in manifest} <= {'done', 'failed'}
+    assert manifest[-1]['status'] == 'done'
+    assert os.listdir(spool_dir) == []
+    
+    # The pool was rebuilt for later batches
+    _, manifest = run(processor, expand_uploads([zipped({'again.flac': data})]), ['convert'])
+    assert manifest[0]['status'] == 'done'
+
+def test_zip_with_too_many_members_is_rejected(monkeypatch):
+    monkeypatch.setattr('batch.BATCH_MAX_FILES', 3)
+    
+    with pytest.raises(UploadRejected, match='the maximum is 3'):
+        expand_uploads([zipped({f'{index}.wav': b'' for index in range(4)})])
+
+
+def test_zip_bomb_is_rejected_before_extraction(monkeypatch):
+    monkeypatch.setattr('ingest.MAX_UPLOAD_BYTES', 1024 * 1024)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('bomb.wav', bytes(8 * 1024 * 1024))
+    buffer.seek(0)
+    buffer.name = 'inputs.zip'
+    assert len(buffer.getvalue()) < 64 * 1024
+    
+    with pytest.raises(UploadRejected, match='maximum size'):
+        expand_uploads([buffer])
+
+
+def test_zip_members_may_not_add_up_past_the_size_limit(monkeypatch):
+    monkeypatch.setattr('ingest.MAX_UPLOAD_BYTES', 1000)
+    
+    with pytest.raises(UploadRejected, match='maximum size'):
+        expand_uploads([zipped({f'{index}.wav': bytes(400) for index in range(3)})])
+
+
+def test_member_over_the_duration_limit_fails(processor, spool_dir, upload, monkeypatch):
+    monkeypatch.setattr('ingest.MAX_AUDIO_SECONDS', 5)
+    inputs = expand_uploads([zipped({'long.flac': upload('FLAC', 6.0).getvalue(),
+                                     'short.flac': upload('FLAC', 1.0).getvalue()})])
+    
+    _, manifest = run(processor, inputs, ['convert', 'waveform'])
+    
+    assert [(entry['filename'], entry['status'], entry.get('status_code')) for entry in manifest] == [
+        ('long.flac', 'failed', 413), ('long.flac', 'failed', 413),
+        ('short.flac', 'done', None), ('short.flac', 'done', None),
+    ]
+    assert os.listdir(spool_dir) == []
+
+
+def test_spool_stops_at_the_declared_size(spool_dir):
+    with pytest.raises(UploadRejected, match='larger than the 10 bytes'):
+        spool(io.BytesIO(bytes(100)), limit=10)
+    assert os.listdir(spool_dir) == []
+
+
+def test_batch_endpoint_rejects_oversize_archives(client, monkeypatch):
+    monkeypatch.setattr('batch.BATCH_MAX_FILES', 1)
+    
+    response = client.post('/batch/', {'audio_file': zipped({'a.wav': b'', 'b.wav': b''}), 'operations': 'convert'})
+    
+    assert response.status_code == 413
\ No newline at end of file
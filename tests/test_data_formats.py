@@ -0,0 +1,65 @@
+import json
+import struct
+
+import numpy as np
+import pytest
+
+from data_formats import decode_array_payload, encode_array_payload, output_filename, parse_output_format
+
+
+@pytest.mark.parametrize('output_format', ['json', 'binary'])
+@pytest.mark.parametrize('array', [
+    np.arange(-6, 6, dtype=np.int16).reshape(3, 4),
+    np.arange(12, dtype=np.uint8).reshape(4, 3)[:, ::-1],
+    np.zeros((2, 0), dtype=np.int16),
+])
+def test_payload_round_trip(output_format, array):
+    meta = {'type': 'waveform', 'sample_rate': 16000, 'start': 0.5}
+    
+    header, decoded = decode_array_payload(encode_array_payload(meta, array, output_format), output_format)
+    
+    assert header == dict(meta, dtype=array.dtype.str, shape=list(array.shape))
+    assert decoded.dtype == array.dtype
+    np.testing.assert_array_equal(decoded, array)
+
+
+def test_binary_layout():
+    payload = encode_array_payload({'bits': 16}, np.array([[1, -1]], dtype='<i2'), 'binary')
+    
+    (header_length,) = struct.unpack_from('<I', payload)
+    assert json.loads(payload[4:4 + header_length]) == {'bits': 16, 'dtype': '<i2', 'shape': [1, 2]}
+    assert payload[4 + header_length:] == b'\x01\x00\xff\xff'
+
+
+def test_parse_output_format():
+    assert parse_output_format(None) == 'png'
+    assert parse_output_format('JSON') == 'json'
+    with pytest.raises(ValueError, match='Unsupported output format'):
+        parse_output_format('svg')
+    assert output_filename('tone', 'waveform', 'binary') == 'tone_waveform.bin'
+
+
+@pytest.mark.parametrize('output_format', ['json', 'binary'])
+def test_waveform_data_endpoint(client, upload, output_format):
+    response = client.post(f'/waveform/?output={output_format}&width=400', {'audio_file': upload('FLAC', 2.0)})
+    
+    assert response.status_code == 200
+    meta, peaks = decode_array_payload(response.content, output_format)
+    assert meta['rows'] == ['min', 'max', 'rms'] and meta['bits'] == 16
+    assert meta['duration'] == 2.0 and meta['peaks_id']
+    assert peaks.shape[0] == 3 and 0 < peaks.shape[1] <= 400
+    # The tone peaks at half scale
+    assert abs(peaks[1].max() / 32768 - 0.5) < 0.01
+
+
+@pytest.mark.parametrize('output_format', ['json', 'binary'])
+def test_spectrogram_data_endpoint(client, upload, output_format):
+    response = client.post(f'/spectrogram/?output={output_format}', {'audio_file': upload('WAV', 2.0)})
+    
+    assert response.status_code == 200
+    meta, matrix = decode_array_payload(response.content, output_format)
+    assert matrix.dtype == np.uint8
+    assert matrix.shape[0] == meta['n_fft'] // 2 + 1
+    # The loudest bin is at the tone's frequency
+    peak_bin = np.unravel_index(np.argmax(matrix), matrix.shape)[0]
+    assert abs(peak_bin * meta['sample_rate'] / meta['n_fft'] - 220) < meta['sample_rate'] / meta['n_fft']
\ No newline at end of file
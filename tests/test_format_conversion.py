@@ -0,0 +1,52 @@
+import io
+
+import numpy as np
+import pytest
+
+from format_conversion import AudioConverter
+
+
+FORMATS = [
+    ('WAV', None, 'wav'),
+    ('FLAC', None, 'flac'),
+    ('OGG', 'VORBIS', 'ogg'),
+    ('OGG', 'OPUS', 'ogg'),
+    ('AIFF', None, 'aiff'),
+    ('MP3', None, 'mp3'),
+]
+
+
+@pytest.fixture
+def stereo(tone):
+    # Long enough to span several stream chunks, with different channels so the mono mix is exercised
+    return np.stack([tone(5.0, 48000), tone(5.0, 48000, frequency=330.0)], axis=1)
+
+
+def streamed(data, filename, **kwargs):
+    length, chunks = AudioConverter.stream_wav(io.BytesIO(data), filename, **kwargs)
+    body = b''.join(chunks)
+    assert len(body) == length
+    return body
+
+
+@pytest.mark.parametrize('container, subtype, extension', FORMATS)
+def test_stream_wav_matches_convert_to_wav(audio_cache, encode, stereo, container, subtype, extension):
+    data = encode(stereo, 48000, container, subtype)
+    
+    body = streamed(data, f'tone.{extension}', chunk_frames=16384)
+    audio_cache.clear()
+    
+    assert body == AudioConverter.convert_to_wav(io.BytesIO(data), f'tone.{extension}')
+
+
+def test_stream_wav_from_the_decoded_cache(audio_cache, encode, stereo):
+    data = encode(stereo, 48000, 'FLAC')
+    full = AudioConverter.convert_to_wav(io.BytesIO(data), 'tone.flac')
+    
+    assert audio_cache.stats()['entries'] == 1
+    assert streamed(data, 'tone.flac', chunk_frames=16384) == full
+
+
+def test_stream_wav_rejects_unsupported_formats():
+    with pytest.raises(ValueError, match='Unsupported audio format'):
+        AudioConverter.stream_wav(io.BytesIO(b''), 'notes.txt')
\ No newline at end of file
@@ -0,0 +1,64 @@
+import os
+
+import pytest
+
+from ingest import UploadRejected, check_limits
+
+
+@pytest.fixture
+def spool_dir(tmp_path, client, monkeypatch):
+    from django.conf import settings
+    directory = tmp_path / 'spool'
+    directory.mkdir()
+    monkeypatch.setattr(settings, 'FILE_UPLOAD_TEMP_DIR', str(directory))
+    return directory
+
+
+def test_check_limits(monkeypatch):
+    monkeypatch.setattr('ingest.MAX_UPLOAD_BYTES', 1000)
+    monkeypatch.setattr('ingest.MAX_AUDIO_SECONDS', 60)
+    
+    check_limits(1000, 60.0)
+    check_limits(10, None)
+    with pytest.raises(UploadRejected, match='maximum size of 1000 bytes'):
+        check_limits(1001, None)
+    with pytest.raises(UploadRejected, match='the maximum is 60s') as error:
+        check_limits(10, 61.0)
+    assert error.value.status_code == 413
+
+
+def test_limits_of_zero_are_disabled(monkeypatch):
+    monkeypatch.setattr('ingest.MAX_UPLOAD_BYTES', 0)
+    monkeypatch.setattr('ingest.MAX_AUDIO_SECONDS', 0)
+    check_limits(10 ** 12, 10 ** 6)
+
+
+def test_oversize_request_is_rejected_from_its_content_length(client, upload, monkeypatch):
+    monkeypatch.setattr('ingest.MAX_UPLOAD_BYTES', 1000)
+    
+    response = client.post('/convert/', {'audio_file': upload('WAV', 1.0)})
+    
+    assert response.status_code == 413
+    assert 'maximum size' in response.json()['error']
+
+
+@pytest.mark.parametrize('container', ['WAV', 'OGG'])
+def test_upload_over_the_duration_limit(client, upload, spool_dir, monkeypatch, container):
+    monkeypatch.setattr('ingest.MAX_AUDIO_SECONDS', 5)
+    
+    response = client.post('/waveform/', {'audio_file': upload(container, 10.0)})
+    
+    assert response.status_code == 413
+    assert 'the maximum is 5s' in response.json()['error']
+    assert os.listdir(spool_dir) == []
+
+
+def test_upload_within_the_limits_is_spooled(client, upload, spool_dir, monkeypatch):
+    monkeypatch.setattr('ingest.MAX_AUDIO_SECONDS', 5)
+    
+    response = client.post('/info/', {'audio_file': upload('WAV', 4.0)})
+    
+    assert response.status_code == 200
+    assert response.json()['duration'] == 4.0
+    # Django removes the spooled file when the request ends
+    assert os.listdir(spool_dir) == []
\ No newline at end of file
@@ -0,0 +1,77 @@
+import io
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+import soundfile as sf
+
+from jobs import JobQueue, OperationError, QueueFullError
+
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    # Spawned workers inherit the environment, so their result cache stays in tmp_path
+    monkeypatch.setenv('RESULT_CACHE_DIR', str(tmp_path / 'results'))
+    queue = JobQueue(max_workers=1, max_depth=2)
+    yield queue
+    if queue._executor is not None:
+        queue._executor.shutdown(cancel_futures=True)
+
+
+def spooled(tmp_path, data=b'audio'):
+    path = tmp_path / 'upload.job'
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_pool_is_rebuilt_after_a_worker_dies(queue, tmp_path, tone):
+    killed = queue._get_executor().submit(os._exit, 1)
+    with pytest.raises(BrokenProcessPool):
+        killed.result(timeout=60)
+    assert queue.stats()['broken'] is True
+    
+    buffer = io.BytesIO()
+    sf.write(buffer, tone(0.5), 16000, format='FLAC')
+    job = queue.submit('convert', spooled(tmp_path, buffer.getvalue()), 'tone.flac', temporary=True)
+    
+    assert job.future.result(timeout=60)['content'][:4] == b'RIFF'
+    assert queue.stats()['broken'] is False
+
+
+def test_job_errors_come_back_from_the_worker(queue):
+    job = queue.submit('resample', b'', 'tone.wav')
+    
+    with pytest.raises(OperationError) as error:
+        job.future.result(timeout=60)
+    assert error.value.status_code == 400
+    assert job.to_dict()['status'] == 'failed'
+
+
+def test_full_queue_removes_the_temporary_file(queue, tmp_path):
+    queue.max_depth = 0
+    path = spooled(tmp_path)
+    
+    with pytest.raises(QueueFullError):
+        queue.submit('convert', path, 'tone.wav', temporary=True)
+    assert not os.path.exists(path)
+
+
+def test_failed_submit_removes_the_temporary_file(queue, tmp_path, monkeypatch):
+    def refuse(*args):
+        raise RuntimeError('cannot schedule new futures after shutdown')
+    monkeypatch.setattr(queue, '_submit_to_pool', refuse)
+    path = spooled(tmp_path)
+    
+    with pytest.raises(RuntimeError):
+        queue.submit('convert', path, 'tone.wav', temporary=True)
+    assert not os.path.exists(path)
+    assert queue.stats()['active'] == 0
+
+
+def test_submit_retries_once_on_a_shut_down_pool(queue, tmp_path):
+    queue._get_executor().shutdown()
+    
+    job = queue.submit('resample', b'', 'tone.wav')
+    
+    with pytest.raises(OperationError):
+        job.future.result(timeout=60)
\ No newline at end of file
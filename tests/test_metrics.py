@@ -0,0 +1,85 @@
+import re
+
+import pytest
+
+from metrics import REQUESTS, STAGE_SECONDS, Counter, Histogram, Registry, server_timing, stage_timer
+
+
+# One exposition sample line: name, optional labels, value
+SAMPLE_LINE = re.compile(r'^[a-zA-Z_:][a-zA-Z0-9_:]*(\{([a-zA-Z_][a-zA-Z0-9_]*="([^"\\]|\\.)*",?)*\})? \S+$')
+
+
+def test_counter_exposition():
+    registry = Registry()
+    counter = registry.register(Counter('requests_total', 'Requests.', ('endpoint', 'status')))
+    counter.inc(endpoint='convert', status=200)
+    counter.inc(2, endpoint='convert', status=200)
+    counter.inc(endpoint='say "hi"\n', status=500)
+    
+    assert registry.expose() == (
+        '# HELP requests_total Requests.\n'
+        '# TYPE requests_total counter\n'
+        'requests_total{endpoint="convert",status="200"} 3\n'
+        'requests_total{endpoint="say \\"hi\\"\\n",status="500"} 1\n'
+    )
+
+
+def test_histogram_buckets_are_cumulative_and_inclusive():
+    histogram = Histogram('latency_seconds', 'Latency.', ('stage',), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, stage='dsp')
+    
+    assert histogram.samples() == [
+        'latency_seconds_bucket{stage="dsp",le="0.1"} 2',
+        'latency_seconds_bucket{stage="dsp",le="1"} 3',
+        'latency_seconds_bucket{stage="dsp",le="+Inf"} 4',
+        'latency_seconds_sum{stage="dsp"} 3.65',
+        'latency_seconds_count{stage="dsp"} 4',
+    ]
+
+
+def test_labels_must_match():
+    counter = Counter('requests_total', 'Requests.', ('endpoint',))
+    with pytest.raises(ValueError, match='expects labels'):
+        counter.inc(operation='convert')
+
+
+def test_server_timing():
+    assert server_timing({'decode': 0.0123, 'dsp': 0.5}, 0.6) == 'decode;dur=12.3, dsp;dur=500.0, total;dur=600.0'
+
+
+def test_stage_timer_records_on_error():
+    histogram_count = _stage_count('test', 'decode')
+    with pytest.raises(RuntimeError):
+        with stage_timer('test', 'decode'):
+            raise RuntimeError()
+    assert _stage_count('test', 'decode') == histogram_count + 1
+
+
+def test_metrics_endpoint(client, upload):
+    before = _request_count('convert', 'POST', '200')
+    response = client.post('/convert/', {'audio_file': upload('FLAC', 1.0)})
+    assert response.status_code == 200
+    # The body is streamed after the response is returned, so only the upload stage is reported
+    assert response['Server-Timing'].startswith('upload;dur=')
+    b''.join(response.streaming_content)
+    
+    response = client.get('/metrics/')
+    
+    assert response.status_code == 200
+    assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+    body = response.content.decode('utf-8')
+    assert body.endswith('\n')
+    for line in body.splitlines():
+        assert line.startswith('# HELP ') or line.startswith('# TYPE ') or SAMPLE_LINE.match(line), line
+    assert _request_count('convert', 'POST', '200') == before + 1
+    assert 'spectrolingua_audio_duration_seconds_bucket{operation="convert",le="1"}' in body
+
+
+def _request_count(endpoint, method, status):
+    return REQUESTS._values.get((endpoint, method, status), 0)
+
+
+def _stage_count(operation, stage):
+    counts, _ = STAGE_SECONDS._values.get((operation, stage), ([0], 0.0))
+    return sum(counts)
\ No newline at end of file
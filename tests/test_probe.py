@@ -0,0 +1,109 @@
+import io
+import struct
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from format_conversion import probe
+
+
+def encode(y, sample_rate, container, subtype=None):
+    buffer = io.BytesIO()
+    sf.write(buffer, y, sample_rate, format=container, subtype=subtype)
+    buffer.seek(0)
+    return buffer
+
+
+def box(kind, payload):
+    return struct.pack('>I4s', 8 + len(payload), kind) + payload
+
+
+def mp4(version=0, timescale=48000, duration=125 * 48000, sample_rate=48000, channels=2, codec=b'mp4a',
+        mdat=b'\0' * 64, mdat_size=None):
+    if version == 1:
+        mdhd = box(b'mdhd', struct.pack('>B3xQQIQ4x', 1, 0, 0, timescale, duration))
+    else:
+        mdhd = box(b'mdhd', struct.pack('>B3xIIII4x', 0, 0, 0, timescale, duration))
+    hdlr = box(b'hdlr', struct.pack('>4x4s4s12x', b'\0' * 4, b'soun') + b'\0')
+    entry = box(codec, struct.pack('>6xH8xHH4xI', 1, channels, 16, sample_rate << 16))
+    stsd = box(b'stsd', struct.pack('>4xI', 1) + entry)
+    trak = box(b'trak', box(b'mdia', mdhd + hdlr + box(b'minf', box(b'stbl', stsd))))
+    moov = box(b'moov', box(b'mvhd', b'\0' * 100) + trak)
+    ftyp = box(b'ftyp', b'M4A \0\0\0\0isomM4A ')
+    if mdat_size is None:
+        mdat_size = 8 + len(mdat)
+    return io.BytesIO(ftyp + moov + struct.pack('>I4s', mdat_size, b'mdat') + mdat)
+
+
+@pytest.mark.parametrize('subtype, bit_depth', [('PCM_16', 16), ('PCM_24', 24), ('FLOAT', 32)])
+def test_probe_wav(tone, subtype, bit_depth):
+    info = probe(encode(np.stack([tone(2.0, 44100)] * 2, axis=1), 44100, 'WAV', subtype))
+    
+    assert info == {
+        'format': 'wav', 'codec': subtype, 'duration': 2.0, 'sample_rate': 44100, 'channels': 2,
+        'bit_depth': bit_depth, 'frames': 88200,
+    }
+
+
+@pytest.mark.parametrize('container, codec, bit_depth', [
+    ('FLAC', 'PCM_16', 16), ('OGG', 'VORBIS', None), ('AIFF', 'PCM_16', 16),
+])
+def test_probe_other_containers(tone, container, codec, bit_depth):
+    info = probe(encode(tone(1.5), 16000, container))
+    
+    assert info['format'] == container.lower()
+    assert info['codec'] == codec
+    assert info['bit_depth'] == bit_depth
+    assert (info['sample_rate'], info['channels']) == (16000, 1)
+    assert info['duration'] == pytest.approx(1.5, abs=0.01)
+
+
+@pytest.mark.parametrize('container', ['WAV', 'AIFF'])
+def test_probe_partial_file_reports_the_declared_length(tone, container):
+    data = encode(tone(60.0), 16000, container, 'PCM_16').getvalue()
+    
+    info = probe(io.BytesIO(data[:64 * 1024]))
+    
+    assert info['duration'] == 60.0
+    assert info['frames'] == 960000
+
+
+def test_probe_leaves_the_source_rewound(tone):
+    source = encode(tone(1.0), 16000, 'WAV')
+    source.seek(100)
+    probe(source)
+    assert source.tell() == 0
+
+
+def test_probe_path(tone, tmp_path):
+    path = tmp_path / 'tone.flac'
+    path.write_bytes(encode(tone(1.0), 16000, 'FLAC').getvalue())
+    
+    assert probe(str(path))['duration'] == 1.0
+
+
+@pytest.mark.parametrize('version', [0, 1])
+def test_probe_mp4(version):
+    assert probe(mp4(version)) == {
+        'format': 'mp4', 'codec': 'AAC', 'duration': 125.0, 'sample_rate': 48000, 'channels': 2,
+        'bit_depth': None, 'frames': 6000000,
+    }
+
+
+def test_probe_mp4_uses_the_media_timescale():
+    info = probe(mp4(timescale=1000, duration=2500, sample_rate=44100, channels=1, codec=b'alac'))
+    
+    assert info['duration'] == 2.5
+    assert info['frames'] == 110250
+    assert (info['codec'], info['bit_depth'], info['channels']) == ('ALAC', 16, 1)
+
+
+def test_probe_mp4_with_truncated_mdat():
+    # moov comes first, so a partial upload is enough
+    assert probe(mp4(mdat_size=50 * 1024 * 1024))['duration'] == 125.0
+
+
+@pytest.mark.parametrize('data', [b'', b'not audio at all' * 100, b'\0\0\0\x20ftyp' + b'\0' * 24])
+def test_probe_unknown_data(data):
+    assert probe(io.BytesIO(data)) is None
\ No newline at end of file
@@ -0,0 +1,96 @@
+import os
+import time
+
+import pytest
+
+from result_cache import ResultCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResultCache(str(tmp_path), max_bytes=1000)
+
+
+def entry_files(cache):
+    return sorted(
+        name for _, _, files in os.walk(cache.directory) for name in files
+    )
+
+
+def age(cache, key, seconds):
+    path = cache._path(key)
+    timestamp = time.time() - seconds
+    os.utime(path, (timestamp, timestamp))
+
+
+def test_put_and_get(cache):
+    key = ResultCache.make_key('digest', 'waveform', {'dpi': 150})
+    assert cache.get(key) is None
+    
+    cache.put(key, b'png')
+    
+    assert cache.get(key) == b'png'
+    assert key != ResultCache.make_key('digest', 'waveform', {'dpi': 300})
+
+
+def test_eviction_drops_least_recently_used_first(cache):
+    for index, key in enumerate(('a' * 64, 'b' * 64, 'c' * 64)):
+        cache.put(key, b'x' * 300)
+        age(cache, key, 100 - index)
+    # Reading refreshes an entry, so the next oldest is evicted instead
+    assert cache.get('a' * 64) is not None
+    
+    cache.put('d' * 64, b'x' * 300)
+    
+    assert cache.get('b' * 64) is None
+    assert all(cache.get(key * 64) is not None for key in 'acd')
+    assert cache._total_bytes == 900
+
+
+def test_running_total_tracks_writes(cache):
+    cache.put('a' * 64, b'x' * 100)
+    assert cache._total_bytes == 100
+    
+    cache.put('a' * 64, b'x' * 300)
+    cache.put('b' * 64, b'x' * 200)
+    
+    assert cache._total_bytes == 500
+    assert cache._total_bytes == sum(os.path.getsize(cache._path(key)) for key in ('a' * 64, 'b' * 64))
+
+
+def test_put_skips_results_over_the_budget(cache):
+    cache.put('a' * 64, b'x' * 400)
+    
+    cache.put('b' * 64, b'x' * 1001)
+    
+    assert cache.get('b' * 64) is None
+    assert cache.get('a' * 64) is not None
+
+
+def test_tee_caches_complete_streams(cache):
+    chunks = [b'x' * 100, b'y' * 100]
+    
+    assert list(cache.tee('a' * 64, iter(chunks))) == chunks
+    assert cache.get('a' * 64) == b''.join(chunks)
+
+
+def test_tee_streams_but_does_not_cache_results_over_the_budget(cache):
+    cache.put('a' * 64, b'x' * 400)
+    chunks = [b'y' * 300] * 5
+    
+    assert list(cache.tee('b' * 64, iter(chunks))) == chunks
+    
+    assert cache.get('b' * 64) is None
+    # Other entries are not evicted to make room
+    assert cache.get('a' * 64) is not None
+    assert not [name for name in entry_files(cache) if name.endswith('.tmp')]
+
+
+def test_tee_closed_early_leaves_nothing_behind(cache):
+    stream = cache.tee('a' * 64, iter([b'x' * 100] * 3))
+    next(stream)
+    
+    stream.close()
+    
+    assert cache.get('a' * 64) is None
+    assert entry_files(cache) == []
\ No newline at end of file
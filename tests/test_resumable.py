@@ -0,0 +1,154 @@
+import hashlib
+import io
+import os
+
+import pytest
+import soundfile as sf
+
+from ingest import PROBE_BYTES, UploadRejected
+from resumable import ResumableUploadError, ResumableUploads, parse_content_range
+
+
+@pytest.fixture
+def uploads(tmp_path):
+    return ResumableUploads(str(tmp_path), ttl=3600)
+
+
+def send(uploads, upload_id, data, start, end, total=None):
+    content_range = f"bytes {start}-{end - 1}/{'*' if total is None else total}"
+    return uploads.write(upload_id, content_range, io.BytesIO(data[start:end]))
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('bytes 0-99/1000', (0, 100, 1000)),
+    ('bytes 100-100/*', (100, 101, None)),
+    (' bytes 5-9/10 ', (5, 10, 10)),
+])
+def test_parse_content_range(value, expected):
+    assert parse_content_range(value) == expected
+
+
+@pytest.mark.parametrize('value', [None, '', 'bytes 0-99', 'bytes=0-99/100', 'bytes -1-5/10', 'bytes 10-9/100'])
+def test_parse_content_range_rejects_malformed_headers(value):
+    with pytest.raises(ResumableUploadError) as error:
+        parse_content_range(value)
+    assert error.value.status_code == 400
+
+
+def test_upload_in_chunks(uploads):
+    data = os.urandom(10000)
+    state = uploads.create('clip.bin', len(data), hashlib.sha256(data).hexdigest().upper())
+    upload_id = state['upload_id']
+    
+    assert send(uploads, upload_id, data, 0, 4000, len(data))['offset'] == 4000
+    # A retried chunk that is already stored is acknowledged without writing
+    assert send(uploads, upload_id, data, 0, 4000)['offset'] == 4000
+    assert send(uploads, upload_id, data, 4000, 10000)['offset'] == 10000
+    
+    part, state = uploads.finalize(upload_id)
+    with part:
+        assert part.read() == data
+    assert part.sha256 == hashlib.sha256(data).hexdigest()
+    assert part.name == 'clip.bin'
+    assert state['offset'] == 10000
+
+
+def test_chunks_must_arrive_in_order(uploads):
+    data = os.urandom(1000)
+    upload_id = uploads.create('clip.bin', len(data))['upload_id']
+    send(uploads, upload_id, data, 0, 100)
+    
+    with pytest.raises(ResumableUploadError) as error:
+        send(uploads, upload_id, data, 200, 300)
+    
+    assert (error.value.status_code, error.value.offset) == (409, 100)
+    assert uploads.status(upload_id)['offset'] == 100
+
+
+@pytest.mark.parametrize('body, message', [
+    (b'x' * 101, 'longer than the 100 bytes'),
+    (b'x' * 60, 'has 60 bytes but Content-Range announces 100'),
+])
+def test_body_must_match_content_range(uploads, body, message):
+    upload_id = uploads.create('clip.bin', 1000)['upload_id']
+    
+    with pytest.raises(ResumableUploadError, match=message):
+        uploads.write(upload_id, 'bytes 0-99/1000', io.BytesIO(body))
+    
+    # Nothing of the rejected chunk is kept
+    assert uploads.status(upload_id)['offset'] == 0
+
+
+def test_chunk_checksum_mismatch(uploads):
+    upload_id = uploads.create('clip.bin', 100)['upload_id']
+    
+    with pytest.raises(ResumableUploadError, match='Chunk checksum mismatch'):
+        uploads.write(upload_id, 'bytes 0-99/100', io.BytesIO(b'x' * 100), hashlib.sha256(b'y').hexdigest())
+    assert uploads.status(upload_id)['offset'] == 0
+
+
+def test_content_range_must_fit_the_upload(uploads):
+    upload_id = uploads.create('clip.bin', 100)['upload_id']
+    
+    with pytest.raises(ResumableUploadError, match='does not match the upload size'):
+        uploads.write(upload_id, 'bytes 0-9/200', io.BytesIO(b'x' * 10))
+    with pytest.raises(ResumableUploadError, match='ends beyond the upload size'):
+        uploads.write(upload_id, 'bytes 0-199/*', io.BytesIO(b'x' * 200))
+
+
+def test_finalize_incomplete_upload(uploads):
+    data = os.urandom(1000)
+    upload_id = uploads.create('clip.bin', len(data))['upload_id']
+    send(uploads, upload_id, data, 0, 400)
+    
+    with pytest.raises(ResumableUploadError) as error:
+        uploads.finalize(upload_id)
+    
+    assert (error.value.status_code, error.value.offset) == (409, 400)
+
+
+def test_finalize_checksum_mismatch_discards_the_upload(uploads):
+    data = os.urandom(1000)
+    upload_id = uploads.create('clip.bin', len(data), hashlib.sha256(b'other').hexdigest())['upload_id']
+    send(uploads, upload_id, data, 0, 1000)
+    
+    with pytest.raises(ResumableUploadError, match='Checksum mismatch'):
+        uploads.finalize(upload_id)
+    
+    with pytest.raises(ResumableUploadError) as error:
+        uploads.status(upload_id)
+    assert error.value.status_code == 404
+
+
+def test_finalize_rehashes_after_a_restart(uploads, tmp_path):
+    data = os.urandom(5000)
+    upload_id = uploads.create('clip.bin', len(data))['upload_id']
+    send(uploads, upload_id, data, 0, 2000)
+    
+    # Another process has no running hash for the session
+    restarted = ResumableUploads(str(tmp_path), ttl=3600)
+    send(restarted, upload_id, data, 2000, 5000)
+    part, _ = restarted.finalize(upload_id)
+    part.close()
+    
+    assert part.sha256 == hashlib.sha256(data).hexdigest()
+
+
+def test_upload_over_the_duration_limit_is_rejected_early(uploads, tone, monkeypatch):
+    monkeypatch.setattr('ingest.MAX_AUDIO_SECONDS', 10)
+    buffer = io.BytesIO()
+    sf.write(buffer, tone(60.0), 16000, format='WAV', subtype='PCM_16')
+    data = buffer.getvalue()
+    upload_id = uploads.create('long.wav', len(data))['upload_id']
+    
+    with pytest.raises(UploadRejected):
+        send(uploads, upload_id, data, 0, PROBE_BYTES)
+    
+    assert uploads.delete(upload_id) is False
+
+
+def test_unknown_upload(uploads):
+    for upload_id in ('0' * 32, '../etc/passwd'):
+        with pytest.raises(ResumableUploadError) as error:
+            uploads.status(upload_id)
+        assert error.value.status_code == 404
\ No newline at end of file
@@ -0,0 +1,54 @@
+import io
+
+import librosa
+import numpy as np
+import pytest
+
+from spectrogram import SpectrogramGenerator
+
+
+@pytest.fixture
+def chirp():
+    # A rising tone, so any misplaced block shows up in a different frequency bin
+    t = np.arange(12 * 16000) / 16000
+    return (0.5 * np.sin(2 * np.pi * (200 + 150 * t) * t)).astype(np.float32)
+
+
+@pytest.mark.parametrize('container, subtype, extension', [
+    ('WAV', None, 'wav'),
+    ('FLAC', None, 'flac'),
+    ('OGG', 'VORBIS', 'ogg'),
+    ('AIFF', None, 'aiff'),
+    ('MP3', None, 'mp3'),
+])
+def test_streamed_stft_matches_the_full_decode(audio_cache, encode, chirp, container, subtype, extension):
+    data = encode(chirp, 16000, container, subtype)
+    n_fft, hop_length = SpectrogramGenerator.N_FFT, SpectrogramGenerator.HOP_LENGTH
+    columns = SpectrogramGenerator.TIME_COLUMNS
+    
+    S, sr, frames_per_column = SpectrogramGenerator.magnitude_from_file(io.BytesIO(data), f'chirp.{extension}')
+    
+    y, _ = librosa.load(io.BytesIO(data), sr=None)
+    expected, expected_frames_per_column = SpectrogramGenerator.magnitude_from_array(y, columns, n_fft, hop_length)
+    assert (sr, frames_per_column) == (16000, expected_frames_per_column)
+    np.testing.assert_allclose(S, expected, rtol=1e-4, atol=1e-4 * expected.max())
+
+
+def test_only_sample_accurate_formats_are_streamed(encode, chirp):
+    n_fft = SpectrogramGenerator.N_FFT
+    
+    assert SpectrogramGenerator._is_streamable(io.BytesIO(encode(chirp, 16000, 'FLAC')), n_fft)
+    assert not SpectrogramGenerator._is_streamable(io.BytesIO(encode(chirp, 16000, 'MP3')), n_fft)
+    assert not SpectrogramGenerator._is_streamable(io.BytesIO(encode(chirp[:1000], 16000, 'WAV')), n_fft)
+    assert not SpectrogramGenerator._is_streamable(io.BytesIO(b'not audio'), n_fft)
+
+
+def test_array_blocks_cover_every_frame(chirp):
+    n_fft, hop_length = SpectrogramGenerator.N_FFT, SpectrogramGenerator.HOP_LENGTH
+    
+    S, frames_per_column = SpectrogramGenerator.magnitude_from_array(chirp, 10 ** 6, n_fft, hop_length)
+    
+    assert frames_per_column == 1
+    np.testing.assert_allclose(
+        S, np.abs(librosa.stft(chirp, n_fft=n_fft, hop_length=hop_length, center=False)), rtol=1e-4, atol=1e-3
+    )
\ No newline at end of file
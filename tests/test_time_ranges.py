@@ -0,0 +1,80 @@
+import io
+
+import librosa
+import numpy as np
+import pytest
+import soundfile as sf
+
+from audio_io import decode_audio_range
+from format_conversion import AudioConverter
+
+
+@pytest.mark.parametrize('container, extension', [('WAV', 'wav'), ('FLAC', 'flac'), ('MP3', 'mp3')])
+def test_decode_audio_range_matches_a_slice_of_the_full_decode(encode, tone, container, extension):
+    data = encode(tone(10.0, 16000), 16000, container)
+    full, _ = librosa.load(io.BytesIO(data), sr=None)
+    
+    y, sr, total = decode_audio_range(io.BytesIO(data), f'tone.{extension}', start=3.125, duration=2.0)
+    
+    assert sr == 16000
+    np.testing.assert_allclose(y, full[50000:82000], atol=1e-6)
+    if container != 'MP3':
+        assert total == 10.0
+
+
+def test_decode_audio_range_to_the_end(encode, tone):
+    data = encode(tone(4.0, 16000), 16000, 'MP3')
+    full, _ = librosa.load(io.BytesIO(data), sr=None)
+    
+    y, _, _ = decode_audio_range(io.BytesIO(data), 'tone.mp3', start=1.0)
+    
+    np.testing.assert_allclose(y, full[16000:], atol=1e-6)
+
+
+@pytest.mark.parametrize('container, extension', [('WAV', 'wav'), ('MP3', 'mp3')])
+def test_decode_audio_range_beyond_the_end(encode, tone, container, extension):
+    data = encode(tone(2.0, 16000), 16000, container)
+    with pytest.raises(ValueError, match='beyond the end'):
+        decode_audio_range(io.BytesIO(data), f'tone.{extension}', start=5.0)
+
+
+@pytest.mark.parametrize('container, extension', [('FLAC', 'flac'), ('MP3', 'mp3')])
+def test_stream_wav_window(audio_cache, encode, tone, container, extension):
+    data = encode(tone(6.0, 16000), 16000, container)
+    
+    length, chunks = AudioConverter.stream_wav(io.BytesIO(data), f'tone.{extension}', start=1.5, duration=2.0)
+    body = b''.join(chunks)
+    
+    full, _ = librosa.load(io.BytesIO(data), sr=None)
+    window, sr = sf.read(io.BytesIO(body), dtype='float32')
+    assert len(body) == length
+    assert sr == 16000 and len(window) == 32000
+    np.testing.assert_allclose(window, full[24000:56000], atol=1 / 16384)
+
+
+def test_convert_time_range(client, upload):
+    response = client.post('/convert/?start=0.5&duration=1', {'audio_file': upload('FLAC', 2.0)})
+    
+    assert response.status_code == 200
+    window, sr = sf.read(io.BytesIO(b''.join(response.streaming_content)))
+    assert (len(window), sr) == (16000, 16000)
+
+
+@pytest.mark.parametrize('query, message', [
+    ('start=5', 'beyond the end'),
+    ('start=-1', 'must not be negative'),
+    ('duration=0', 'greater than 0'),
+    ('start=abc', 'Invalid start'),
+    ('start=nan', 'Invalid start'),
+    ('duration=inf', 'Invalid duration'),
+])
+def test_convert_rejects_bad_time_ranges(client, upload, query, message):
+    response = client.post(f'/convert/?{query}', {'audio_file': upload('FLAC', 2.0)})
+    
+    assert response.status_code == 400
+    assert message in response.json()['error']
+
+
+def test_spectrogram_start_beyond_the_end(client, upload):
+    response = client.post('/spectrogram/?start=5', {'audio_file': upload('WAV', 2.0)})
+    assert response.status_code == 400
\ No newline at end of file
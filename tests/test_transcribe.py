@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+import speech_recognition as sr
+
+from audio_io import float_to_int16
+from transcribe import AudioTranscriber, RecognizerBackend
+
+
+class FakeBackend(RecognizerBackend):
+    """Recognizes each segment as its length, so results can be checked without the network."""
+    
+    def __init__(self, silent=False, error=None):
+        self.calls = []
+        self.silent = silent
+        self.error = error
+    
+    def recognize(self, samples, sample_rate, language):
+        self.calls.append((len(samples), sample_rate, language))
+        if self.error is not None:
+            raise self.error
+        if self.silent:
+            raise sr.UnknownValueError()
+        return f'{len(samples) / sample_rate:.2f}s'
+
+
+def bursts(tone, pattern, sample_rate=16000):
+    # pattern: (seconds, voiced) pairs
+    return np.concatenate([
+        tone(seconds, sample_rate) if voiced else np.zeros(int(seconds * sample_rate), dtype=np.float32)
+        for seconds, voiced in pattern
+    ])
+
+
+def test_split_on_silence_separates_speech_runs(tone):
+    y = bursts(tone, [(1.0, True), (1.0, False), (1.0, True)])
+    segments = AudioTranscriber.split_on_silence(y, 16000, max_segment_seconds=1.5)
+    
+    assert len(segments) == 2
+    (first_start, first_end), (second_start, second_end) = segments
+    assert first_start == 0
+    # Padding keeps a little context but does not bridge the pause
+    assert 1.0 <= first_end / 16000 <= 1.2
+    assert 1.8 <= second_start / 16000 <= 2.0
+    assert second_end == len(y)
+
+
+def test_split_on_silence_bridges_short_pauses(tone):
+    y = bursts(tone, [(1.0, True), (0.1, False), (1.0, True)])
+    assert AudioTranscriber.split_on_silence(y, 16000, max_segment_seconds=3.0) == [(0, len(y))]
+
+
+def test_split_on_silence_bounds_long_speech(tone):
+    y = tone(10.0)
+    segments = AudioTranscriber.split_on_silence(y, 16000, max_segment_seconds=3.0)
+    
+    assert len(segments) > 1
+    assert all(end - start <= 3.0 * 16000 for start, end in segments)
+    # Cuts are contiguous and cover the whole run
+    assert segments[0][0] == 0 and segments[-1][1] == len(y)
+    assert all(previous[1] == current[0] for previous, current in zip(segments, segments[1:]))
+
+
+def test_split_on_silence_edge_cases(tone):
+    assert AudioTranscriber.split_on_silence(np.zeros(16000, dtype=np.float32), 16000) == []
+    assert AudioTranscriber.split_on_silence(np.zeros(0, dtype=np.float32), 16000) == []
+    # Shorter than one analysis frame
+    assert AudioTranscriber.split_on_silence(tone(0.01), 16000) == [(0, 160)]
+
+
+def test_transcribe_samples_with_fake_backend(tone):
+    # Too long for one segment, so the runs are recognized separately
+    samples = float_to_int16(bursts(tone, [(20.0, True), (2.0, False), (20.0, True)]))
+    backend = FakeBackend()
+    
+    segments = AudioTranscriber.transcribe_samples(samples, 16000, 'de-DE', backend, offset=10.0)
+    
+    assert len(segments) == 2
+    assert all(call[1:] == (16000, 'de-DE') for call in backend.calls)
+    # Timestamps are shifted by the offset of the first sample
+    assert segments[0]['start'] == 10.0
+    assert segments[1]['end'] == 52.0
+    assert AudioTranscriber.join_segments(segments) == ' '.join(segment['text'] for segment in segments)
+
+
+def test_transcribe_samples_without_speech_is_a_value_error(tone):
+    samples = float_to_int16(tone(1.0))
+    with pytest.raises(ValueError, match='Could not understand audio'):
+        AudioTranscriber.transcribe_samples(samples, 16000, backend=FakeBackend(silent=True))
+
+
+def test_transcribe_samples_request_error_is_a_value_error(tone):
+    samples = float_to_int16(tone(1.0))
+    backend = FakeBackend(error=sr.RequestError('offline'))
+    with pytest.raises(ValueError, match='Could not request results'):
+        AudioTranscriber.transcribe_samples(samples, 16000, backend=backend)
+
+
+def test_join_segments():
+    assert AudioTranscriber.join_segments([{'text': 'hello'}, {'text': 'world'}]) == 'hello world'
+    assert AudioTranscriber.join_segments([]) == ''
\ No newline at end of file
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from waveform import PeakPyramid, WaveformGenerator
+
+
+def test_peak_pyramid_round_trip(tone):
+    pyramid = WaveformGenerator.build_peak_pyramid(tone(3.0, 8000), 8000)
+    restored = PeakPyramid.from_bytes(pyramid.to_bytes())
+    
+    assert (restored.sample_rate, restored.samples, restored.base_bin) == (8000, 24000, pyramid.base_bin)
+    assert restored.duration == 3.0
+    assert len(restored.levels) == len(pyramid.levels) > 1
+    for level, restored_level in zip(pyramid.levels, restored.levels):
+        for array, restored_array in zip(level, restored_level):
+            assert restored_array.dtype == np.int16
+            np.testing.assert_array_equal(array, restored_array)
+
+
+def test_peak_pyramid_levels_halve(tone):
+    pyramid = WaveformGenerator.build_peak_pyramid(tone(3.0, 8000), 8000)
+    
+    assert len(pyramid.levels[0][0]) == 24000 // WaveformGenerator.PYRAMID_BASE_BIN
+    for finer, coarser in zip(pyramid.levels, pyramid.levels[1:]):
+        assert len(coarser[0]) == -(-len(finer[0]) // 2)
+    assert len(pyramid.levels[-1][0]) <= WaveformGenerator.PYRAMID_MIN_BINS
+
+
+def test_window_envelope_is_bounded_by_width(tone):
+    y = tone(10.0, 8000, amplitude=0.8)
+    pyramid = WaveformGenerator.build_peak_pyramid(y, 8000)
+    
+    times, mins, maxs, rms = WaveformGenerator.window_envelope(pyramid, 0.0, 10.0, 500)
+    
+    assert len(times) == len(mins) == len(maxs) == len(rms) <= 500
+    assert np.all(np.diff(times) > 0)
+    assert abs(maxs.max() - 0.8) < 1e-3 and abs(mins.min() + 0.8) < 1e-3
+    assert abs(rms.mean() - 0.8 / np.sqrt(2)) < 1e-2
+
+
+def test_window_envelope_of_a_range_pyramid_matches_the_whole_file(tone):
+    y = tone(10.0, 8000) * np.linspace(0.1, 1.0, 80000, dtype=np.float32)
+    full = WaveformGenerator.build_peak_pyramid(y, 8000)
+    # Start on a bin boundary of every level the window can use
+    offset = 32768 / 8000
+    part = WaveformGenerator.build_peak_pyramid(y[32768:], 8000)
+    
+    expected = WaveformGenerator.window_envelope(full, 5.0, 7.0, 100)
+    actual = WaveformGenerator.window_envelope(part, 5.0, 7.0, 100, offset)
+    
+    for expected_array, actual_array in zip(expected, actual):
+        np.testing.assert_allclose(actual_array, expected_array)
+
+def test_waveform_window(client, upload):
+    response = client.post('/waveform/?start=0.5&end=1.5&width=400', {'audio_file': upload('FLAC', 2.0)})
+    
+    assert response.status_code == 200
+    assert response['Content-Type'] == 'image/png'
+
+
+@pytest.mark.parametrize('query, message', [
+    ('start=nan', 'Invalid start'),
+    ('end=inf', 'Invalid end'),
+    ('duration=-inf', 'Invalid duration'),
+    ('start=1&end=0.5', 'end must be greater than start'),
+    ('end=1&duration=1', 'either end or duration'),
+    ('width=10', 'width must be between'),
+])
+def test_waveform_rejects_bad_windows(client, upload, query, message):
+    response = client.post(f'/waveform/?{query}', {'audio_file': upload('FLAC', 2.0)})
+    
+    assert response.status_code == 400
+    assert message in response.json()['error']
\ No newline at end of file
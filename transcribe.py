@@ -1,55 +1,185 @@
-import speech_recognition as sr
-import tempfile
+import numpy as np
 import os
-from typing import BinaryIO
-import io
-from format_conversion import AudioConverter
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, List, Tuple
+from audio_cache import load_audio, load_audio_range
+from metrics import observe_audio, stage_timer
+
+
+TRANSCRIBE_WORKERS = int(os.environ.get('TRANSCRIBE_WORKERS', 4))
+TRANSCRIBE_BACKEND = os.environ.get('TRANSCRIBE_BACKEND', 'google')
+
+
+class RecognizerBackend:
+    """Turns one mono int16 speech segment into text.
+    
+    Implementations raise sr.UnknownValueError when a segment contains no
+    recognizable speech and sr.RequestError when the service is unreachable.
+    """
+    
+    def recognize(self, samples: np.ndarray, sample_rate: int, language: str) -> str:
+        raise NotImplementedError
+
+
+class GoogleRecognizerBackend(RecognizerBackend):
+    
+    def recognize(self, samples: np.ndarray, sample_rate: int, language: str) -> str:
+        import speech_recognition as sr
+        
+        recognizer = sr.Recognizer()
+        audio_data = sr.AudioData(samples.tobytes(), sample_rate, 2)
+        return recognizer.recognize_google(audio_data, language=language)
+
+
+RECOGNIZER_BACKENDS = {
+    'google': GoogleRecognizerBackend,
+}
 
 
 class AudioTranscriber:
+    MAX_SEGMENT_SECONDS = 30.0
+    MIN_SILENCE_SECONDS = 0.3
+    FRAME_SECONDS = 0.02
+    SILENCE_THRESHOLD_DB = -40.0
+    SEGMENT_PADDING_SECONDS = 0.1
+    # Recognizers work on 16 kHz 16-bit mono; decoding straight to it avoids
+    # shipping and re-sampling full-rate audio
+    SAMPLE_RATE = 16000
     
     @staticmethod
-    def transcribe_audio_from_file(audio_file: BinaryIO, original_filename: str, language: str = 'en-US') -> str:
-        file_extension = original_filename.split('.')[-1].lower()
+    def get_backend(name: str = None) -> RecognizerBackend:
+        name = name or TRANSCRIBE_BACKEND
+        if name not in RECOGNIZER_BACKENDS:
+            raise ValueError(f"Unknown transcription backend: {name}")
+        return RECOGNIZER_BACKENDS[name]()
+    
+    @staticmethod
+    def split_on_silence(y: np.ndarray, sample_rate: int,
+                         max_segment_seconds: float = MAX_SEGMENT_SECONDS) -> List[Tuple[int, int]]:
+        frame_length = max(1, int(sample_rate * AudioTranscriber.FRAME_SECONDS))
+        n_frames = len(y) // frame_length
+        if n_frames == 0:
+            return [(0, len(y))] if len(y) else []
         
-        # If not WAV, convert it first using our existing AudioConverter
-        if file_extension != 'wav':
-            try:
-                # Reset file pointer to beginning
-                audio_file.seek(0)
-                # Convert to WAV using our existing converter
-                wav_data = AudioConverter.convert_to_wav(audio_file, original_filename)
-                
-                # Create temporary WAV file from converted data
-                with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_wav:
-                    temp_wav.write(wav_data)
-                    temp_wav_path = temp_wav.name
-                
-            except Exception as e:
-                raise ValueError(f"Failed to convert {file_extension} to WAV for transcription: {str(e)}")
-        else:
-            # For WAV files, write directly to temp file
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_wav:
-                temp_wav.write(audio_file.read())
-                temp_wav_path = temp_wav.name
+        frames = y[:n_frames * frame_length].reshape(n_frames, frame_length)
+        energy = np.einsum('ij,ij->i', frames, frames, dtype=np.float64) / frame_length
+        # The threshold is relative to the loudest frame, so digital silence
+        # would otherwise count as speech
+        if not energy.any():
+            return []
+        energy_db = 10 * np.log10(np.maximum(energy, 1e-12) / max(energy.max(), 1e-12))
+        voiced = energy_db > AudioTranscriber.SILENCE_THRESHOLD_DB
+        
+        if not voiced.any():
+            return []
+        
+        # Voiced runs as [start, end) frame ranges
+        edges = np.diff(np.r_[0, voiced.astype(np.int8), 0])
+        runs = list(zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)))
+        
+        max_frames = max(1, int(max_segment_seconds / AudioTranscriber.FRAME_SECONDS))
+        min_gap = int(AudioTranscriber.MIN_SILENCE_SECONDS / AudioTranscriber.FRAME_SECONDS)
+        
+        # Bridge pauses too short to be sentence breaks, then pack neighbouring
+        # runs into chunks of at most max_frames
+        segments = []
+        start, end = runs[0]
+        for run_start, run_end in runs[1:]:
+            if run_start - end < min_gap or run_end - start <= max_frames:
+                end = run_end
+            else:
+                segments.append((start, end))
+                start, end = run_start, run_end
+        segments.append((start, end))
         
+        # Keep a little context around each chunk so word onsets are not clipped
+        padding = int(AudioTranscriber.SEGMENT_PADDING_SECONDS / AudioTranscriber.FRAME_SECONDS)
+        segments = [(max(start - padding, 0), min(end + padding, n_frames)) for start, end in segments]
+        
+        # Runs of uninterrupted speech longer than max_frames are cut at their quietest frame
+        bounded = []
+        for start, end in segments:
+            while end - start > max_frames:
+                window = energy[start + max_frames // 2:start + max_frames]
+                split = start + max_frames // 2 + int(np.argmin(window))
+                bounded.append((start, split))
+                start = split
+            bounded.append((start, end))
+        
+        return [
+            (start * frame_length, len(y) if end == n_frames else end * frame_length)
+            for start, end in bounded
+        ]
+    
+    @staticmethod
+    def transcribe_segments(audio_file: BinaryIO, original_filename: str, language: str = 'en-US',
+                            backend: RecognizerBackend = None, start: float = 0.0,
+                            duration: float = None) -> List[dict]:
+        file_extension = original_filename.split('.')[-1].lower()
+        
+        # Decode through the shared buffer cache so a file already converted or
+        # visualized in this process is not decoded again; a time range is
+        # decoded on its own
         try:
-            recognizer = sr.Recognizer()
-            
-            with sr.AudioFile(temp_wav_path) as source:
-                audio_data = recognizer.record(source)
-            
+            audio_file.seek(0)
+            with stage_timer('transcribe', 'decode'):
+                if start or duration is not None:
+                    samples, sample_rate, _ = load_audio_range(
+                        audio_file, original_filename, start, duration, AudioTranscriber.SAMPLE_RATE, dtype='int16'
+                    )
+                else:
+                    samples, sample_rate = load_audio(
+                        audio_file, original_filename, AudioTranscriber.SAMPLE_RATE, dtype='int16'
+                    )
+        except Exception as e:
+            raise ValueError(f"Failed to convert {file_extension} to WAV for transcription: {str(e)}")
+        observe_audio('transcribe', len(samples), sample_rate)
+        
+        return AudioTranscriber.transcribe_samples(samples, sample_rate, language, backend, offset=start)
+    
+    @staticmethod
+    def transcribe_samples(samples: np.ndarray, sample_rate: int, language: str = 'en-US',
+                           backend: RecognizerBackend = None, offset: float = 0.0) -> List[dict]:
+        """Transcribe already-decoded mono int16 samples (see SAMPLE_RATE).
+        
+        Segment times are reported relative to the file, with `offset` the
+        time of the first sample.
+        """
+        import speech_recognition as sr
+        
+        backend = backend or AudioTranscriber.get_backend()
+        with stage_timer('transcribe', 'dsp'):
+            bounds = AudioTranscriber.split_on_silence(samples, sample_rate)
+        
+        def recognize(segment):
+            start, end = segment
             try:
-                text = recognizer.recognize_google(audio_data, language=language)
-                return text
+                text = backend.recognize(samples[start:end], sample_rate, language)
             except sr.UnknownValueError:
-                raise ValueError("Could not understand audio - speech may be unclear or not present")
-            except sr.RequestError as e:
-                raise ValueError(f"Could not request results from Google Speech Recognition service: {e}")
-            
-        finally:
-            if os.path.exists(temp_wav_path):
-                os.unlink(temp_wav_path)
+                text = ''
+            return {'start': round(offset + start / sample_rate, 3), 'end': round(offset + end / sample_rate, 3),
+                    'text': text}
+        
+        try:
+            with stage_timer('transcribe', 'recognize'), ThreadPoolExecutor(max_workers=TRANSCRIBE_WORKERS) as executor:
+                segments = list(executor.map(recognize, bounds))
+        except sr.RequestError as e:
+            raise ValueError(f"Could not request results from Google Speech Recognition service: {e}")
+        
+        segments = [segment for segment in segments if segment['text']]
+        if not segments:
+            raise ValueError("Could not understand audio - speech may be unclear or not present")
+        
+        return segments
+    
+    @staticmethod
+    def join_segments(segments: List[dict]) -> str:
+        return ' '.join(segment['text'] for segment in segments)
+    
+    @staticmethod
+    def transcribe_audio_from_file(audio_file: BinaryIO, original_filename: str, language: str = 'en-US') -> str:
+        segments = AudioTranscriber.transcribe_segments(audio_file, original_filename, language)
+        return AudioTranscriber.join_segments(segments)
     
     @staticmethod
     def get_supported_languages():
@@ -0,0 +1,50 @@
+import io
+import os
+import time
+
+import numpy as np
+
+
+WARMUP_ON_START = os.environ.get('WARMUP_ON_START', '').lower() in ('1', 'true', 'yes')
+
+
+def warm_up() -> float:
+    """Import the deferred audio and plotting dependencies and run each processing path once
+    on a short synthetic tone, so the first real request does not pay for it.
+    
+    Everything runs on the calling thread and no pools are started, so this is
+    safe to call in a preloading master before it forks workers as well as in
+    each worker after the fork. Returns the seconds spent.
+    """
+    start = time.perf_counter()
+    
+    import librosa
+    import speech_recognition  # noqa: F401
+    from audio_io import decode_audio, encode_wav, resample
+    from render import render_spectrogram, render_waveform_envelope
+    from spectrogram import SpectrogramGenerator
+    from transcribe import AudioTranscriber
+    from waveform import WaveformGenerator
+    
+    sr = 22050
+    t = np.arange(sr) / sr
+    tone = (0.5 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+    y, sr = decode_audio(io.BytesIO(encode_wav(tone, sr)), 'warmup.wav')
+    AudioTranscriber.split_on_silence(resample(y, sr, AudioTranscriber.SAMPLE_RATE), AudioTranscriber.SAMPLE_RATE)
+    
+    mins, maxs, rms, bin_size = WaveformGenerator.compute_peak_envelope(y, WaveformGenerator.ENVELOPE_COLUMNS)
+    times = (np.arange(len(mins)) + 0.5) * bin_size / sr
+    render_waveform_envelope(WaveformGenerator.FIGURE_SIZE, WaveformGenerator.DPI, times, mins, maxs, rms, 'Warm-up')
+    
+    n_fft, hop_length = SpectrogramGenerator.N_FFT, SpectrogramGenerator.HOP_LENGTH
+    S, frames_per_column = SpectrogramGenerator.magnitude_from_array(
+        y, SpectrogramGenerator.TIME_COLUMNS, n_fft, hop_length
+    )
+    S_db = librosa.amplitude_to_db(S, ref=np.max, top_db=SpectrogramGenerator.TOP_DB)
+    render_spectrogram(
+        SpectrogramGenerator.FIGURE_SIZE, SpectrogramGenerator.DPI, S_db, sr, n_fft, hop_length * frames_per_column,
+        'Warm-up', (SpectrogramGenerator.MIN_FREQUENCY, sr // 2), colormap=SpectrogramGenerator.COLORMAP,
+        db_range=SpectrogramGenerator.TOP_DB
+    )
+    
+    return time.perf_counter() - start
\ No newline at end of file
@@ -1,71 +1,222 @@
-import librosa
-import matplotlib
-matplotlib.use('Agg')  # Use non-interactive backend
-import matplotlib.pyplot as plt
 import numpy as np
-import tempfile
-import os
-from typing import BinaryIO
+from typing import BinaryIO, List, Optional, Tuple
 import io
-import base64
+from audio_cache import load_audio, load_audio_bytes, load_audio_range
+from audio_io import float_to_int16
+from metrics import observe_audio, stage_timer
+from render import render_pool, render_waveform_envelope, render_waveform_samples
+
+
+class PeakPyramid:
+    """Mipmapped min/max/RMS envelope of one file, quantized to int16.
+    
+    Level 0 summarizes base_bin samples per bin and every further level
+    halves the resolution, so any window can be drawn from the coarsest
+    level that still has at least one bin per output column.
+    """
+    
+    def __init__(self, sample_rate: int, samples: int, base_bin: int, levels: List[Tuple[np.ndarray, ...]]):
+        self.sample_rate = sample_rate
+        self.samples = samples
+        self.base_bin = base_bin
+        self.levels = levels
+    
+    @property
+    def duration(self) -> float:
+        return self.samples / self.sample_rate
+    
+    def to_bytes(self) -> bytes:
+        arrays = {}
+        for level, (mins, maxs, rms) in enumerate(self.levels):
+            arrays[f'min_{level}'] = mins
+            arrays[f'max_{level}'] = maxs
+            arrays[f'rms_{level}'] = rms
+        
+        buffer = io.BytesIO()
+        np.savez(buffer, header=np.array([self.sample_rate, self.samples, self.base_bin, len(self.levels)]),
+                 **arrays)
+        return buffer.getvalue()
+    
+    @staticmethod
+    def from_bytes(data: bytes) -> 'PeakPyramid':
+        with np.load(io.BytesIO(data)) as arrays:
+            sample_rate, samples, base_bin, level_count = (int(value) for value in arrays['header'])
+            levels = [
+                (arrays[f'min_{level}'], arrays[f'max_{level}'], arrays[f'rms_{level}'])
+                for level in range(level_count)
+            ]
+        return PeakPyramid(sample_rate, samples, base_bin, levels)
 
 
 class WaveformGenerator:
+    FIGURE_SIZE = (12, 6)
+    DPI = 150
+    # One envelope bin per horizontal pixel of the rendered figure
+    ENVELOPE_COLUMNS = FIGURE_SIZE[0] * DPI
+    PYRAMID_BASE_BIN = 32
+    PYRAMID_MIN_BINS = 256
+    MIN_WIDTH = 320
+    MAX_WIDTH = 8192
     
     @staticmethod
-    def generate_waveform(audio_data: bytes, sample_rate: int = None) -> bytes:
-        with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_file:
-            temp_file.write(audio_data)
-            temp_file_path = temp_file.name
+    def compute_peak_envelope(y: np.ndarray, columns: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, int]:
+        bin_size = int(np.ceil(len(y) / columns))
+        mins, maxs, rms = WaveformGenerator.bin_envelope(y, bin_size)
+        return mins, maxs, rms, bin_size
+    
+    @staticmethod
+    def bin_envelope(y: np.ndarray, bin_size: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        bins = int(np.ceil(len(y) / bin_size))
         
-        try:
-            y, sr = librosa.load(temp_file_path, sr=sample_rate)
-            
-            plt.figure(figsize=(12, 6))
-            plt.plot(np.linspace(0, len(y)/sr, len(y)), y)
-            plt.title('Audio Waveform')
-            plt.xlabel('Time (seconds)')
-            plt.ylabel('Amplitude')
-            plt.grid(True, alpha=0.3)
-            plt.tight_layout()
-            
-            img_buffer = io.BytesIO()
-            plt.savefig(img_buffer, format='png', dpi=150, bbox_inches='tight')
-            img_buffer.seek(0)
-            
-            plt.close()
-            
-            return img_buffer.getvalue()
+        # Pad the last partial bin with its final sample so it adds no fake peaks
+        padding = bins * bin_size - len(y)
+        if padding:
+            y = np.pad(y, (0, padding), mode='edge')
+        
+        frames = y.reshape(bins, bin_size)
+        mins = frames.min(axis=1)
+        maxs = frames.max(axis=1)
+        rms = np.sqrt(np.einsum('ij,ij->i', frames, frames) / bin_size)
+        
+        return mins, maxs, rms
+    
+    @staticmethod
+    def build_peak_pyramid(y: np.ndarray, sr: int) -> PeakPyramid:
+        if not len(y):
+            y = np.zeros(1, dtype=np.float32)
+        mins, maxs, rms = WaveformGenerator.bin_envelope(y, WaveformGenerator.PYRAMID_BASE_BIN)
+        
+        levels = []
+        while True:
+            levels.append((float_to_int16(mins), float_to_int16(maxs), float_to_int16(rms)))
+            if len(mins) <= WaveformGenerator.PYRAMID_MIN_BINS:
+                break
             
-        finally:
-            os.unlink(temp_file_path)
+            # Merge neighbouring bins pairwise; an odd tail bin is paired with itself
+            if len(mins) % 2:
+                mins, maxs, rms = (np.append(a, a[-1]) for a in (mins, maxs, rms))
+            mins = np.minimum(mins[0::2], mins[1::2])
+            maxs = np.maximum(maxs[0::2], maxs[1::2])
+            rms = np.sqrt((rms[0::2] ** 2 + rms[1::2] ** 2) / 2)
+        
+        return PeakPyramid(sr, len(y), WaveformGenerator.PYRAMID_BASE_BIN, levels)
     
     @staticmethod
-    def generate_waveform_from_file(audio_file: BinaryIO, original_filename: str) -> bytes:
-        file_extension = original_filename.split('.')[-1].lower()
+    def window_envelope(pyramid: PeakPyramid, start: float, end: float, width: int,
+                        offset: float = 0.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Return (times, mins, maxs, rms) with at most `width` columns covering [start, end) seconds.
         
-        with tempfile.NamedTemporaryFile(suffix=f'.{file_extension}', delete=False) as temp_input:
-            temp_input.write(audio_file.read())
-            temp_input_path = temp_input.name
+        `offset` is the file time of the pyramid's first sample, for pyramids
+        built from a decoded time range rather than the whole file.
+        """
+        start_sample = max(int((start - offset) * pyramid.sample_rate), 0)
+        end_sample = min(int(np.ceil((end - offset) * pyramid.sample_rate)), pyramid.samples)
+        samples_per_column = max((end_sample - start_sample) / width, 1)
         
-        try:
-            y, sr = librosa.load(temp_input_path, sr=None)
-            
-            plt.figure(figsize=(12, 6))
-            plt.plot(np.linspace(0, len(y)/sr, len(y)), y)
-            plt.title(f'Audio Waveform - {original_filename}')
-            plt.xlabel('Time (seconds)')
-            plt.ylabel('Amplitude')
-            plt.grid(True, alpha=0.3)
-            plt.tight_layout()
-            
-            img_buffer = io.BytesIO()
-            plt.savefig(img_buffer, format='png', dpi=150, bbox_inches='tight')
-            img_buffer.seek(0)
-            
-            plt.close()
-            
-            return img_buffer.getvalue()
-            
-        finally:
-            os.unlink(temp_input_path)
\ No newline at end of file
+        level = int(np.log2(max(samples_per_column / pyramid.base_bin, 1)))
+        level = min(level, len(pyramid.levels) - 1)
+        bin_size = pyramid.base_bin * 2 ** level
+        mins, maxs, rms = pyramid.levels[level]
+        
+        first = start_sample // bin_size
+        last = max(-(-end_sample // bin_size), first + 1)
+        mins, maxs = mins[first:last] / 32768.0, maxs[first:last] / 32768.0
+        rms = rms[first:last] / 32768.0
+        
+        # Pool whole bins down to the requested number of columns
+        edges = np.unique(np.linspace(0, len(mins), min(width, len(mins)) + 1).astype(int))
+        starts = edges[:-1]
+        mins = np.minimum.reduceat(mins, starts)
+        maxs = np.maximum.reduceat(maxs, starts)
+        rms = np.sqrt(np.add.reduceat(rms ** 2, starts) / np.diff(edges))
+        
+        times = offset + (first + (edges[:-1] + edges[1:]) / 2) * bin_size / pyramid.sample_rate
+        return times, mins, maxs, rms
+    
+    @staticmethod
+    def render_waveform(y: np.ndarray, sr: int, title: str) -> bytes:
+        figure_size, dpi = WaveformGenerator.FIGURE_SIZE, WaveformGenerator.DPI
+        
+        if len(y) <= 2 * WaveformGenerator.ENVELOPE_COLUMNS:
+            with stage_timer('waveform', 'render'):
+                return render_pool.run(
+                    render_waveform_samples, figure_size, dpi, np.linspace(0, len(y)/sr, len(y)), y, title
+                )
+        
+        with stage_timer('waveform', 'dsp'):
+            mins, maxs, rms, bin_size = WaveformGenerator.compute_peak_envelope(
+                y, WaveformGenerator.ENVELOPE_COLUMNS
+            )
+            times = (np.arange(len(mins)) + 0.5) * bin_size / sr
+        
+        with stage_timer('waveform', 'render'):
+            return render_pool.run(render_waveform_envelope, figure_size, dpi, times, mins, maxs, rms, title)
+    
+    @staticmethod
+    def render_window(pyramid: PeakPyramid, start: float, end: float, width: int, title: str,
+                      offset: float = 0.0) -> bytes:
+        """Render [start, end) seconds from a peak pyramid into a PNG `width` pixels wide."""
+        with stage_timer('waveform', 'dsp'):
+            times, mins, maxs, rms = WaveformGenerator.window_envelope(pyramid, start, end, width, offset)
+        
+        figure_size = (width / WaveformGenerator.DPI, WaveformGenerator.FIGURE_SIZE[1])
+        with stage_timer('waveform', 'render'):
+            return render_pool.run(
+                render_waveform_envelope, figure_size, WaveformGenerator.DPI, times, mins, maxs, rms, title,
+                xlim=(start, end)
+            )
+    
+    @staticmethod
+    def window_data(pyramid: PeakPyramid, start: float, end: float, width: int, offset: float = 0.0,
+                    duration: float = None) -> Tuple[np.ndarray, dict]:
+        """Return int16 min/max/RMS rows for a window, for clients that draw the waveform themselves.
+        
+        `duration` is the whole file's, when the pyramid covers only part of it.
+        """
+        with stage_timer('waveform', 'dsp'):
+            _, mins, maxs, rms = WaveformGenerator.window_envelope(pyramid, start, end, width, offset)
+            peaks = np.stack([float_to_int16(mins), float_to_int16(maxs), float_to_int16(rms)])
+        
+        return peaks, {
+            'type': 'waveform',
+            'rows': ['min', 'max', 'rms'],
+            'sample_rate': pyramid.sample_rate,
+            'duration': duration if duration is not None else pyramid.duration,
+            'start': start,
+            'end': end,
+            'bits': 16,
+        }
+    
+    @staticmethod
+    def range_pyramid_from_file(audio_file: BinaryIO, original_filename: str, start: float,
+                                duration: float = None) -> Tuple[PeakPyramid, Optional[float]]:
+        """Build a pyramid of [start, start + duration) seconds only; also returns the file's duration if known."""
+        with stage_timer('waveform', 'decode'):
+            y, sr, total = load_audio_range(audio_file, original_filename, start, duration)
+        observe_audio('waveform', len(y), sr)
+        
+        with stage_timer('waveform', 'dsp'):
+            return WaveformGenerator.build_peak_pyramid(y, sr), total
+    
+    @staticmethod
+    def generate_waveform(audio_data: bytes, sample_rate: int = None) -> bytes:
+        with stage_timer('waveform', 'decode'):
+            y, sr = load_audio_bytes(audio_data, 'audio.wav', sample_rate)
+        observe_audio('waveform', len(y), sr)
+        return WaveformGenerator.render_waveform(y, sr, 'Audio Waveform')
+    
+    @staticmethod
+    def generate_waveform_from_file(audio_file: BinaryIO, original_filename: str) -> bytes:
+        with stage_timer('waveform', 'decode'):
+            y, sr = load_audio(audio_file, original_filename)
+        observe_audio('waveform', len(y), sr)
+        return WaveformGenerator.render_waveform(y, sr, f'Audio Waveform - {original_filename}')
+    
+    @staticmethod
+    def peak_pyramid_from_file(audio_file: BinaryIO, original_filename: str) -> PeakPyramid:
+        with stage_timer('waveform', 'decode'):
+            y, sr = load_audio(audio_file, original_filename)
+        observe_audio('waveform', len(y), sr)
+        
+        with stage_timer('waveform', 'dsp'):
+            return WaveformGenerator.build_peak_pyramid(y, sr)
\ No newline at end of file